@@ -2,6 +2,10 @@
 from celery import shared_task
 from django.conf import settings
 from scraping.models import Noticia
+from scraping.engine.fixtures import html_grabado
+from scraping.engine.circuit import vigilar
+from scraping.engine.ratelimit import adquirir
+from scraping.utils.canonical import canonicalizar_url
 from .models import AnalisisNoticia
 import openai
 import requests
@@ -122,14 +126,23 @@ def scrape_contenido_noticia(url):
     Scrapea el contenido real de la noticia desde la URL
     """
     try:
+        url = canonicalizar_url(url) or url
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+        if settings.SCRAPER_REPLAY:
+            # Corpus grabado con grabar_fixtures: sin red
+            contenido = html_grabado(url)
+        else:
+            # Mismo bucket por dominio que los scrapers
+            adquirir(url)
+            with vigilar(url):
+                response = requests.get(url, headers=headers, timeout=15)
+                response.raise_for_status()
+            contenido = response.content
+        
+        soup = BeautifulSoup(contenido, 'html.parser')
         
         # 🔥 CORREGIR SELECTORES POR ORDEN DE PRECEDENCIA
         
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Noticia
+from .engine.history import tendencias
+from .models import Noticia, ScrapeRun, ScrapeSectionRun
 
 @admin.register(Noticia)
 class NoticiaAdmin(admin.ModelAdmin):
@@ -48,4 +49,69 @@ class NoticiaAdmin(admin.ModelAdmin):
             'fields': ('fecha_scraping',),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+class ScrapeSectionRunInline(admin.TabularInline):
+    model = ScrapeSectionRun
+    extra = 0
+    can_delete = False
+    fields = (
+        'seccion', 'tier', 'duracion', 'paginas', 'requests', 'encontradas', 'nuevas',
+        'errores', 'timeouts_selector', 'rss_navegador_mb', 'error',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ('inicio', 'tipo', 'estado_coloreado', 'duracion', 'secciones_total', 'encontradas', 'nuevas', 'errores')
+    list_filter = ('tipo', 'estado', 'inicio')
+    search_fields = ('run_id',)
+    date_hierarchy = 'inicio'
+    list_per_page = 20
+    inlines = [ScrapeSectionRunInline]
+    # El template agrega la tabla de tendencias sobre el listado
+    change_list_template = 'admin/scraping/scraperun/change_list.html'
+
+    def get_readonly_fields(self, request, obj=None):
+        return [campo.name for campo in self.model._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def estado_coloreado(self, obj):
+        colores = {'ok': 'green', 'parcial': 'orange', 'error': 'red', 'en_curso': 'gray'}
+        return format_html('<span style="color: {};">{}</span>', colores.get(obj.estado, 'gray'), obj.get_estado_display())
+    estado_coloreado.short_description = 'Estado'
+    estado_coloreado.admin_order_field = 'estado'
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), 'tendencias': tendencias()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(ScrapeSectionRun)
+class ScrapeSectionRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'inicio', 'seccion', 'tier', 'duracion', 'encontradas', 'nuevas', 'errores',
+        'timeouts_selector', 'articulos_por_segundo', 'rss_navegador_mb', 'con_error',
+    )
+    list_filter = ('seccion', 'tier', 'origen', 'inicio')
+    date_hierarchy = 'inicio'
+    list_per_page = 50
+
+    def get_readonly_fields(self, request, obj=None):
+        return [campo.name for campo in self.model._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def con_error(self, obj):
+        if obj.error:
+            return format_html('<span style="color: red;" title="{}">✗</span>', obj.error)
+        return format_html('<span style="color: green;">✓</span>')
+    con_error.short_description = 'OK'
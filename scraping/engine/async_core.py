@@ -0,0 +1,324 @@
+"""
+Modo asíncrono del motor.
+
+Scrapea varias secciones a la vez en un único Chromium (``playwright.async_api``)
+con un semáforo que limita cuántas páginas hay abiertas al mismo tiempo. El
+barrido completo tarda aproximadamente lo que la sección más lenta en vez
+de la suma de todas. El guardado usa el mismo ``guardar_noticias`` del motor
+síncrono, ejecutado en el hilo del ORM con ``sync_to_async``.
+"""
+import asyncio
+import time
+import uuid
+from functools import partial
+from urllib.parse import urljoin
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from playwright.async_api import async_playwright
+
+from .blocking import nuevas_stats
+from .browser import USER_AGENT, rss_navegador_mb, usar_servidor
+from .circuit import CircuitoAbierto, vigilar_async
+from .control import ScrapeCancelado
+from .core import ScraperEngine
+from .extract import EXTRACT_JS, argumentos_js, parsear_fecha, resolver_enlace
+from .fixtures import preparar_replay_async
+from .history import registrar_seccion
+from .images import elegir_mejor_imagen, limpiar_url, mejorar_url_imagen
+from .ratelimit import adquirir_async
+from .scroll import scroll_hasta_estable_async
+from .sections import get_seccion
+
+
+class AsyncScraperEngine(ScraperEngine):
+    """Misma lógica que ScraperEngine con N secciones en paralelo."""
+
+    def __init__(self, write=None, concurrency=None, **kwargs):
+        super().__init__(write=write, **kwargs)
+        self.concurrency = concurrency or settings.SCRAPER_CONCURRENCY
+
+    # ===== EXTRACCIÓN POR CAMPO =====
+    async def _texto(self, element, selector, timeout):
+        loc = element.locator(selector)
+        if not await loc.count():
+            return None
+        return (await loc.first.inner_text(timeout=timeout)).strip()
+
+    async def obtener_fecha(self, spec, element):
+        fecha_str = None
+        try:
+            time_loc = element.locator(spec['fecha'])
+            if await time_loc.count():
+                fecha_str = await time_loc.first.get_attribute("datetime", timeout=spec['campo_timeout'])
+            if not fecha_str and spec['fecha_texto']:
+                fecha_str = await self._texto(element, spec['fecha_texto'], spec['campo_timeout'])
+        except Exception:
+            pass
+        return parsear_fecha(fecha_str)
+
+    async def obtener_imagen(self, spec, element):
+        try:
+            if spec['imagen_estrategia'] == 'mejor_resolucion':
+                return await self._mejor_imagen(spec, element)
+
+            for selector in spec['imagen']:
+                img = element.locator(selector)
+                if not await img.count():
+                    continue
+                src = await img.first.get_attribute("src") or await img.first.get_attribute("data-src")
+                if src:
+                    return limpiar_url(urljoin(spec['url'], src))
+        except Exception as e:
+            self.write(f"⚠️ Error obteniendo imagen: {e}")
+        return None
+
+    async def _mejor_imagen(self, spec, element):
+        dominio = spec['imagen_dominio']
+        candidatos = []
+        for selector in spec['imagen']:
+            try:
+                for img in await element.locator(selector).all():
+                    candidatos.append(await img.get_attribute("src"))
+                    candidatos.append(await img.get_attribute("data-src"))
+            except Exception:
+                continue
+
+        mejor_imagen, mejor_resolucion = elegir_mejor_imagen(candidatos, dominio)
+        if not mejor_imagen or mejor_resolucion < 300:
+            mejor_imagen = await self._intentar_mejorar_imagen(dominio, element)
+        return mejor_imagen
+
+    async def _intentar_mejorar_imagen(self, dominio, element):
+        try:
+            img = element.locator(f"img[src*='{dominio}'], img[data-src*='{dominio}']")
+            if await img.count():
+                src = await img.first.get_attribute("src") or await img.first.get_attribute("data-src")
+                if src:
+                    return mejorar_url_imagen(limpiar_url(src))
+        except Exception:
+            pass
+        return None
+
+    async def obtener_enlace(self, spec, element):
+        for selector in spec['enlace']:
+            try:
+                link = element.locator(selector)
+                if not await link.count():
+                    continue
+                href = await link.first.get_attribute("href") or await link.first.get_attribute("data-mrf-link")
+                href = resolver_enlace(spec, href)
+                if href:
+                    return href
+            except Exception:
+                continue
+        return None
+
+    async def extraer_item(self, spec, element):
+        timeout = spec['campo_timeout']
+
+        try:
+            titulo = await self._texto(element, spec['titulo'], timeout)
+        except Exception as e:
+            self._contar_timeout(spec, e)
+            titulo = None
+        if not titulo:
+            if spec['titulo_requerido']:
+                return None
+            titulo = "Sin título"
+
+        try:
+            autor = await self._texto(element, spec['autor'], timeout)
+        except Exception as e:
+            self._contar_timeout(spec, e)
+            autor = None
+
+        enlace = await self.obtener_enlace(spec, element)
+        if not enlace and spec['enlace_requerido']:
+            return None
+
+        return {
+            'titulo': titulo,
+            'autor': autor or spec['autor_defecto'],
+            'fecha': await self.obtener_fecha(spec, element),
+            'imagen': await self.obtener_imagen(spec, element),
+            'enlace': enlace,
+        }
+
+    # ===== NAVEGACIÓN =====
+    async def cargar_pagina(self, spec, page, resumen):
+        self.write(f"🌐 Navegando a {spec['nombre']}...")
+        self.progreso.fase(spec['slug'], 'navegando')
+        self.cancelacion.verificar()
+        resumen['espera_limite'] += await adquirir_async(spec['url'])
+        async with vigilar_async(spec['url']):
+            await page.goto(spec['url'], timeout=60000, wait_until="domcontentloaded")
+            await page.wait_for_selector(spec['wait_selector'], timeout=15000)
+
+        if spec['scroll']:
+            self.progreso.fase(spec['slug'], 'scroll')
+            resumen['scroll_iteraciones'] = await scroll_hasta_estable_async(page, spec)
+        resumen['rss_navegador_mb'] = round(await asyncio.to_thread(rss_navegador_mb), 1)
+
+    async def scrape_page(self, spec, page, resumen):
+        await self.cargar_pagina(spec, page, resumen)
+
+        self.progreso.fase(spec['slug'], 'extrayendo')
+        if self.extraccion == 'bulk':
+            noticias = await page.evaluate(EXTRACT_JS, argumentos_js(spec))
+            # Fuera del event loop: el sondeo de imágenes espera red y
+            # escritor.put() bloquea si la cola del escritor está llena
+            return await asyncio.to_thread(self.procesar_crudos, spec, noticias, resumen)
+
+        items = []
+        noticias = await page.locator(spec['item']).all()
+        total = len(noticias)
+        resumen['encontradas'] = total
+        self.write(f"📰 [{spec['slug']}] Se encontraron {total} noticias.")
+        self.progreso.emitir('encontradas', spec['slug'], total=total)
+        conocidos = self._conocidos.get(spec['origen'])
+        seguidas = 0
+
+        for i, noticia in enumerate(noticias):
+            self.cancelacion.verificar()
+            try:
+                self.progreso.emitir('procesada', spec['slug'], i=i + 1, total=total)
+                if conocidos is not None:
+                    if await self.obtener_enlace(spec, noticia) in conocidos:
+                        resumen['conocidas'] += 1
+                        seguidas += 1
+                        if self.parar_tras and seguidas >= self.parar_tras:
+                            resumen['corte_incremental'] = True
+                            break
+                        continue
+                    seguidas = 0
+                data = await self.extraer_item(spec, noticia)
+                if data is None:
+                    resumen['saltadas'] += 1
+                    continue
+                await asyncio.to_thread(self.emitir, spec, items, data)
+            except Exception as e:
+                resumen['saltadas'] += 1
+                self.write(f"❌ [{spec['slug']}] Error procesando noticia {i+1}: {e}")
+        return items
+
+    # ===== EJECUCIÓN =====
+    async def _run_seccion(self, browser, semaforo, seccion):
+        spec = get_seccion(seccion) if isinstance(seccion, str) else seccion
+        resumen = self._nuevo_resumen(spec)
+        inicio = time.time()
+        error = ''
+        try:
+            return await self._scrapear_seccion(browser, semaforo, spec, resumen)
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            resumen['timeouts_selector'] += self._timeouts.pop(spec['slug'], 0)
+            await sync_to_async(registrar_seccion, thread_sensitive=True)(
+                self.run_id or uuid.uuid4().hex, spec, resumen, inicio, time.time(),
+                error or resumen.get('fallo', ''),
+            )
+
+    async def _scrapear_seccion(self, browser, semaforo, spec, resumen):
+        inicio = time.time()
+        items = None
+        self.cancelacion.verificar()
+        await sync_to_async(self.preparar_incremental, thread_sensitive=True)(spec)
+        self.progreso.emitir('inicio', spec['slug'], nombre=spec['nombre'])
+
+        self.iniciar_escritor(spec)
+        try:
+            # El tier HTTP no ocupa páginas del navegador: corre fuera del semáforo
+            if self.usar_estatico(spec):
+                items = await asyncio.to_thread(self.intentar_estatico, spec, resumen)
+
+            if items is None:
+                items = []
+                red = nuevas_stats()
+                async with semaforo:
+                    context = await browser.new_context(user_agent=USER_AGENT)
+                    try:
+                        if self.bloqueo.activo:
+                            await context.route("**/*", self.bloqueo.handler_async(spec, red))
+                        if settings.SCRAPER_REPLAY:
+                            await preparar_replay_async(context, spec)
+                        page = await context.new_page()
+                        resumen['paginas'] += 1
+                        page.on("request", partial(self._contar_request, resumen))
+                        items = await self.scrape_page(spec, page, resumen)
+                    except (ScrapeCancelado, CircuitoAbierto):
+                        raise
+                    except Exception as e:
+                        self._contar_timeout(spec, e)
+                        resumen['fallo'] = str(e)
+                        self.write(self.style.ERROR(f"❌ [{spec['slug']}] Error durante el scraping: {e}"))
+                    finally:
+                        await context.close()
+                resumen.update(red)
+        finally:
+            # join() del hilo escritor fuera del event loop
+            await asyncio.to_thread(self.cerrar_escritor, spec, resumen)
+
+        # El guardado corre en el hilo del ORM mientras otras secciones siguen navegando
+        await sync_to_async(self.guardar, thread_sensitive=True)(spec, items, resumen)
+        resumen['duracion'] = round(time.time() - inicio, 2)
+        self.progreso.emitir('fin', spec['slug'], resumen=resumen)
+        self.write(self.style.SUCCESS(f"✅ Scraping de {spec['nombre']} finalizado!"))
+        return resumen
+
+    async def abrir_navegador(self, p):
+        """Chromium del servidor compartido si está disponible; si no, uno local"""
+        if await asyncio.to_thread(usar_servidor):
+            try:
+                return await p.chromium.connect(
+                    settings.SCRAPER_BROWSER_WS, timeout=settings.SCRAPER_BROWSER_CONNECT_TIMEOUT
+                )
+            except Exception as e:
+                self.write(f"⚠️ Servidor de navegador no disponible ({e}), lanzando Chromium local")
+        return await p.chromium.launch(headless=True)
+
+    async def run_many_async(self, secciones):
+        semaforo = asyncio.Semaphore(self.concurrency)
+        inicio = time.time()
+
+        async with async_playwright() as p:
+            browser = await self.abrir_navegador(p)
+            try:
+                resultados = await asyncio.gather(
+                    *(self._run_seccion(browser, semaforo, s) for s in secciones),
+                    return_exceptions=True,
+                )
+            finally:
+                await browser.close()
+
+        resumenes = []
+        for seccion, resultado in zip(secciones, resultados):
+            if isinstance(resultado, Exception):
+                slug = seccion if isinstance(seccion, str) else seccion['slug']
+                self.write(self.style.ERROR(f"❌ Error en la sección {slug}: {resultado}"))
+                resultado = {'seccion': slug, 'error': str(resultado)}
+            resumenes.append(resultado)
+
+        total = round(time.time() - inicio, 2)
+        suma = round(sum(r.get('duracion', 0) for r in resumenes), 2)
+        self.write(
+            f"⚡ {len(resumenes)} secciones en {total}s con concurrencia {self.concurrency} "
+            f"(secuencial habría sido ~{suma}s)"
+        )
+        if self.bloqueo.activo:
+            self.write(f"🛡️ Bloqueo de red ({self.bloqueo.nombre}): {self.bloqueo.resumen()}")
+        self.write("📜 Iteraciones de scroll: " + ", ".join(
+            f"{r['seccion']}={r.get('scroll_iteraciones', 0)}" for r in resumenes
+        ))
+        return resumenes
+
+    def run_many(self, secciones):
+        """Punto de entrada síncrono (comandos y tareas Celery)"""
+        if self.run_id is None:
+            with self.corrida('comando', len(secciones)):
+                return self.run_many(secciones)
+        return asyncio.run(self.run_many_async(list(secciones)))
+
+    def run(self, seccion):
+        return self.run_many([seccion])[0]
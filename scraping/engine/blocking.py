@@ -0,0 +1,132 @@
+"""
+Perfiles de bloqueo de red para los contextos del navegador.
+
+Los scrapers solo leen atributos del DOM, así que imágenes, video, fuentes,
+trackers y anuncios son tráfico desperdiciado. Las imágenes no se abortan:
+se responden con un GIF de 1x1 para que los scripts de lazy-loading
+disparen ``onload`` y sigan copiando ``data-src`` a ``src``. Cada sección
+puede declarar ``red_permitir`` (fragmentos de URL) para dejar pasar lo que
+necesite de verdad.
+"""
+import base64
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+GIF_1X1 = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+# Tamaños medios aproximados para estimar los bytes evitados por tipo
+BYTES_ESTIMADOS = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 40_000,
+    'script': 30_000,
+    'stylesheet': 20_000,
+}
+BYTES_OTROS = 5_000
+
+DOMINIOS_TRACKERS = (
+    'googletagmanager.com',
+    'google-analytics.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'adservice.google.com',
+    'facebook.net',
+    'connect.facebook.net',
+    'scorecardresearch.com',
+    'chartbeat.com',
+    'chartbeat.net',
+    'taboola.com',
+    'outbrain.com',
+    'amazon-adsystem.com',
+    'adnxs.com',
+    'criteo.com',
+    'criteo.net',
+    'hotjar.com',
+    'newrelic.com',
+    'nr-data.net',
+    'pubmatic.com',
+    'rubiconproject.com',
+    'smartadserver.com',
+    'onesignal.com',
+    'tiktok.com',
+)
+
+PERFILES = {
+    'off': {'tipos': (), 'trackers': False},
+    'default': {'tipos': ('image', 'media', 'font'), 'trackers': True},
+    'estricto': {'tipos': ('image', 'media', 'font', 'stylesheet'), 'trackers': True},
+}
+
+
+def nuevas_stats():
+    return {'requests_bloqueados': 0, 'bytes_evitados': 0}
+
+
+class BloqueoRed:
+    """Decide qué requests aborta el navegador y lleva la cuenta de lo evitado."""
+
+    def __init__(self, perfil=None):
+        self.nombre = perfil or settings.SCRAPER_BLOCK_PROFILE
+        self.perfil = PERFILES[self.nombre]
+        self.stats = nuevas_stats()
+
+    @property
+    def activo(self):
+        return bool(self.perfil['tipos'] or self.perfil['trackers'])
+
+    def _es_tracker(self, url):
+        host = urlparse(url).hostname or ''
+        return any(host == d or host.endswith('.' + d) for d in DOMINIOS_TRACKERS)
+
+    def decidir(self, url, tipo, permitir=()):
+        """'continuar', 'placeholder' (GIF 1x1) o 'abortar'"""
+        if any(fragmento in url for fragmento in permitir):
+            return 'continuar'
+        if self.perfil['trackers'] and self._es_tracker(url):
+            return 'abortar'
+        if tipo in self.perfil['tipos']:
+            return 'placeholder' if tipo == 'image' else 'abortar'
+        return 'continuar'
+
+    def _contar(self, stats, tipo):
+        bytes_ = BYTES_ESTIMADOS.get(tipo, BYTES_OTROS)
+        for destino in (stats, self.stats):
+            destino['requests_bloqueados'] += 1
+            destino['bytes_evitados'] += bytes_
+
+    def handler(self, spec, stats):
+        """Handler para ``context.route`` (API síncrona)"""
+        permitir = spec['red_permitir']
+
+        def _route(route):
+            request = route.request
+            accion = self.decidir(request.url, request.resource_type, permitir)
+            if accion == 'continuar':
+                return route.continue_()
+            self._contar(stats, request.resource_type)
+            if accion == 'placeholder':
+                return route.fulfill(status=200, content_type='image/gif', body=GIF_1X1)
+            return route.abort()
+
+        return _route
+
+    def handler_async(self, spec, stats):
+        """Handler para ``context.route`` (API async)"""
+        permitir = spec['red_permitir']
+
+        async def _route(route):
+            request = route.request
+            accion = self.decidir(request.url, request.resource_type, permitir)
+            if accion == 'continuar':
+                return await route.continue_()
+            self._contar(stats, request.resource_type)
+            if accion == 'placeholder':
+                return await route.fulfill(status=200, content_type='image/gif', body=GIF_1X1)
+            return await route.abort()
+
+        return _route
+
+    def resumen(self):
+        return f"{self.stats['requests_bloqueados']} requests / ~{self.stats['bytes_evitados'] // 1024} KB evitados"
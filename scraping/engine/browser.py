@@ -0,0 +1,223 @@
+"""
+Pool de navegador compartido.
+
+Lanza Chromium una sola vez por proceso (worker Celery o comando) y entrega
+un ``BrowserContext`` aislado a cada sección. El navegador se recicla cada
+``max_pages`` contextos o cuando el RSS de sus procesos supera
+``max_rss_mb``, para que una ejecución larga no acumule memoria.
+
+Playwright síncrono deja un event loop corriendo en el hilo que lo arranca y
+Django rechaza el ORM en ese hilo (``SynchronousOnlyOperation``). Por eso el
+pool es dueño de un hilo propio: todo lo que toca el navegador corre ahí con
+``pool.ejecutar(func)`` y el hilo del worker queda libre para el ORM de
+cualquier otra tarea.
+
+Con ``SCRAPER_BROWSER_WS`` el pool no lanza nada: se conecta al Chromium
+compartido que mantiene ``manage.py servidor_navegador`` (ver
+``browser_server.py``) y solo abre contextos en él. Si el servidor no
+responde se cae a un Chromium local.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from playwright.sync_api import sync_playwright
+
+from .state import servidor_navegador
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/115.0 Safari/537.36"
+)
+
+
+def _hijos(pid):
+    """PIDs descendientes de ``pid`` (solo Linux, vía /proc)"""
+    padres = {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/stat') as f:
+                # el nombre del proceso va entre paréntesis y puede tener espacios
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        padres.setdefault(ppid, []).append(int(entrada))
+
+    descendientes, pendientes = [], [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        for hijo in padres.get(actual, []):
+            descendientes.append(hijo)
+            pendientes.append(hijo)
+    return descendientes
+
+
+def rss_procesos_mb(pids):
+    """RSS actual (MB) sumado de ``pids`` (solo Linux, vía /proc)"""
+    if not os.path.isdir('/proc'):
+        return 0.0
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for linea in f:
+                    if linea.startswith('VmRSS:'):
+                        total_kb += int(linea.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def rss_navegador_mb():
+    """RSS actual (MB) de los procesos hijos: driver de Playwright y Chromium"""
+    return rss_procesos_mb(_hijos(os.getpid()))
+
+
+def usar_servidor():
+    """Conectarse al servidor compartido: configurado y, si hay Redis, con latido vigente"""
+    if not settings.SCRAPER_BROWSER_WS:
+        return False
+    # Sin latido no se paga el timeout de conexión en cada lanzamiento
+    return servidor_navegador() is not None
+
+
+class BrowserPool:
+    """Un Chromium por proceso con contextos aislados por sección."""
+
+    def __init__(self, max_pages=None, max_rss_mb=None, headless=True):
+        self.max_pages = max_pages or settings.SCRAPER_POOL_MAX_PAGES
+        self.max_rss_mb = max_rss_mb or settings.SCRAPER_POOL_MAX_RSS_MB
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._hilo = None
+        self._ident = None
+        self.remoto = False
+        self.paginas_desde_lanzamiento = 0
+        self.stats = {
+            'lanzamientos': 0,
+            'conexiones': 0,
+            'tiempo_lanzamiento': 0.0,
+            'contextos': 0,
+            'reciclajes': 0,
+        }
+
+    # ===== HILO DEL NAVEGADOR =====
+    def _marcar_hilo(self, func, *args, **kwargs):
+        self._ident = threading.get_ident()
+        return func(*args, **kwargs)
+
+    def ejecutar(self, func, *args, **kwargs):
+        """Ejecuta ``func`` en el hilo dueño de Playwright y devuelve su resultado"""
+        if threading.get_ident() == self._ident:
+            return func(*args, **kwargs)
+        if self._hilo is None:
+            self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper-navegador')
+        return self._hilo.submit(self._marcar_hilo, func, *args, **kwargs).result()
+
+    @property
+    def browser(self):
+        if self._browser is None or not self._browser.is_connected():
+            self._lanzar()
+        return self._browser
+
+    def _lanzar(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = None
+        self.paginas_desde_lanzamiento = 0
+        if usar_servidor():
+            try:
+                self._browser = self._playwright.chromium.connect(
+                    settings.SCRAPER_BROWSER_WS, timeout=settings.SCRAPER_BROWSER_CONNECT_TIMEOUT
+                )
+                self.remoto = True
+                self.stats['conexiones'] += 1
+                return
+            except Exception as e:
+                logger.warning(f"Servidor de navegador no disponible ({e}), lanzando Chromium local")
+        inicio = time.time()
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self.remoto = False
+        self.stats['lanzamientos'] += 1
+        self.stats['tiempo_lanzamiento'] += time.time() - inicio
+
+    def _cerrar_navegador(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                logger.warning(f"Error cerrando Chromium: {e}")
+            self._browser = None
+
+    def _debe_reciclar(self):
+        if self.paginas_desde_lanzamiento >= self.max_pages:
+            return True
+        # La memoria del servidor compartido la vigila su supervisor
+        return not self.remoto and self.max_rss_mb and rss_navegador_mb() > self.max_rss_mb
+
+    @contextmanager
+    def context(self, **kwargs):
+        """Entrega un BrowserContext nuevo y lo cierra al terminar (usar dentro de ``ejecutar``)"""
+        kwargs.setdefault('user_agent', USER_AGENT)
+        context = self.browser.new_context(**kwargs)
+        self.stats['contextos'] += 1
+        try:
+            yield context
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+            self.paginas_desde_lanzamiento += 1
+            if self._debe_reciclar():
+                logger.info("♻️ Reciclando Chromium del pool")
+                self.stats['reciclajes'] += 1
+                self._cerrar_navegador()
+
+    def ahorro_estimado(self):
+        """Segundos de arranque evitados frente a un Chromium por sección"""
+        if not self.stats['lanzamientos']:
+            return 0.0
+        promedio = self.stats['tiempo_lanzamiento'] / self.stats['lanzamientos']
+        evitados = max(0, self.stats['contextos'] - self.stats['lanzamientos'])
+        return round(evitados * promedio, 2)
+
+    def _detener(self):
+        self._cerrar_navegador()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def close(self):
+        if self._hilo is None:
+            return
+        self.ejecutar(self._detener)
+        self._hilo.shutdown(wait=True)
+        self._hilo = None
+        self._ident = None
+
+
+_pool = None
+
+
+def get_browser_pool():
+    """Pool compartido del proceso actual (un Chromium por worker)"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+        atexit.register(_pool.close)
+    return _pool
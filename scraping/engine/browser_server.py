@@ -0,0 +1,161 @@
+"""
+Servidor de Chromium compartido por todos los workers.
+
+Playwright para Python no expone ``launchServer``, así que se usa el Node
+que trae el propio paquete (``playwright/driver``) para lanzar un Chromium
+que escucha en ``SCRAPER_BROWSER_WS``. Los workers se conectan con
+``chromium.connect`` y abren un contexto por tarea: nadie paga el arranque
+ni duplica la memoria del navegador por cada hijo prefork.
+
+``Supervisor`` mantiene vivo el servidor: cada ``intervalo`` segundos
+comprueba que el proceso siga en pie, que responda a una conexión real y
+que su RSS no pase de ``max_rss_mb``; si algo falla lo reinicia en el mismo
+endpoint, así los workers se reconectan solos. Cada chequeo deja un latido
+en Redis que el pool usa para decidir si conectarse o lanzar en local.
+"""
+import logging
+import os
+import signal
+import subprocess
+import time
+from urllib.parse import urlsplit
+
+from playwright._impl._driver import compute_driver_executable, get_driver_env
+from playwright.sync_api import sync_playwright
+
+from .browser import _hijos, rss_procesos_mb
+from .state import registrar_servidor_navegador
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_SERVER_JS = r"""
+const [paquete, host, port, wsPath] = process.argv.slice(1);
+const { chromium } = require(paquete);
+(async () => {
+    const server = await chromium.launchServer({ headless: true, host, port: Number(port), wsPath });
+    console.log(server.wsEndpoint());
+    const cerrar = async () => { await server.close(); process.exit(0); };
+    process.on('SIGTERM', cerrar);
+    process.on('SIGINT', cerrar);
+})().catch((e) => { console.error(e); process.exit(1); });
+"""
+
+
+class Supervisor:
+    """Lanza el servidor de navegador, lo vigila y lo reinicia."""
+
+    def __init__(self, endpoint, max_rss_mb, intervalo=30.0, fallos_tolerados=2, write=print):
+        partes = urlsplit(endpoint)
+        self.host = partes.hostname or '127.0.0.1'
+        self.port = partes.port or 3000
+        self.ws_path = partes.path or '/'
+        self.max_rss_mb = max_rss_mb
+        self.intervalo = intervalo
+        self.fallos_tolerados = fallos_tolerados
+        self.write = write
+        self.proceso = None
+        self.endpoint = None
+        self._playwright = None
+        self.stats = {'reinicios': 0, 'fallos_seguidos': 0, 'ultimo_motivo': None, 'rss_mb': 0.0}
+
+    # ===== PROCESO =====
+    def iniciar(self):
+        node, cli = compute_driver_executable()
+        self.proceso = subprocess.Popen(
+            [node, '-e', LAUNCH_SERVER_JS, os.path.dirname(cli), self.host, str(self.port), self.ws_path],
+            stdout=subprocess.PIPE,
+            text=True,
+            env=get_driver_env(),
+            start_new_session=True,
+        )
+        # launchServer imprime el endpoint cuando Chromium ya está listo
+        self.endpoint = self.proceso.stdout.readline().strip()
+        if not self.endpoint:
+            codigo = self.proceso.wait()
+            raise RuntimeError(f"El servidor de navegador terminó al arrancar (código {codigo})")
+        self.write(f"🌐 Servidor de navegador en {self.endpoint} (pid {self.proceso.pid})")
+
+    def detener(self):
+        if self.proceso is None:
+            return
+        if self.proceso.poll() is None:
+            self.proceso.send_signal(signal.SIGTERM)
+            try:
+                self.proceso.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                # Grupo completo: node y los procesos de Chromium
+                os.killpg(self.proceso.pid, signal.SIGKILL)
+                self.proceso.wait()
+        self.proceso = None
+
+    def reiniciar(self, motivo):
+        self.write(f"♻️ Reiniciando servidor de navegador: {motivo}")
+        self.stats['reinicios'] += 1
+        self.stats['ultimo_motivo'] = motivo
+        self.detener()
+        self.iniciar()
+
+    # ===== CHEQUEOS =====
+    def rss_mb(self):
+        if self.proceso is None:
+            return 0.0
+        return rss_procesos_mb([self.proceso.pid] + _hijos(self.proceso.pid))
+
+    def responde(self):
+        """Conexión real: connect + contexto + página en blanco"""
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        try:
+            browser = self._playwright.chromium.connect(self.endpoint, timeout=10000)
+            try:
+                context = browser.new_context()
+                context.new_page().goto('about:blank', timeout=10000)
+                context.close()
+            finally:
+                browser.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Chequeo del servidor de navegador falló: {e}")
+            return False
+
+    def chequear(self):
+        """Revisa el servidor y lo reinicia si hace falta; devuelve el motivo o None"""
+        motivo = None
+        if self.proceso is None or self.proceso.poll() is not None:
+            motivo = 'proceso caído'
+        else:
+            self.stats['rss_mb'] = round(self.rss_mb(), 1)
+            if self.max_rss_mb and self.stats['rss_mb'] > self.max_rss_mb:
+                motivo = f"RSS {self.stats['rss_mb']} MB > {self.max_rss_mb} MB"
+            elif self.responde():
+                self.stats['fallos_seguidos'] = 0
+            else:
+                self.stats['fallos_seguidos'] += 1
+                if self.stats['fallos_seguidos'] >= self.fallos_tolerados:
+                    motivo = f"sin respuesta en {self.stats['fallos_seguidos']} chequeos"
+
+        if motivo:
+            self.stats['fallos_seguidos'] = 0
+            self.reiniciar(motivo)
+        registrar_servidor_navegador({
+            'endpoint': self.endpoint,
+            'pid': self.proceso.pid if self.proceso else None,
+            't': time.time(),
+            **self.stats,
+        }, ttl=int(self.intervalo * 3))
+        return motivo
+
+    def supervisar(self):
+        self.iniciar()
+        try:
+            while True:
+                try:
+                    self.chequear()
+                except Exception as e:
+                    # Un arranque fallido se reintenta en el próximo chequeo
+                    self.write(f"❌ Error supervisando el servidor de navegador: {e}")
+                time.sleep(self.intervalo)
+        finally:
+            self.detener()
+            if self._playwright is not None:
+                self._playwright.stop()
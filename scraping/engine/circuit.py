@@ -0,0 +1,220 @@
+"""
+Circuit breaker por dominio compartido entre workers.
+
+Cuando un sitio está caído o lento cada sección igual espera sus timeouts
+(``goto`` de 60 s más ``wait_for_selector`` de 15 s) y retiene un worker y
+un navegador. Cada descarga pasa por ``vigilar(url)``:
+
+- **cerrado**: pasa. Los fallos (excepción, 5xx o una respuesta más lenta
+  que ``SCRAPER_CIRCUIT_SLOW_SECONDS``) se cuentan; tras
+  ``SCRAPER_CIRCUIT_FAILURES`` seguidos el circuito se abre
+- **abierto**: ``CircuitoAbierto`` al instante durante
+  ``SCRAPER_CIRCUIT_COOLDOWN`` segundos, sin tocar la red
+- **semiabierto**: vencida la espera, una sola descarga (el sondeo) sale a
+  la red; si va bien el circuito se cierra, si falla se vuelve a abrir
+
+El estado vive en el Redis del broker y se actualiza con un script Lua
+atómico, como el rate limit. Sin Redis se usa un estado local del proceso.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+
+from .ratelimit import dominio_de
+from .state import clave, get_redis
+
+logger = logging.getLogger(__name__)
+
+# ARGV: ok (1/0), umbral de fallos, segundos abierto, ahora
+REGISTRAR_LUA = """
+local ok = ARGV[1] == '1'
+local estado = redis.call('HGET', KEYS[1], 'estado') or 'cerrado'
+if ok then
+    redis.call('HSET', KEYS[1], 'estado', 'cerrado', 'fallos', 0)
+    redis.call('DEL', KEYS[2])
+    return 'cerrado'
+end
+local fallos = redis.call('HINCRBY', KEYS[1], 'fallos', 1)
+if estado == 'semiabierto' or fallos >= tonumber(ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'estado', 'abierto', 'hasta', tonumber(ARGV[4]) + tonumber(ARGV[3]))
+    redis.call('HINCRBY', KEYS[1], 'aperturas', 1)
+    redis.call('DEL', KEYS[2])
+    return 'abierto'
+end
+return estado
+"""
+
+_script = None
+_locales = {}
+_lock = threading.Lock()
+
+
+class CircuitoAbierto(Exception):
+    """El dominio está en espera: la descarga no sale a la red"""
+
+    def __init__(self, dominio, reintentar_en):
+        self.dominio = dominio
+        self.reintentar_en = max(0, round(reintentar_en))
+        if self.reintentar_en:
+            super().__init__(f"Circuito abierto para {dominio}: reintento en {self.reintentar_en}s")
+        else:
+            super().__init__(f"Circuito abierto para {dominio}: sondeo en curso")
+
+
+def activo():
+    return settings.SCRAPER_CIRCUIT_BREAKER and not settings.SCRAPER_REPLAY
+
+
+def es_fallo(error):
+    """Un 4xx es culpa de la URL, no del sitio: no abre el circuito"""
+    codigo = getattr(getattr(error, 'response', None), 'status_code', None)
+    return codigo is None or codigo >= 500
+
+
+# ===== ESTADO =====
+def _ttl_sondeo():
+    # El sondeo se da por perdido si el worker muere sin registrar su resultado
+    return int(settings.SCRAPER_CIRCUIT_COOLDOWN) + 120
+
+
+def _estado_local(dominio):
+    return _locales.setdefault(
+        dominio, {'estado': 'cerrado', 'fallos': 0, 'hasta': 0.0, 'aperturas': 0, 'sondeo': 0.0}
+    )
+
+
+def _comprobar_local(dominio, ahora):
+    with _lock:
+        estado = _estado_local(dominio)
+        if estado['estado'] == 'cerrado':
+            return
+        if ahora < estado['hasta']:
+            raise CircuitoAbierto(dominio, estado['hasta'] - ahora)
+        if estado['estado'] == 'semiabierto' and ahora - estado['sondeo'] < _ttl_sondeo():
+            raise CircuitoAbierto(dominio, 0)
+        estado.update(estado='semiabierto', sondeo=ahora)
+
+
+def _registrar_local(dominio, ok, ahora):
+    with _lock:
+        estado = _estado_local(dominio)
+        if ok:
+            estado.update(estado='cerrado', fallos=0)
+            return 'cerrado'
+        estado['fallos'] += 1
+        if estado['estado'] == 'semiabierto' or estado['fallos'] >= settings.SCRAPER_CIRCUIT_FAILURES:
+            estado.update(estado='abierto', hasta=ahora + settings.SCRAPER_CIRCUIT_COOLDOWN)
+            estado['aperturas'] += 1
+            return 'abierto'
+        return estado['estado']
+
+
+def comprobar(url):
+    """Deja pasar la descarga o lanza ``CircuitoAbierto``; en semiabierto solo pasa el sondeo"""
+    if not activo():
+        return
+    dominio = dominio_de(url)
+    ahora = time.time()
+    r = get_redis()
+    if r is None:
+        return _comprobar_local(dominio, ahora)
+    try:
+        estado = r.hgetall(clave('circuito', dominio))
+        if estado.get('estado', 'cerrado') == 'cerrado':
+            return
+        hasta = float(estado.get('hasta', 0))
+        if ahora < hasta:
+            raise CircuitoAbierto(dominio, hasta - ahora)
+        if not r.set(clave('circuito', dominio, 'sondeo'), ahora, nx=True, ex=_ttl_sondeo()):
+            raise CircuitoAbierto(dominio, 0)
+        r.hset(clave('circuito', dominio), 'estado', 'semiabierto')
+        logger.info(f"Circuito de {dominio} semiabierto: sondeando")
+    except CircuitoAbierto:
+        raise
+    except Exception as e:
+        logger.warning(f"No se pudo leer el circuito de {dominio}: {e}")
+
+
+def registrar(url, ok):
+    """Anota el resultado de una descarga y devuelve el estado del circuito"""
+    global _script
+    if not activo():
+        return None
+    dominio = dominio_de(url)
+    ahora = time.time()
+    r = get_redis()
+    if r is None:
+        estado = _registrar_local(dominio, ok, ahora)
+    else:
+        try:
+            if _script is None:
+                _script = r.register_script(REGISTRAR_LUA)
+            estado = _script(
+                keys=[clave('circuito', dominio), clave('circuito', dominio, 'sondeo')],
+                args=[1 if ok else 0, settings.SCRAPER_CIRCUIT_FAILURES, settings.SCRAPER_CIRCUIT_COOLDOWN, ahora],
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo registrar el circuito de {dominio}: {e}")
+            return None
+    if estado == 'abierto' and not ok:
+        logger.warning(f"Circuito de {dominio} abierto por {settings.SCRAPER_CIRCUIT_COOLDOWN:.0f}s")
+    return estado
+
+
+# ===== DESCARGAS =====
+def _resultado(url, inicio, error=None):
+    latencia = time.monotonic() - inicio
+    if error is not None:
+        registrar(url, not es_fallo(error))
+    else:
+        # Una respuesta que tarda demasiado cuenta como fallo aunque llegue
+        registrar(url, latencia <= settings.SCRAPER_CIRCUIT_SLOW_SECONDS)
+
+
+@contextmanager
+def vigilar(url):
+    """Envuelve una descarga: falla rápido con el circuito abierto y anota el resultado"""
+    comprobar(url)
+    inicio = time.monotonic()
+    try:
+        yield
+    except Exception as e:
+        _resultado(url, inicio, e)
+        raise
+    _resultado(url, inicio)
+
+
+@asynccontextmanager
+async def vigilar_async(url):
+    await asyncio.to_thread(comprobar, url)
+    inicio = time.monotonic()
+    try:
+        yield
+    except Exception as e:
+        await asyncio.to_thread(_resultado, url, inicio, e)
+        raise
+    await asyncio.to_thread(_resultado, url, inicio)
+
+
+def consultar(dominio):
+    """Estado, fallos seguidos, aperturas y segundos hasta el próximo sondeo"""
+    r = get_redis()
+    if r is None:
+        datos = dict(_locales.get(dominio, {}))
+    else:
+        try:
+            datos = r.hgetall(clave('circuito', dominio))
+        except Exception:
+            return {}
+    if not datos:
+        return {}
+    return {
+        'estado': datos.get('estado', 'cerrado'),
+        'fallos': int(datos.get('fallos', 0)),
+        'aperturas': int(datos.get('aperturas', 0)),
+        'reintento_en': max(0, round(float(datos.get('hasta', 0)) - time.time())),
+    }
@@ -0,0 +1,47 @@
+import argparse
+
+from django.core.management.base import BaseCommand
+
+from .core import ScraperEngine
+from .sections import get_seccion
+
+
+def agregar_opciones_incrementales(parser):
+    parser.add_argument(
+        '--incremental', action=argparse.BooleanOptionalAction, default=None,
+        help='Saltar noticias cuyo enlace ya está guardado (últimos SCRAPER_INCREMENTAL_DIAS); '
+             'sin --incremental/--no-incremental se usa SCRAPER_INCREMENTAL'
+    )
+    parser.add_argument(
+        '--stop-after', type=int, default=None,
+        help='En modo incremental, cortar tras K noticias conocidas seguidas (0 = sin corte)'
+    )
+
+
+def opciones_incrementales(options):
+    return {
+        'incremental': options.get('incremental'),
+        'parar_tras': options.get('stop_after'),
+    }
+
+
+class SectionCommand(BaseCommand):
+    """Comando base para los scrape_* de una sola sección del registro."""
+
+    seccion = None
+
+    def add_arguments(self, parser):
+        agregar_opciones_incrementales(parser)
+
+    def safe_write(self, message, style=None, ending='\n'):
+        """Escribe a stdout con flush inmediato para evitar bloqueos"""
+        if style:
+            message = style(message)
+        self.stdout.write(message, ending=ending)
+        self.stdout.flush()
+
+    def get_engine(self, **options):
+        return ScraperEngine(write=self.safe_write, **opciones_incrementales(options))
+
+    def handle(self, *args, **options):
+        self.get_engine(**options).run(get_seccion(self.seccion))
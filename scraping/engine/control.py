@@ -0,0 +1,37 @@
+"""
+Timeout y cancelación cooperativos.
+
+El motor llama a ``Cancelacion.verificar()`` en puntos seguros (antes de
+navegar, por cada tarjeta, antes de guardar). Si se pasó el límite de tiempo
+o alguien pidió cancelar la tarea (flag en Redis, ver ``state.py``) se lanza
+``ScrapeCancelado``; lo ya enviado al escritor en lotes queda guardado.
+"""
+import time
+
+from .state import cancelacion_solicitada
+
+
+class ScrapeCancelado(Exception):
+    def __init__(self, motivo):
+        super().__init__(f"Scraping detenido: {motivo}")
+        self.motivo = motivo
+
+
+class Cancelacion:
+    """Punto de control; sin ``task_id`` ni ``timeout`` nunca cancela."""
+
+    def __init__(self, task_id=None, timeout=None, intervalo=1.0):
+        self.task_id = task_id
+        self.limite = time.monotonic() + timeout if timeout else None
+        # Redis se consulta a lo sumo cada ``intervalo`` segundos
+        self.intervalo = intervalo
+        self._proxima_consulta = 0.0
+
+    def verificar(self):
+        ahora = time.monotonic()
+        if self.limite is not None and ahora > self.limite:
+            raise ScrapeCancelado('timeout')
+        if self.task_id and ahora >= self._proxima_consulta:
+            self._proxima_consulta = ahora + self.intervalo
+            if cancelacion_solicitada(self.task_id):
+                raise ScrapeCancelado('cancelado')
@@ -0,0 +1,543 @@
+"""
+Motor único de scraping.
+
+Interpreta las specs de ``scraping.engine.sections`` con un solo camino de
+código: navegar, cargar contenido lazy, extraer los campos de cada tarjeta
+y guardar en ``Noticia``. Los comandos ``scrape_*`` y las tareas Celery son
+envoltorios delgados sobre ``ScraperEngine``.
+"""
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.management.color import color_style
+from playwright.async_api import TimeoutError as AsyncTimeoutError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from .blocking import BloqueoRed, nuevas_stats
+from .browser import BrowserPool, rss_navegador_mb
+from .circuit import CircuitoAbierto, consultar, vigilar
+from .control import Cancelacion, ScrapeCancelado
+from .extract import (
+    EXTRACT_JS, argumentos_js, enlace_de_crudo, parsear_fecha, procesar_crudo, resolver_enlace,
+    urls_a_sondear,
+)
+from .fixtures import preparar_replay
+from .history import abrir_corrida, cerrar_corrida, registrar_seccion
+from .images import elegir_mejor_imagen, limpiar_url, mejorar_url_imagen
+from .incremental import cargar_enlaces_conocidos
+from .orm import en_hilo_orm
+from .pipeline import EscritorEnLotes
+from .probe import sondear
+from .progress import get_reporter
+from .ratelimit import adquirir, dominio_de, metricas
+from .scroll import scroll_hasta_estable
+from .sections import get_seccion
+from .state import registrar_tier, tier_preferido
+from .static import crudos_suficientes, descargar_html, extraer_crudos_html
+from .storage import guardar_noticias
+
+
+def _print_write(message, style=None):
+    print(style(message) if style else message, flush=True)
+
+
+class ScraperEngine:
+    """Ejecuta una o varias secciones del registro con el mismo código."""
+
+    def __init__(self, write=None, pool=None, extraccion=None, bloqueo=None,
+                 incremental=None, parar_tras=None, streaming=None, progreso=None,
+                 cancelacion=None, run_id=None):
+        self.write = write or _print_write
+        # Eventos JSON para quien lance el comando (ver progress.py)
+        self.progreso = progreso or get_reporter()
+        # Timeout/cancelación cooperativos (ver control.py)
+        self.cancelacion = cancelacion or Cancelacion()
+        self.style = color_style()
+        # Sin pool explícito cada run()/run_many() lanza y cierra el suyo
+        self.pool = pool
+        # 'bulk': un page.evaluate por página | 'locator': llamadas por campo
+        self.extraccion = extraccion or settings.SCRAPER_EXTRACTION_MODE
+        self.bloqueo = BloqueoRed(bloqueo)
+        # Incremental: saltar enlaces ya guardados y cortar tras K conocidos seguidos
+        self.incremental = settings.SCRAPER_INCREMENTAL if incremental is None else incremental
+        self.parar_tras = settings.SCRAPER_INCREMENTAL_STOP if parar_tras is None else parar_tras
+        self._conocidos = {}
+        # Streaming: un hilo escritor por sección guarda por lotes mientras se extrae
+        self.streaming = settings.SCRAPER_STREAMING if streaming is None else streaming
+        self._escritores = {}
+        # Historial: las secciones se registran en esta ScrapeRun (None = una propia)
+        self.run_id = run_id
+        self._timeouts = Counter()
+
+    def _contar_timeout(self, spec, error):
+        if isinstance(error, (PlaywrightTimeoutError, AsyncTimeoutError)):
+            self._timeouts[spec['slug']] += 1
+
+    # ===== EXTRACCIÓN POR CAMPO =====
+    def _texto(self, element, selector, timeout):
+        loc = element.locator(selector)
+        if not loc.count():
+            return None
+        return loc.first.inner_text(timeout=timeout).strip()
+
+    def obtener_fecha(self, spec, element):
+        fecha_str = None
+        try:
+            time_loc = element.locator(spec['fecha'])
+            if time_loc.count():
+                fecha_str = time_loc.first.get_attribute("datetime", timeout=spec['campo_timeout'])
+            if not fecha_str and spec['fecha_texto']:
+                fecha_str = self._texto(element, spec['fecha_texto'], spec['campo_timeout'])
+        except Exception:
+            pass
+        return parsear_fecha(fecha_str)
+
+    def obtener_imagen(self, spec, element):
+        """Elige la imagen de la tarjeta según la estrategia de la sección"""
+        try:
+            if spec['imagen_estrategia'] == 'mejor_resolucion':
+                return self._mejor_imagen(spec, element)
+
+            for selector in spec['imagen']:
+                img = element.locator(selector)
+                if not img.count():
+                    continue
+                src = img.first.get_attribute("src") or img.first.get_attribute("data-src")
+                if src:
+                    return limpiar_url(urljoin(spec['url'], src))
+        except Exception as e:
+            self.write(f"⚠️ Error obteniendo imagen: {e}")
+        return None
+
+    def _mejor_imagen(self, spec, element):
+        dominio = spec['imagen_dominio']
+        candidatos = []
+        for selector in spec['imagen']:
+            try:
+                for img in element.locator(selector).all():
+                    candidatos.append(img.get_attribute("src"))
+                    candidatos.append(img.get_attribute("data-src"))
+            except Exception:
+                continue
+
+        mejor_imagen, mejor_resolucion = elegir_mejor_imagen(candidatos, dominio)
+        # Si no encontramos imagen de alta calidad, intentar mejorar una existente
+        if not mejor_imagen or mejor_resolucion < 300:
+            mejor_imagen = self._intentar_mejorar_imagen(dominio, element)
+        return mejor_imagen
+
+    def _intentar_mejorar_imagen(self, dominio, element):
+        try:
+            img = element.locator(f"img[src*='{dominio}'], img[data-src*='{dominio}']")
+            if img.count():
+                src = img.first.get_attribute("src") or img.first.get_attribute("data-src")
+                if src:
+                    return mejorar_url_imagen(limpiar_url(src))
+        except Exception:
+            pass
+        return None
+
+    def obtener_enlace(self, spec, element):
+        """Primer enlace que pasa el filtro de la sección, como URL absoluta"""
+        for selector in spec['enlace']:
+            try:
+                link = element.locator(selector)
+                if not link.count():
+                    continue
+                href = link.first.get_attribute("href") or link.first.get_attribute("data-mrf-link")
+                href = resolver_enlace(spec, href)
+                if href:
+                    return href
+            except Exception:
+                continue
+        return None
+
+    def extraer_item(self, spec, element):
+        """Extrae los campos de una tarjeta; None si debe descartarse"""
+        timeout = spec['campo_timeout']
+
+        try:
+            titulo = self._texto(element, spec['titulo'], timeout)
+        except Exception as e:
+            self._contar_timeout(spec, e)
+            titulo = None
+        if not titulo:
+            if spec['titulo_requerido']:
+                return None
+            titulo = "Sin título"
+
+        try:
+            autor = self._texto(element, spec['autor'], timeout)
+        except Exception as e:
+            self._contar_timeout(spec, e)
+            autor = None
+
+        enlace = self.obtener_enlace(spec, element)
+        if not enlace and spec['enlace_requerido']:
+            return None
+
+        return {
+            'titulo': titulo,
+            'autor': autor or spec['autor_defecto'],
+            'fecha': self.obtener_fecha(spec, element),
+            'imagen': self.obtener_imagen(spec, element),
+            'enlace': enlace,
+        }
+
+    # ===== NAVEGACIÓN =====
+    def cargar_pagina(self, spec, page, resumen):
+        self.write(f"🌐 Navegando a {spec['nombre']}...")
+        self.progreso.fase(spec['slug'], 'navegando')
+        self.cancelacion.verificar()
+        resumen['espera_limite'] += adquirir(spec['url'])
+        with vigilar(spec['url']):
+            page.goto(spec['url'], timeout=60000, wait_until="domcontentloaded")
+            page.wait_for_selector(spec['wait_selector'], timeout=15000)
+
+        if spec['scroll']:
+            self.progreso.fase(spec['slug'], 'scroll')
+            resumen['scroll_iteraciones'] = scroll_hasta_estable(page, spec)
+            self.write(f"📜 Scroll estable tras {resumen['scroll_iteraciones']} iteración(es)")
+        # Con todo el contenido cargado el navegador está en su pico de memoria
+        resumen['rss_navegador_mb'] = round(rss_navegador_mb(), 1)
+
+    def scrape_page(self, spec, page, resumen):
+        """Navega y extrae todas las tarjetas de la sección"""
+        self.cargar_pagina(spec, page, resumen)
+
+        self.progreso.fase(spec['slug'], 'extrayendo')
+        if self.extraccion == 'bulk':
+            noticias = page.evaluate(EXTRACT_JS, argumentos_js(spec))
+            return self.procesar_crudos(spec, noticias, resumen)
+
+        noticias = page.locator(spec['item']).all()
+        return self.procesar_noticias(
+            spec, noticias, resumen,
+            partial(self.extraer_item, spec), partial(self.obtener_enlace, spec),
+        )
+
+    def procesar_crudos(self, spec, crudos, resumen, sondeos=None):
+        if sondeos is None:
+            sondeos = sondear(self.imagenes_a_sondear(spec, crudos))
+        return self.procesar_noticias(
+            spec, crudos, resumen,
+            partial(procesar_crudo, spec, sondeos=sondeos), partial(enlace_de_crudo, spec),
+        )
+
+    def imagenes_a_sondear(self, spec, crudos):
+        """Candidatos de imagen de las tarjetas que se van a procesar (las conocidas se saltan)"""
+        conocidos = self._conocidos.get(spec['origen'])
+        if conocidos:
+            crudos = [c for c in crudos if enlace_de_crudo(spec, c) not in conocidos]
+        return urls_a_sondear(spec, crudos)
+
+    def procesar_noticias(self, spec, noticias, resumen, procesar, enlace_de=None):
+        """Aplica ``procesar`` a cada tarjeta y acumula los items válidos.
+
+        En modo incremental ``enlace_de`` obtiene solo el enlace de la tarjeta
+        para descartar las ya conocidas antes de extraer el resto de campos.
+        """
+        items = []
+        total = len(noticias)
+        resumen['encontradas'] = total
+        self.write(f"📰 Se encontraron {total} noticias.")
+        self.progreso.emitir('encontradas', spec['slug'], total=total)
+        conocidos = self._conocidos.get(spec['origen']) if enlace_de else None
+        seguidas = 0
+
+        for i, noticia in enumerate(noticias):
+            self.cancelacion.verificar()
+            try:
+                self.progreso.emitir('procesada', spec['slug'], i=i + 1, total=total)
+                if conocidos is not None:
+                    if enlace_de(noticia) in conocidos:
+                        resumen['conocidas'] += 1
+                        seguidas += 1
+                        if self.parar_tras and seguidas >= self.parar_tras:
+                            self.write(f"⏹️ {seguidas} noticias conocidas seguidas, se corta el recorrido")
+                            resumen['corte_incremental'] = True
+                            break
+                        continue
+                    seguidas = 0
+                data = procesar(noticia)
+                if data is None:
+                    resumen['saltadas'] += 1
+                    continue
+                self.emitir(spec, items, data)
+            except Exception as e:
+                resumen['saltadas'] += 1
+                self.write(f"❌ Error procesando noticia {i+1}: {e}")
+                continue
+        return items
+
+    def emitir(self, spec, items, data):
+        """Entrega un item al escritor de la sección o lo acumula en ``items``"""
+        escritor = self._escritores.get(spec['slug'])
+        if escritor is not None:
+            escritor.put(data)
+        else:
+            items.append(data)
+
+    # ===== TIER HTTP ESTÁTICO =====
+    def usar_estatico(self, spec):
+        if not (settings.SCRAPER_STATIC_TIER and spec['estatico']):
+            return False
+        # Si la última vez el HTML no alcanzó, ir directo al navegador
+        return tier_preferido(spec['slug']) != 'browser'
+
+    def intentar_estatico(self, spec, resumen):
+        """Scrapea sin navegador; devuelve None si hay que caer a Playwright"""
+        self.progreso.fase(spec['slug'], 'estatico')
+        resumen['requests'] += 1
+        try:
+            crudos = extraer_crudos_html(descargar_html(spec['url']), spec)
+        except CircuitoAbierto:
+            # Sin sentido probar con el navegador: el dominio está en espera
+            raise
+        except Exception as e:
+            self.write(f"⚠️ Descarga HTTP falló ({e}), usando navegador")
+            registrar_tier(spec['slug'], 'browser')
+            return None
+
+        if not crudos_suficientes(spec, crudos):
+            self.write(f"⚠️ HTML estático incompleto ({len(crudos)} tarjetas), usando navegador")
+            registrar_tier(spec['slug'], 'browser')
+            return None
+
+        self.write(f"⚡ {spec['nombre']} servido sin navegador")
+        registrar_tier(spec['slug'], 'static')
+        resumen['tier'] = 'static'
+        return self.procesar_crudos(spec, crudos, resumen)
+
+    # ===== EJECUCIÓN =====
+    def _nuevo_resumen(self, spec):
+        return {
+            'seccion': spec['slug'],
+            'encontradas': 0,
+            'saltadas': 0,
+            'nuevas': 0,
+            'actualizadas': 0,
+            'errores': 0,
+            'tier': 'browser',
+            'scroll_iteraciones': 0,
+            'conocidas': 0,
+            'corte_incremental': False,
+            'espera_limite': 0.0,
+            'paginas': 0,
+            'requests': 0,
+            'timeouts_selector': 0,
+            'rss_navegador_mb': 0.0,
+        }
+
+    def preparar_incremental(self, spec):
+        """Precarga (una vez por origen) los enlaces ya guardados"""
+        if not self.incremental or spec['origen'] in self._conocidos:
+            return
+        conocidos = cargar_enlaces_conocidos(spec['origen'], settings.SCRAPER_INCREMENTAL_DIAS)
+        self._conocidos[spec['origen']] = conocidos
+        self.write(f"🧠 {len(conocidos)} enlaces conocidos de {spec['origen']} en memoria")
+
+    @contextmanager
+    def historial(self, spec, resumen):
+        """Registra la sección en ScrapeRun/ScrapeSectionRun al terminar, con o sin error"""
+        inicio = time.time()
+        propia = self.run_id is None
+        run_id = self.run_id or uuid.uuid4().hex
+        if propia:
+            abrir_corrida(run_id, 'seccion', 1, inicio)
+        error = ''
+        try:
+            yield
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            resumen['timeouts_selector'] += self._timeouts.pop(spec['slug'], 0)
+            registrar_seccion(run_id, spec, resumen, inicio, time.time(), error or resumen.get('fallo', ''))
+            if propia:
+                cerrar_corrida(run_id)
+
+    def run(self, seccion):
+        """Scrapea una sección (slug o spec) y devuelve el resumen"""
+        spec = get_seccion(seccion) if isinstance(seccion, str) else seccion
+        resumen = self._nuevo_resumen(spec)
+        with self.historial(spec, resumen):
+            return self._run(spec, resumen)
+
+    def _run(self, spec, resumen):
+        inicio = time.time()
+        self.cancelacion.verificar()
+        en_hilo_orm(self.preparar_incremental, spec)
+        self.progreso.emitir('inicio', spec['slug'], nombre=spec['nombre'])
+
+        self.iniciar_escritor(spec)
+        try:
+            items = self.intentar_estatico(spec, resumen) if self.usar_estatico(spec) else None
+            if items is None:
+                items = self.scrape_browser(spec, resumen)
+        finally:
+            # Lo ya extraído se guarda aunque el navegador haya fallado a mitad
+            self.cerrar_escritor(spec, resumen)
+
+        en_hilo_orm(self.guardar, spec, items, resumen)
+        resumen['duracion'] = round(time.time() - inicio, 2)
+        self.progreso.emitir('fin', spec['slug'], resumen=resumen)
+        self.write(self.style.SUCCESS(f"✅ Scraping de {spec['nombre']} finalizado!"))
+        return resumen
+
+    def scrape_browser(self, spec, resumen):
+        """Tier Playwright: un contexto aislado del pool por sección"""
+        if self.pool is None:
+            with self._pool_temporal():
+                return self.scrape_browser(spec, resumen)
+
+        items = []
+        red = nuevas_stats()
+        try:
+            items = self.pool.ejecutar(self._scrape_en_navegador, spec, resumen, red)
+        except (ScrapeCancelado, CircuitoAbierto):
+            raise
+        except Exception as e:
+            self._contar_timeout(spec, e)
+            resumen['fallo'] = str(e)
+            self.write(self.style.ERROR(f"❌ Error durante el scraping: {e}"))
+        resumen.update(red)
+        return items
+
+    def _scrape_en_navegador(self, spec, resumen, red):
+        """Corre en el hilo del pool: los objetos de Playwright no salen de ahí"""
+        with self.pool.context() as context:
+            if self.bloqueo.activo:
+                context.route("**/*", self.bloqueo.handler(spec, red))
+            if settings.SCRAPER_REPLAY:
+                # Registrado después: el HAR responde antes que el bloqueo
+                preparar_replay(context, spec)
+            page = context.new_page()
+            resumen['paginas'] += 1
+            page.on("request", partial(self._contar_request, resumen))
+            return self.scrape_page(spec, page, resumen)
+
+    @staticmethod
+    def _contar_request(resumen, request):
+        resumen['requests'] += 1
+
+    @contextmanager
+    def corrida(self, tipo, total):
+        """ScrapeRun propia para las secciones que se corran dentro del bloque"""
+        self.run_id = uuid.uuid4().hex
+        abrir_corrida(self.run_id, tipo, total, time.time())
+        try:
+            yield self.run_id
+        finally:
+            cerrar_corrida(self.run_id)
+            self.run_id = None
+
+    def run_many(self, secciones):
+        """Scrapea varias secciones en orden; un fallo no detiene al resto"""
+        if self.pool is None:
+            with self._pool_temporal():
+                return self.run_many(secciones)
+        if self.run_id is None:
+            with self.corrida('comando', len(secciones)):
+                return self.run_many(secciones)
+
+        resumenes = []
+        for seccion in secciones:
+            try:
+                resumenes.append(self.run(seccion))
+            except Exception as e:
+                slug = seccion if isinstance(seccion, str) else seccion['slug']
+                self.write(self.style.ERROR(f"❌ Error en la sección {slug}: {e}"))
+                resumenes.append({'seccion': slug, 'error': str(e)})
+
+        stats = self.pool.stats
+        if stats.get('conexiones'):
+            self.write(
+                f"🚀 Chromium compartido: {stats['conexiones']} conexión(es) al servidor para "
+                f"{len(resumenes)} secciones, {stats['lanzamientos']} lanzamiento(s) locales"
+            )
+        else:
+            self.write(
+                f"🚀 Chromium: {stats['lanzamientos']} lanzamiento(s) para {len(resumenes)} secciones "
+                f"({stats['reciclajes']} reciclajes), ~{self.pool.ahorro_estimado()}s de arranque ahorrados"
+            )
+        if self.bloqueo.activo:
+            self.write(f"🛡️ Bloqueo de red ({self.bloqueo.nombre}): {self.bloqueo.resumen()}")
+        specs = [get_seccion(s) if isinstance(s, str) else s for s in secciones]
+        for dominio in sorted({dominio_de(spec['url']) for spec in specs}):
+            datos = metricas(dominio)
+            if datos:
+                self.write(
+                    f"⏳ Rate limit {dominio}: {datos['esperas']}/{datos['adquisiciones']} esperas, "
+                    f"{datos['espera_total']}s total, máx {datos['espera_max']}s"
+                )
+            circuito = consultar(dominio)
+            if circuito.get('aperturas'):
+                self.write(
+                    f"🔌 Circuito {dominio}: {circuito['estado']}, {circuito['aperturas']} apertura(s), "
+                    f"{circuito['fallos']} fallo(s) seguidos"
+                )
+        self.write("📜 Iteraciones de scroll: " + ", ".join(
+            f"{r['seccion']}={r.get('scroll_iteraciones', 0)}" for r in resumenes
+        ))
+        return resumenes
+
+    @contextmanager
+    def _pool_temporal(self):
+        self.pool = BrowserPool()
+        try:
+            yield self.pool
+        finally:
+            self.pool.close()
+            self.pool = None
+
+    def iniciar_escritor(self, spec):
+        if not self.streaming:
+            return
+        self._escritores[spec['slug']] = EscritorEnLotes(
+            spec, write=self.write,
+            lote=settings.SCRAPER_WRITER_BATCH,
+            intervalo=settings.SCRAPER_WRITER_INTERVAL,
+            capacidad=settings.SCRAPER_WRITER_QUEUE,
+            al_guardar=partial(self.registrar_guardadas, spec),
+            progreso=self.progreso,
+        )
+
+    def cerrar_escritor(self, spec, resumen):
+        escritor = self._escritores.pop(spec['slug'], None)
+        if escritor is None:
+            return
+        self.progreso.fase(spec['slug'], 'guardando')
+        resumen.update(escritor.cerrar())
+        self.imprimir_resumen(resumen)
+
+    def registrar_guardadas(self, spec, items):
+        conocidos = self._conocidos.get(spec['origen'])
+        if conocidos is not None:
+            # Otras secciones del mismo origen ya no reprocesan lo recién guardado
+            conocidos.update(item['enlace'] for item in items if item.get('enlace'))
+
+    def guardar(self, spec, items, resumen):
+        if not items:
+            return
+        self.write(f"💾 Guardando {len(items)} noticias...")
+        self.progreso.fase(spec['slug'], 'guardando')
+        resumen.update(guardar_noticias(spec, items, write=self.write))
+        self.registrar_guardadas(spec, items)
+        self.imprimir_resumen(resumen)
+
+    def imprimir_resumen(self, resumen):
+        self.write("📊 Resumen:")
+        self.write(f"  ✅ Noticias nuevas: {resumen['nuevas']}")
+        self.write(f"  🔄 Noticias actualizadas: {resumen['actualizadas']}")
+        self.write(f"  ⚪ Saltadas / sin título: {resumen['saltadas']}")
+        if self.incremental:
+            self.write(f"  🧠 Ya conocidas: {resumen['conocidas']}")
+        if resumen.get('espera_limite'):
+            self.write(f"  ⏳ Espera por rate limit: {resumen['espera_limite']:.2f}s")
+        self.write(f"  ❌ Errores: {resumen['errores']}")
@@ -0,0 +1,170 @@
+"""
+Extracción en bloque: un solo ``page.evaluate`` por página.
+
+En vez de varias llamadas ``locator().inner_text()``/``get_attribute()`` por
+tarjeta (cada una es un round trip al navegador con su propio timeout), el
+script ``EXTRACT_JS`` recorre todas las tarjetas dentro del navegador y
+devuelve sus campos crudos como un arreglo JSON. El post-procesamiento en
+Python (fechas, elección de imagen, URLs absolutas) se hace en memoria con
+``procesar_crudo``.
+"""
+from datetime import datetime
+from urllib.parse import urljoin
+
+from django.utils import timezone
+
+from scraping.utils.canonical import canonicalizar_url
+from .images import elegir_mejor_imagen, es_imagen_valida, imagen_mejorada, limpiar_url, mejorar_url_imagen
+
+EXTRACT_JS = """
+(spec) => {
+    const texto = (el, sel) => {
+        if (!sel) return null;
+        const n = el.querySelector(sel);
+        return n ? (n.innerText || n.textContent || '').trim() : null;
+    };
+    return Array.from(document.querySelectorAll(spec.item)).map((el) => {
+        const time = spec.fecha ? el.querySelector(spec.fecha) : null;
+        const imagenes = spec.imagen.map((sel) =>
+            Array.from(el.querySelectorAll(sel)).map((img) =>
+                [img.getAttribute('src'), img.getAttribute('data-src')]
+            )
+        );
+        const enlaces = spec.enlace.map((sel) => {
+            const a = el.querySelector(sel);
+            return a ? (a.getAttribute('href') || a.getAttribute('data-mrf-link')) : null;
+        });
+        let mejorable = null;
+        if (spec.dominio) {
+            const img = el.querySelector(
+                `img[src*='${spec.dominio}'], img[data-src*='${spec.dominio}']`
+            );
+            if (img) mejorable = img.getAttribute('src') || img.getAttribute('data-src');
+        }
+        return {
+            titulo: texto(el, spec.titulo),
+            autor: texto(el, spec.autor),
+            fecha: time ? time.getAttribute('datetime') : null,
+            fecha_texto: texto(el, spec.fecha_texto),
+            imagenes: imagenes,
+            enlaces: enlaces,
+            mejorable: mejorable,
+        };
+    });
+}
+"""
+
+
+def parsear_fecha(fecha_str):
+    """Convierte el atributo datetime (ISO 8601) en fecha; si falla, ahora en Lima"""
+    try:
+        if fecha_str:
+            return datetime.fromisoformat(fecha_str.strip().replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    return timezone.localtime(timezone.now())
+
+
+def resolver_enlace(spec, href):
+    """URL canónica de ``href`` si pasa el filtro de la sección, o None"""
+    href = canonicalizar_url(href, base=spec['url'])
+    return href if href and spec['filtro_enlace'] in href else None
+
+
+def enlace_de_crudo(spec, crudo):
+    """Primer enlace candidato de la tarjeta que pasa el filtro de la sección"""
+    for href in crudo['enlaces']:
+        enlace = resolver_enlace(spec, href)
+        if enlace:
+            return enlace
+    return None
+
+
+def argumentos_js(spec):
+    """Subconjunto serializable de la spec que necesita EXTRACT_JS"""
+    return {
+        'item': spec['item'],
+        'titulo': spec['titulo'],
+        'autor': spec['autor'],
+        'fecha': spec['fecha'],
+        'fecha_texto': spec['fecha_texto'],
+        'imagen': list(spec['imagen']),
+        'enlace': list(spec['enlace']),
+        'dominio': spec['imagen_dominio'],
+    }
+
+
+def _candidatos(crudo):
+    return [src for grupo in crudo['imagenes'] for par in grupo for src in par]
+
+
+def _sondeable(spec, src):
+    """URL absoluta del candidato si vale la pena sondearla, si no None"""
+    if not src:
+        return None
+    url = urljoin(spec['url'], limpiar_url(src))
+    # data:, placeholders, svg y dominios ajenos no se sondean: no se elegirían
+    # y su "dominio" terminaría como clave del rate limit
+    if not es_imagen_valida(url):
+        return None
+    if spec['imagen_dominio'] and spec['imagen_dominio'] not in url:
+        return None
+    return url
+
+
+def urls_a_sondear(spec, crudos):
+    """Candidatos de imagen de todas las tarjetas, más su versión mejorada"""
+    if spec['imagen_estrategia'] != 'mejor_resolucion':
+        return set()
+    urls = set()
+    for crudo in crudos:
+        urls.update(_sondeable(spec, src) for src in _candidatos(crudo))
+        mejorable = _sondeable(spec, crudo['mejorable'])
+        if mejorable:
+            urls.add(mejorar_url_imagen(mejorable))
+    urls.discard(None)
+    return urls
+
+
+def _imagen_desde_crudo(spec, crudo, sondeos=None):
+    if spec['imagen_estrategia'] == 'mejor_resolucion':
+        mejor_imagen, mejor_resolucion = elegir_mejor_imagen(_candidatos(crudo), spec['imagen_dominio'], sondeos)
+        if not mejor_imagen or mejor_resolucion < 300:
+            mejor_imagen = imagen_mejorada(limpiar_url(crudo['mejorable']), sondeos) if crudo['mejorable'] else None
+        return mejor_imagen
+
+    for grupo in crudo['imagenes']:
+        if grupo:
+            src = grupo[0][0] or grupo[0][1]
+            if src:
+                return limpiar_url(urljoin(spec['url'], src))
+    return None
+
+
+def procesar_crudo(spec, crudo, sondeos=None):
+    """Convierte los campos crudos de una tarjeta en el dict de noticia.
+
+    Devuelve None si la tarjeta debe descartarse según la spec. Con
+    ``sondeos`` la imagen se elige (y se mide) con datos reales.
+    """
+    titulo = crudo.get('titulo')
+    if not titulo:
+        if spec['titulo_requerido']:
+            return None
+        titulo = "Sin título"
+
+    enlace = enlace_de_crudo(spec, crudo)
+    if not enlace and spec['enlace_requerido']:
+        return None
+
+    data = {
+        'titulo': titulo,
+        'autor': crudo.get('autor') or spec['autor_defecto'],
+        'fecha': parsear_fecha(crudo.get('fecha') or crudo.get('fecha_texto')),
+        'imagen': _imagen_desde_crudo(spec, crudo, sondeos),
+        'enlace': enlace,
+    }
+    sondeo = sondeos.get(data['imagen']) if sondeos and data['imagen'] else None
+    if sondeo is not None and (sondeo.ancho or sondeo.alto):
+        data['imagen_ancho'], data['imagen_alto'] = sondeo.ancho, sondeo.alto
+    return data
@@ -0,0 +1,147 @@
+"""
+Corpus de páginas grabadas para correr los scrapers sin red.
+
+``grabar_seccion`` guarda, por sección, en ``SCRAPER_FIXTURES_DIR/<slug>/``:
+
+- ``pagina.har``: tráfico completo del navegador (HTML, XHR del scroll,
+  assets) con el contenido embebido
+- ``listado.html``: el HTML crudo del listado, tal como lo ve el tier HTTP
+- ``articulos/<sha1>.html``: las primeras notas del listado (las que lee el
+  análisis con ``scrape_contenido_noticia``)
+- ``manifest.json``: URL canónica → archivo, fecha de grabación
+
+Con ``SCRAPER_REPLAY=True`` el motor no sale a la red: el navegador
+responde desde el HAR con ``route_from_har`` (lo que no está grabado se
+aborta) y ``descargar_html``/el análisis leen los HTML del corpus.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+from scraping.models import hash_enlace
+from scraping.utils.canonical import canonicalizar_url
+
+from .extract import EXTRACT_JS, argumentos_js, enlace_de_crudo
+from .scroll import scroll_hasta_estable
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+HAR = 'pagina.har'
+LISTADO = 'listado.html'
+
+
+class FixtureFaltante(LookupError):
+    """La URL pedida no está en el corpus grabado"""
+
+
+def carpeta_seccion(slug):
+    return Path(settings.SCRAPER_FIXTURES_DIR) / slug
+
+
+def ruta_har(slug):
+    """HAR grabado de la sección, o None si no hay"""
+    ruta = carpeta_seccion(slug) / HAR
+    return ruta if ruta.exists() else None
+
+
+def _escribir(ruta, texto):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_text(texto, encoding='utf-8')
+
+
+def _grabar_listado(pool, spec, har):
+    with pool.context(record_har_path=str(har), record_har_content='embed') as context:
+        page = context.new_page()
+        page.goto(spec['url'], timeout=60000, wait_until="domcontentloaded")
+        page.wait_for_selector(spec['wait_selector'], timeout=15000)
+        scroll_hasta_estable(page, spec)
+        return page.evaluate(EXTRACT_JS, argumentos_js(spec))
+
+
+def grabar_seccion(pool, spec, articulos=5, write=print):
+    """Graba listado (HAR + HTML crudo) y hasta ``articulos`` notas de la sección"""
+    from .static import descargar_html
+
+    carpeta = carpeta_seccion(spec['slug'])
+    carpeta.mkdir(parents=True, exist_ok=True)
+    paginas = {}
+
+    write(f"🎥 Grabando {spec['nombre']} en {carpeta}")
+    # El HAR se escribe al cerrar el contexto
+    crudos = pool.ejecutar(_grabar_listado, pool, spec, carpeta / HAR)
+
+    _escribir(carpeta / LISTADO, descargar_html(spec['url']))
+    paginas[canonicalizar_url(spec['url'])] = LISTADO
+
+    enlaces = []
+    for crudo in crudos:
+        enlace = enlace_de_crudo(spec, crudo)
+        if enlace and enlace not in enlaces:
+            enlaces.append(enlace)
+
+    for enlace in enlaces[:articulos]:
+        archivo = f"articulos/{hash_enlace(enlace)}.html"
+        try:
+            _escribir(carpeta / archivo, descargar_html(enlace))
+        except Exception as e:
+            write(f"  ⚠️ No se pudo grabar {enlace}: {e}")
+            continue
+        paginas[enlace] = archivo
+
+    _escribir(carpeta / MANIFEST, json.dumps({
+        'seccion': spec['slug'],
+        'url': spec['url'],
+        'grabado': datetime.now().isoformat(timespec='seconds'),
+        'tarjetas': len(crudos),
+        'paginas': paginas,
+    }, ensure_ascii=False, indent=2))
+    indice_corpus.cache_clear()
+    write(f"  ✅ {len(crudos)} tarjetas, {len(paginas) - 1} artículos grabados")
+    return paginas
+
+
+@lru_cache(maxsize=1)
+def indice_corpus():
+    """URL canónica → ruta del HTML grabado, de todos los manifests"""
+    indice = {}
+    raiz = Path(settings.SCRAPER_FIXTURES_DIR)
+    if not raiz.is_dir():
+        return indice
+    for manifest in sorted(raiz.glob(f'*/{MANIFEST}')):
+        try:
+            datos = json.loads(manifest.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifest inválido {manifest}: {e}")
+            continue
+        for url, archivo in datos.get('paginas', {}).items():
+            indice[url] = manifest.parent / archivo
+    return indice
+
+
+def html_grabado(url):
+    """HTML grabado para ``url``; FixtureFaltante si no está en el corpus"""
+    ruta = indice_corpus().get(canonicalizar_url(url) or url)
+    if ruta is None or not os.path.exists(ruta):
+        raise FixtureFaltante(f"Sin fixture para {url}")
+    return ruta.read_text(encoding='utf-8')
+
+
+def preparar_replay(context, spec):
+    """Sirve el contexto desde el HAR de la sección (sin red)"""
+    har = ruta_har(spec['slug'])
+    if har is None:
+        raise FixtureFaltante(f"Sin HAR grabado para {spec['slug']}")
+    context.route_from_har(str(har), not_found='abort')
+
+
+async def preparar_replay_async(context, spec):
+    har = ruta_har(spec['slug'])
+    if har is None:
+        raise FixtureFaltante(f"Sin HAR grabado para {spec['slug']}")
+    await context.route_from_har(str(har), not_found='abort')
@@ -0,0 +1,145 @@
+"""
+Historial persistente de corridas (``ScrapeRun`` / ``ScrapeSectionRun``).
+
+El motor escribe una fila por sección al terminarla, con el resumen que ya
+arma (tier, items, timeouts, memoria...). Las secciones cuelgan de una
+``ScrapeRun``: la del chord completo (creada al repartirlo), la de un
+comando ``run_many`` o una propia si la sección corre suelta.
+
+Las funciones se pueden llamar desde cualquier hilo (``orm_seguro``) y un
+error de la base se propaga: una corrida que no se pudo abrir o cerrar no
+queda ``en_curso`` en silencio.
+"""
+import resource
+from datetime import datetime, timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from scraping.models import ScrapeRun, ScrapeSectionRun
+from .orm import orm_seguro
+
+CAMPOS_TOTALES = ('encontradas', 'nuevas', 'actualizadas', 'saltadas', 'errores')
+
+
+def _fecha(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.get_current_timezone())
+
+
+@orm_seguro
+def abrir_corrida(run_id, tipo, secciones_total=0, inicio=None):
+    corrida, _ = ScrapeRun.objects.get_or_create(run_id=run_id, defaults={
+        'tipo': tipo,
+        'inicio': _fecha(inicio) if inicio else timezone.now(),
+        'secciones_total': secciones_total,
+    })
+    return corrida
+
+
+@orm_seguro
+def registrar_seccion(run_id, spec, resumen, inicio, fin, error=''):
+    corrida = ScrapeRun.objects.filter(run_id=run_id).first()
+    if corrida is None:
+        corrida = abrir_corrida(run_id, 'seccion', 1, inicio)
+    return ScrapeSectionRun.objects.create(
+        corrida=corrida,
+        seccion=spec['slug'],
+        origen=spec['origen'],
+        inicio=_fecha(inicio),
+        fin=_fecha(fin),
+        duracion=round(fin - inicio, 3),
+        tier=resumen.get('tier', ''),
+        paginas=resumen.get('paginas', 0),
+        requests=resumen.get('requests', 0),
+        requests_bloqueados=resumen.get('requests_bloqueados', 0),
+        encontradas=resumen.get('encontradas', 0),
+        nuevas=resumen.get('nuevas', 0),
+        actualizadas=resumen.get('actualizadas', 0),
+        saltadas=resumen.get('saltadas', 0),
+        errores=resumen.get('errores', 0),
+        conocidas=resumen.get('conocidas', 0),
+        timeouts_selector=resumen.get('timeouts_selector', 0),
+        rss_navegador_mb=resumen.get('rss_navegador_mb', 0.0),
+        rss_proceso_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        espera_limite=round(resumen.get('espera_limite', 0.0), 3),
+        error=error,
+    )
+
+
+@orm_seguro
+def cerrar_corrida(run_id, fin=None):
+    """Totales y estado de la corrida a partir de sus secciones"""
+    corrida = ScrapeRun.objects.get(run_id=run_id)
+    secciones = corrida.secciones.all()
+    totales = secciones.aggregate(**{campo: Sum(campo) for campo in CAMPOS_TOTALES})
+    for campo in CAMPOS_TOTALES:
+        setattr(corrida, campo, totales[campo] or 0)
+    # Una sección que falló y luego salió bien en un reintento no cuenta como fallida
+    con_error = set(secciones.exclude(error='').values_list('seccion', flat=True))
+    sin_error = set(secciones.filter(error='').values_list('seccion', flat=True))
+    fallidas = len(con_error - sin_error)
+    terminadas = len(con_error | sin_error)
+    esperadas = max(corrida.secciones_total, terminadas)
+    if not terminadas or fallidas == terminadas:
+        corrida.estado = 'error'
+    elif fallidas or terminadas < esperadas:
+        corrida.estado = 'parcial'
+    else:
+        corrida.estado = 'ok'
+    corrida.fin = _fecha(fin) if fin else timezone.now()
+    corrida.duracion = round((corrida.fin - corrida.inicio).total_seconds(), 2)
+    corrida.save()
+    return corrida
+
+
+def tendencias(dias=14):
+    """Agregados diarios y comparación de throughput por sección (semana vs. anterior)"""
+    desde = timezone.now() - timedelta(days=dias)
+    filas = ScrapeSectionRun.objects.filter(inicio__gte=desde)
+
+    diario = []
+    for dia in filas.dates('inicio', 'day', order='DESC'):
+        del_dia = filas.filter(inicio__date=dia)
+        agregados = del_dia.aggregate(
+            encontradas=Sum('encontradas'), nuevas=Sum('nuevas'), errores=Sum('errores'),
+            timeouts=Sum('timeouts_selector'), duracion=Sum('duracion'),
+        )
+        diario.append({
+            'dia': dia,
+            'secciones': del_dia.count(),
+            'fallidas': del_dia.exclude(error='').count(),
+            'rss_max': max(del_dia.values_list('rss_navegador_mb', flat=True), default=0),
+            'articulos_por_segundo': _por_segundo(agregados['encontradas'], agregados['duracion']),
+            **agregados,
+        })
+
+    ahora = timezone.now()
+    reciente = _throughput_por_seccion(ahora - timedelta(days=7), ahora)
+    anterior = _throughput_por_seccion(ahora - timedelta(days=14), ahora - timedelta(days=7))
+    secciones = []
+    for seccion, actual in sorted(reciente.items()):
+        previo = anterior.get(seccion)
+        cambio = round((actual - previo) / previo * 100, 1) if previo else None
+        secciones.append({
+            'seccion': seccion,
+            'actual': actual,
+            'anterior': previo,
+            'cambio': cambio,
+            # Caída de más de un 20% en artículos/s: posible regresión
+            'regresion': cambio is not None and cambio < -20,
+        })
+    return {'diario': diario, 'secciones': secciones}
+
+
+def _por_segundo(encontradas, duracion):
+    return round((encontradas or 0) / duracion, 2) if duracion else 0.0
+
+
+def _throughput_por_seccion(desde, hasta):
+    agregados = (
+        ScrapeSectionRun.objects.filter(inicio__gte=desde, inicio__lt=hasta, error='')
+        .order_by()
+        .values('seccion')
+        .annotate(total=Sum('encontradas'), segundos=Sum('duracion'))
+    )
+    return {a['seccion']: _por_segundo(a['total'], a['segundos']) for a in agregados}
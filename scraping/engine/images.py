@@ -0,0 +1,145 @@
+"""Utilidades compartidas para validar y comparar URLs de imágenes."""
+import re
+
+FILTROS_INVALIDOS = [
+    'data:image',
+    'placeholder',
+    'loading.gif',
+    'spinner.gif',
+    'blank.png',
+    'default.jpg',
+    '.svg'
+]
+
+# Compilados una vez: se evalúan por cada candidato de cada tarjeta
+_ANCHO = re.compile(r'width=(\d+)')
+_ALTO = re.compile(r'height=(\d+)')
+_DIMENSIONES = re.compile(r'(\d+)x(\d+)')
+_CALIDAD = re.compile(r'quality=\d+')
+
+
+def limpiar_url(url):
+    """Normaliza entidades HTML que llegan en atributos (&amp;)"""
+    return url.replace('&amp;', '&') if url else url
+
+
+def es_imagen_valida(url):
+    """Valida si es una URL de imagen válida"""
+    if not url:
+        return False
+
+    url_lower = url.lower()
+    for filtro in FILTROS_INVALIDOS:
+        if filtro in url_lower:
+            return False
+
+    # Debe ser HTTP/HTTPS
+    return url.startswith('http')
+
+
+def dimensiones_url(url):
+    """(ancho, alto) que declara la URL (parámetros del resizer o ``NxM``); None si no declara"""
+    if not url:
+        return None, None
+    ancho = _ANCHO.search(url)
+    if ancho:
+        alto = _ALTO.search(url)
+        return int(ancho.group(1)), int(alto.group(1)) if alto else None
+    # Patrones alternativos: el último NxM de la URL
+    pares = _DIMENSIONES.findall(url)
+    if pares:
+        ancho, alto = pares[-1]
+        return int(ancho), int(alto)
+    return None, None
+
+
+def resolucion(ancho, alto, url):
+    """Resolución aproximada a partir de las dimensiones ya parseadas de ``url``"""
+    if not url:
+        return 0
+    if ancho or alto:
+        return max(ancho or 0, alto or 0)
+
+    # Valores por defecto según patrones conocidos
+    url_lower = url.lower()
+    if 'thumb' in url_lower:
+        return 100
+    elif 'small' in url_lower:
+        return 200
+    elif 'medium' in url_lower:
+        return 400
+    elif 'large' in url_lower:
+        return 800
+    return 300  # Valor por defecto
+
+
+def obtener_resolucion_url(url):
+    """Extrae la resolución aproximada de la URL (parámetros del resizer)"""
+    return resolucion(*dimensiones_url(url), url)
+
+
+def elegir_mejor_imagen(candidatos, dominio=None, sondeos=None):
+    """Devuelve (url, resolucion) de la mejor imagen válida entre ``candidatos``.
+
+    ``sondeos`` (``{url: SondeoImagen}``, ver probe.py) aporta dimensiones
+    reales y descarta las URLs que no responden con una imagen; sin sondeo
+    se estima por la URL.
+    """
+    mejor_imagen = None
+    mejor_resolucion = 0
+    for src in candidatos:
+        src = limpiar_url(src)
+        if not es_imagen_valida(src):
+            continue
+        if dominio and dominio not in src:
+            continue
+        sondeo = sondeos.get(src) if sondeos else None
+        if sondeo is not None and not sondeo.es_imagen:
+            continue
+        if sondeo is not None and (sondeo.ancho or sondeo.alto):
+            resolucion = max(sondeo.ancho or 0, sondeo.alto or 0)
+        else:
+            resolucion = obtener_resolucion_url(src)
+        if resolucion > mejor_resolucion:
+            mejor_resolucion = resolucion
+            mejor_imagen = src
+    return mejor_imagen, mejor_resolucion
+
+
+def mejorar_url_imagen(url):
+    """Mejora la calidad de imagen modificando parámetros del resizer"""
+    try:
+        if 'elcomercio.pe/resizer' in url:
+            url = _ANCHO.sub('width=800', url)
+            url = _ALTO.sub('height=600', url)
+            url = _CALIDAD.sub('quality=85', url)
+    except Exception:
+        pass
+    return url
+
+
+def imagen_mejorada(src, sondeos=None):
+    """``mejorar_url_imagen`` solo si el sondeo no dice que ese tamaño no existe"""
+    mejorada = mejorar_url_imagen(src)
+    sondeo = sondeos.get(mejorada) if sondeos else None
+    if sondeo is not None and not sondeo.es_imagen:
+        return src
+    return mejorada
+
+
+def es_mejor_imagen(nueva, actual, dimensiones_nueva=None, dimensiones_actual=None):
+    """True si ``nueva`` debe reemplazar a la imagen guardada ``actual``.
+
+    Con las dimensiones ya parseadas (columnas ``imagen_ancho``/``imagen_alto``
+    de Noticia) no se vuelve a leer la URL.
+    """
+    if not nueva:
+        return False
+    if not actual:
+        return True
+    # (None, None) es verdadero: se miran los valores, no la tupla
+    if not dimensiones_nueva or not any(dimensiones_nueva):
+        dimensiones_nueva = dimensiones_url(nueva)
+    if not dimensiones_actual or not any(dimensiones_actual):
+        dimensiones_actual = dimensiones_url(actual)
+    return resolucion(*dimensiones_nueva, nueva) > resolucion(*dimensiones_actual, actual)
@@ -0,0 +1,27 @@
+"""
+Modo incremental: saltar tarjetas que ya están en ``Noticia``.
+
+Antes de scrapear se precargan en memoria los enlaces guardados en los
+últimos ``SCRAPER_INCREMENTAL_DIAS`` días para el origen de la sección. Las
+tarjetas cuyo enlace ya se conoce se descartan antes de la extracción cara
+(imágenes, fechas, guardado) y, opcionalmente, el recorrido se corta tras
+``K`` conocidas consecutivas: los listados vienen ordenados del más nuevo al
+más viejo.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from scraping.models import Noticia
+
+
+def cargar_enlaces_conocidos(origen, dias):
+    """Set con los enlaces de ``origen`` scrapeados en los últimos ``dias``"""
+    desde = timezone.now() - timedelta(days=dias)
+    return set(
+        Noticia.objects
+        .filter(origen=origen, fecha_scraping__gte=desde)
+        .exclude(enlace__isnull=True)
+        .values_list('enlace', flat=True)
+        .iterator(chunk_size=2000)
+    )
@@ -0,0 +1,39 @@
+"""
+ORM desde cualquier hilo del motor.
+
+En el hilo del pool (ver ``browser.py``) y dentro de ``asyncio.run`` hay un
+event loop corriendo y Django rechaza el ORM ahí
+(``SynchronousOnlyOperation``). ``en_hilo_orm`` pasa la llamada a un hilo
+propio en ese caso y la ejecuta directo en cualquier otro.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.db import connection
+
+_hilo_orm = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper-orm')
+
+
+def _con_conexion_propia(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def en_hilo_orm(func, *args, **kwargs):
+    """Ejecuta ``func`` donde el ORM esté permitido"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return func(*args, **kwargs)
+    return _hilo_orm.submit(_con_conexion_propia, func, *args, **kwargs).result()
+
+
+def orm_seguro(func):
+    """Decorador: ``func`` se puede llamar desde cualquier hilo del motor"""
+    @wraps(func)
+    def envoltura(*args, **kwargs):
+        return en_hilo_orm(func, *args, **kwargs)
+    return envoltura
@@ -0,0 +1,89 @@
+"""
+Pipeline extracción → guardado en streaming.
+
+La extracción deja cada item en una cola acotada y un hilo escritor los
+guarda con ``guardar_noticias`` en lotes de ``lote`` items o cada
+``intervalo`` segundos, lo que ocurra primero. El I/O de base de datos se
+solapa con el trabajo del navegador, la memoria no crece con el tamaño de
+la página y lo ya guardado sobrevive a un timeout o caída posterior.
+
+La cola llena bloquea al productor (backpressure) en vez de acumular.
+"""
+import queue
+import threading
+import time
+
+from django.db import connection
+
+from .progress import Reportero
+from .storage import guardar_noticias
+
+_FIN = object()
+
+
+class EscritorEnLotes:
+    """Hilo consumidor que guarda los items de una sección por lotes."""
+
+    def __init__(self, spec, write=print, lote=20, intervalo=2.0, capacidad=200,
+                 al_guardar=None, progreso=None):
+        self.spec = spec
+        self.write = write
+        self.progreso = progreso or Reportero()
+        self.lote = lote
+        self.intervalo = intervalo
+        self.al_guardar = al_guardar
+        self.cola = queue.Queue(maxsize=capacidad)
+        self.resumen = {'nuevas': 0, 'actualizadas': 0, 'errores': 0, 'lotes': 0}
+        self._hilo = threading.Thread(
+            target=self._consumir, name=f"escritor-{spec['slug']}", daemon=True
+        )
+        self._hilo.start()
+
+    def put(self, item):
+        self.cola.put(item)
+
+    def cerrar(self):
+        """Vacía la cola, espera al hilo y devuelve el resumen acumulado"""
+        self.cola.put(_FIN)
+        self._hilo.join()
+        return self.resumen
+
+    def _consumir(self):
+        pendientes = []
+        limite = time.monotonic() + self.intervalo
+        try:
+            while True:
+                try:
+                    item = self.cola.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    item = None
+
+                if item is _FIN:
+                    break
+                if item is not None:
+                    pendientes.append(item)
+                if len(pendientes) >= self.lote or time.monotonic() >= limite:
+                    self._guardar(pendientes)
+                    pendientes = []
+                    limite = time.monotonic() + self.intervalo
+            self._guardar(pendientes)
+        finally:
+            # Conexión propia del hilo: cerrarla para no dejarla colgada en MySQL
+            connection.close()
+
+    def _guardar(self, items):
+        if not items:
+            return
+        try:
+            parcial = guardar_noticias(self.spec, items, write=self.write)
+        except Exception as e:
+            self.write(f"  ❌ Error guardando lote: {e}")
+            self.resumen['errores'] += len(items)
+            return
+        for campo in ('nuevas', 'actualizadas', 'errores'):
+            self.resumen[campo] += parcial[campo]
+        self.resumen['lotes'] += 1
+        self.write(f"💾 Lote de {len(items)} noticias guardado ({self.spec['slug']})")
+        self.progreso.emitir('lote', self.spec['slug'], items=len(items), **parcial)
+        if self.al_guardar:
+            self.al_guardar(items)
@@ -0,0 +1,202 @@
+"""
+Sondeo de imágenes: datos reales en vez de adivinar por la URL.
+
+``obtener_resolucion_url`` solo ve los parámetros del resizer y
+``mejorar_url_imagen`` pide 800x600 sin saber si ese tamaño existe. Antes de
+elegir, el motor junta los candidatos de todas las tarjetas de la página y
+los sondea en bloque:
+
+- un GET con ``Range`` por los primeros ``SCRAPER_IMAGE_PROBE_BYTES`` (la
+  cabecera del archivo trae las dimensiones; el total sale de
+  ``Content-Range``), con un cliente httpx de conexiones reutilizadas y
+  ``SCRAPER_IMAGE_PROBE_CONCURRENCY`` sondeos a la vez
+- tipo, peso y dimensiones reales quedan en ``SondeoImagen`` (clave: sha1 de
+  la URL), así una URL ya conocida no se vuelve a sondear
+- cada sondeo reserva un token del bucket ``'imagenes'`` de su dominio
+  (``SCRAPER_IMAGE_PROBE_RATE``), aparte del de las páginas; el circuit
+  breaker de la navegación solo se consulta: con el circuito abierto el
+  dominio no se sondea, pero un error de una imagen no lo abre
+
+Los fallos transitorios (timeout, 5xx, 403 y 429) no se guardan: la próxima
+corrida la vuelve a intentar y mientras tanto se usa la heurística de la URL.
+"""
+import asyncio
+import hashlib
+import logging
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.conf import settings
+from django.db import connection
+
+from scraping.models import SondeoImagen
+from .browser import USER_AGENT
+from .circuit import consultar
+from .ratelimit import adquirir_async, dominio_de
+
+logger = logging.getLogger(__name__)
+
+# Un hilo propio: ahí se permiten el ORM y un event loop nuevo aunque el
+# hilo que llama tenga el loop de Playwright corriendo
+_hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scraper-sondeo')
+
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def hash_url(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+# ===== CABECERAS DE IMAGEN =====
+def _dimensiones_jpeg(datos):
+    i = 2
+    while i + 9 < len(datos):
+        if datos[i] != 0xFF:
+            i += 1
+            continue
+        marcador = datos[i + 1]
+        if marcador == 0xFF:
+            i += 1
+            continue
+        if marcador in (0xD8, 0x01) or 0xD0 <= marcador <= 0xD7:
+            i += 2
+            continue
+        if marcador in _SOF:
+            alto, ancho = struct.unpack('>HH', datos[i + 5:i + 9])
+            return ancho, alto
+        # Segmento sin dimensiones (EXIF, tablas...): se salta entero
+        i += 2 + struct.unpack('>H', datos[i + 2:i + 4])[0]
+    return None, None
+
+
+def _dimensiones_webp(datos):
+    chunk = datos[12:16]
+    if chunk == b'VP8 ' and len(datos) >= 30:
+        ancho, alto = struct.unpack('<HH', datos[26:30])
+        return ancho & 0x3FFF, alto & 0x3FFF
+    if chunk == b'VP8L' and len(datos) >= 25:
+        bits = struct.unpack('<I', datos[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(datos) >= 30:
+        return 1 + int.from_bytes(datos[24:27], 'little'), 1 + int.from_bytes(datos[27:30], 'little')
+    return None, None
+
+
+def dimensiones_cabecera(datos):
+    """(ancho, alto) leídos de los primeros bytes de un PNG, GIF, JPEG o WebP"""
+    try:
+        if datos[:8] == b'\x89PNG\r\n\x1a\n' and len(datos) >= 24:
+            return struct.unpack('>II', datos[16:24])
+        if datos[:6] in (b'GIF87a', b'GIF89a') and len(datos) >= 10:
+            return struct.unpack('<HH', datos[6:10])
+        if datos[:2] == b'\xff\xd8':
+            return _dimensiones_jpeg(datos)
+        if datos[:4] == b'RIFF' and datos[8:12] == b'WEBP':
+            return _dimensiones_webp(datos)
+    except struct.error:
+        pass
+    return None, None
+
+
+def _tamano_total(respuesta):
+    # "bytes 0-32767/184223": el total va después de la barra
+    rango = respuesta.headers.get('content-range', '')
+    if '/' in rango and rango.rsplit('/', 1)[1].isdigit():
+        return int(rango.rsplit('/', 1)[1])
+    if respuesta.status_code == 200 and respuesta.headers.get('content-length', '').isdigit():
+        return int(respuesta.headers['content-length'])
+    return None
+
+
+# Bloqueos y límites del CDN: pueden levantarse antes de la próxima corrida
+NO_GUARDAR = {403, 429}
+
+
+# ===== SONDEO =====
+def _cliente():
+    concurrencia = settings.SCRAPER_IMAGE_PROBE_CONCURRENCY
+    return httpx.AsyncClient(
+        headers={'User-Agent': USER_AGENT},
+        timeout=settings.SCRAPER_IMAGE_PROBE_TIMEOUT,
+        limits=httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia),
+        follow_redirects=True,
+    )
+
+
+async def _sondear_url(cliente, semaforo, url):
+    limite = settings.SCRAPER_IMAGE_PROBE_BYTES
+    async with semaforo:
+        try:
+            await adquirir_async(url, bucket='imagenes')
+            async with cliente.stream('GET', url, headers={'Range': f'bytes=0-{limite - 1}'}) as respuesta:
+                if respuesta.status_code >= 500 or respuesta.status_code in NO_GUARDAR:
+                    logger.debug(f"Sondeo de {url}: HTTP {respuesta.status_code}, se reintenta otra corrida")
+                    return None
+                cabecera = b''
+                if respuesta.status_code < 400:
+                    # Si el servidor ignora el Range se corta la descarga igual
+                    async for bloque in respuesta.aiter_bytes():
+                        cabecera += bloque
+                        if len(cabecera) >= limite:
+                            break
+        except httpx.HTTPError as e:
+            logger.debug(f"Sondeo de {url} falló: {e}")
+            return None
+    ancho, alto = dimensiones_cabecera(cabecera)
+    return SondeoImagen(
+        url_hash=hash_url(url),
+        url=url,
+        estado_http=respuesta.status_code,
+        content_type=respuesta.headers.get('content-type', '').split(';')[0].strip()[:100],
+        tamano=_tamano_total(respuesta),
+        ancho=ancho,
+        alto=alto,
+    )
+
+
+def _circuito_abierto(dominio):
+    estado = consultar(dominio)
+    return estado.get('estado') == 'abierto' and estado['reintento_en'] > 0
+
+
+async def sondear_async(urls):
+    """Sondea ``urls`` en paralelo acotado; devuelve los ``SondeoImagen`` obtenidos (sin guardar)"""
+    # Un dominio en espera se descarta entero antes de gastar tokens del rate limit
+    abiertos = {d for d in {dominio_de(url) for url in urls} if await asyncio.to_thread(_circuito_abierto, d)}
+    urls = [url for url in urls if dominio_de(url) not in abiertos]
+    semaforo = asyncio.Semaphore(settings.SCRAPER_IMAGE_PROBE_CONCURRENCY)
+    async with _cliente() as cliente:
+        resultados = await asyncio.gather(*(_sondear_url(cliente, semaforo, url) for url in urls))
+    return [r for r in resultados if r is not None]
+
+
+def _sondear(urls):
+    hashes = {hash_url(url): url for url in urls}
+    conocidos = {s.url: s for s in SondeoImagen.objects.filter(url_hash__in=list(hashes))}
+    pendientes = [url for url in hashes.values() if url not in conocidos]
+    if pendientes:
+        nuevos = asyncio.run(sondear_async(pendientes))
+        SondeoImagen.objects.bulk_create(nuevos, ignore_conflicts=True)
+        conocidos.update({s.url: s for s in nuevos})
+        logger.info(f"🔎 {len(nuevos)}/{len(pendientes)} imágenes sondeadas, {len(hashes) - len(pendientes)} en caché")
+    return conocidos
+
+
+def _en_hilo(urls):
+    try:
+        return _sondear(urls)
+    finally:
+        connection.close()
+
+
+def sondear(urls):
+    """``{url: SondeoImagen}`` de las URLs conocidas tras sondear las que falten"""
+    urls = {url for url in urls if url}
+    if not urls or not settings.SCRAPER_IMAGE_PROBE or settings.SCRAPER_REPLAY:
+        return {}
+    try:
+        return _hilo.submit(_en_hilo, urls).result()
+    except Exception as e:
+        logger.warning(f"No se pudieron sondear las imágenes: {e}")
+        return {}
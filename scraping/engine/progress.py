@@ -0,0 +1,92 @@
+"""
+Protocolo de progreso legible por máquina.
+
+El motor reporta eventos como líneas JSON (``{"evento": ..., "seccion": ...,
+"t": segundos, ...}``) por un canal dedicado, en vez de que quien lo lanza
+tenga que parsear los mensajes con emojis de stdout:
+
+- ``SCRAPER_PROGRESS_FD=<n>``: descriptor heredado del proceso padre (POSIX)
+- ``SCRAPER_PROGRESS_STDOUT=1``: mismas líneas por stdout con el prefijo
+  ``PREFIJO`` (Windows no hereda descriptores con ``pass_fds``)
+
+Sin ninguna de las dos variables el reportero no hace nada. Dentro del
+mismo proceso (tarea Celery en modo ``inprocess``) se le pasa un
+``callback`` que recibe cada evento como dict.
+
+Eventos: ``inicio``, ``fase`` (``fase``: estatico | navegando | scroll |
+extrayendo | guardando), ``encontradas`` (``total``), ``procesada`` (``i``,
+``total``), ``lote`` (``nuevas``, ``actualizadas``, ``errores``) y ``fin``
+(``resumen`` de la sección).
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+PREFIJO = '@@progreso '
+FASES = ('inicio', 'estatico', 'navegando', 'scroll', 'extrayendo', 'guardando', 'fin')
+
+
+class Reportero:
+    """Escribe eventos de progreso como JSON lines en ``salida``."""
+
+    def __init__(self, salida=None, prefijo='', callback=None):
+        self.salida = salida
+        self.prefijo = prefijo
+        self.callback = callback
+        self._inicio = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self):
+        return self.salida is not None or self.callback is not None
+
+    def emitir(self, evento, seccion=None, **datos):
+        if not self.activo:
+            return
+        datos = {'evento': evento, 'seccion': seccion, 't': round(time.monotonic() - self._inicio, 3), **datos}
+        if self.callback is not None:
+            self.callback(datos)
+        if self.salida is None:
+            return
+        linea = json.dumps(datos, ensure_ascii=False, default=str)
+        # Secciones en paralelo (async/hilos escritores) comparten el canal
+        with self._lock:
+            try:
+                self.salida.write(self.prefijo + linea + '\n')
+                self.salida.flush()
+            except (OSError, ValueError):
+                # El padre cerró el canal: seguir scrapeando sin progreso
+                self.salida = None
+
+    def fase(self, seccion, fase):
+        self.emitir('fase', seccion, fase=fase)
+
+
+def parsear_evento(linea):
+    """Evento de una línea del protocolo, o None si la línea no es del protocolo"""
+    if linea.startswith(PREFIJO):
+        linea = linea[len(PREFIJO):]
+    try:
+        evento = json.loads(linea)
+    except ValueError:
+        return None
+    return evento if isinstance(evento, dict) and 'evento' in evento else None
+
+
+_reportero = None
+
+
+def get_reporter():
+    """Reportero del proceso según las variables de entorno del padre"""
+    global _reportero
+    if _reportero is None:
+        fd = os.environ.get('SCRAPER_PROGRESS_FD')
+        if fd:
+            _reportero = Reportero(os.fdopen(int(fd), 'w', encoding='utf-8', buffering=1))
+        elif os.environ.get('SCRAPER_PROGRESS_STDOUT') == '1':
+            _reportero = Reportero(sys.stdout, prefijo=PREFIJO)
+        else:
+            _reportero = Reportero()
+    return _reportero
@@ -0,0 +1,150 @@
+"""
+Limitador de tasa por dominio (token bucket) compartido entre workers.
+
+Cada descarga saliente (tier HTTP, navegación de Playwright, contenido para
+el análisis) reserva un token del bucket de su dominio antes de salir. El
+bucket vive en el Redis del broker y se actualiza con un script Lua atómico
+que usa el reloj de Redis, así todos los procesos ven el mismo estado.
+
+El script *reserva*: descuenta el token aunque el bucket quede negativo y
+devuelve cuánto hay que esperar. Con eso cada llamada cuesta un solo round
+trip y los que esperan salen en orden de llegada.
+
+Sin Redis se usa un bucket local del proceso con la misma lógica.
+"""
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .state import clave, get_redis
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_LUA = """
+local tasa = tonumber(ARGV[1])
+local rafaga = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local estado = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(estado[1]) or rafaga
+local ts = tonumber(estado[2]) or ahora
+
+tokens = math.min(rafaga, tokens + (ahora - ts) * tasa) - 1
+local espera = 0
+if tokens < 0 then
+    espera = -tokens / tasa
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ahora)
+redis.call('EXPIRE', KEYS[1], math.ceil(rafaga / tasa) + 60)
+
+redis.call('HINCRBY', KEYS[2], 'adquisiciones', 1)
+if espera > 0 then
+    redis.call('HINCRBY', KEYS[2], 'esperas', 1)
+    redis.call('HINCRBYFLOAT', KEYS[2], 'espera_total', espera)
+    local maxima = tonumber(redis.call('HGET', KEYS[2], 'espera_max')) or 0
+    if espera > maxima then
+        redis.call('HSET', KEYS[2], 'espera_max', espera)
+    end
+end
+return tostring(espera)
+"""
+
+_script = None
+_locales = {}
+_lock = threading.Lock()
+
+
+def dominio_de(url):
+    """Dominio para el bucket: host sin ``www.``"""
+    host = (urlsplit(url).hostname or url).lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def limites(dominio, bucket=None):
+    """(tasa en req/s, ráfaga) del dominio según settings"""
+    if bucket == 'imagenes':
+        tasa, rafaga = settings.SCRAPER_IMAGE_PROBE_RATE
+    else:
+        tasa, rafaga = settings.SCRAPER_RATE_LIMITS.get(
+            dominio, (settings.SCRAPER_RATE_PER_SEC, settings.SCRAPER_RATE_BURST)
+        )
+    return float(tasa), float(rafaga)
+
+
+def _partes(dominio, bucket):
+    # Sin bucket: el de las páginas, con las claves de siempre
+    return (bucket, dominio) if bucket else (dominio,)
+
+
+def _reservar_local(dominio, tasa, rafaga):
+    ahora = time.monotonic()
+    with _lock:
+        tokens, ts = _locales.get(dominio, (rafaga, ahora))
+        tokens = min(rafaga, tokens + (ahora - ts) * tasa) - 1
+        _locales[dominio] = (tokens, ahora)
+    return -tokens / tasa if tokens < 0 else 0.0
+
+
+def reservar(url, bucket=None):
+    """Reserva un token del dominio de ``url`` y devuelve los segundos a esperar.
+
+    ``bucket`` separa tráfico con otro ritmo del de las páginas (p. ej.
+    ``'imagenes'`` para el sondeo) para que no compitan por los mismos tokens.
+    """
+    global _script
+    if not settings.SCRAPER_RATE_LIMIT or settings.SCRAPER_REPLAY:
+        return 0.0
+    dominio = dominio_de(url)
+    tasa, rafaga = limites(dominio, bucket)
+    partes = _partes(dominio, bucket)
+    r = get_redis()
+    if r is not None:
+        try:
+            if _script is None:
+                _script = r.register_script(TOKEN_BUCKET_LUA)
+            return float(_script(
+                keys=[clave('ratelimit', *partes), clave('ratelimit', 'metricas', *partes)],
+                args=[tasa, rafaga],
+            ))
+        except Exception as e:
+            logger.warning(f"Rate limit en Redis falló para {dominio}, usando bucket local: {e}")
+    return _reservar_local(partes, tasa, rafaga)
+
+
+def adquirir(url, bucket=None):
+    """Bloquea hasta tener turno para ``url``; devuelve los segundos esperados"""
+    espera = reservar(url, bucket)
+    if espera > 0:
+        time.sleep(espera)
+    return espera
+
+
+async def adquirir_async(url, bucket=None):
+    # La reserva es un round trip corto a Redis; la espera no bloquea el loop
+    espera = await asyncio.to_thread(reservar, url, bucket)
+    if espera > 0:
+        await asyncio.sleep(espera)
+    return espera
+
+
+def metricas(dominio):
+    """Adquisiciones, esperas y tiempo de espera acumulado/máximo del dominio"""
+    r = get_redis()
+    if r is None:
+        return {}
+    try:
+        datos = r.hgetall(clave('ratelimit', 'metricas', dominio))
+    except Exception:
+        return {}
+    return {
+        'adquisiciones': int(datos.get('adquisiciones', 0)),
+        'esperas': int(datos.get('esperas', 0)),
+        'espera_total': round(float(datos.get('espera_total', 0)), 3),
+        'espera_max': round(float(datos.get('espera_max', 0)), 3),
+    }
@@ -0,0 +1,170 @@
+"""
+Cadencia adaptativa por sección.
+
+En vez de una corrida completa cada 5 horas, beat llama cada minuto a
+``programar_secciones`` y este despacha ``scrape_section`` solo para las
+secciones cuya próxima corrida ya venció. Tras cada corrida se registra
+cuántas noticias nuevas aparecieron y se recalcula el intervalo:
+
+- ``tasa``: noticias nuevas por hora, media móvil exponencial (``ALFA``)
+  de lo observado en cada corrida
+- ``intervalo = SCRAPER_CADENCE_TARGET / tasa``, acotado a
+  ``[cadencia_min, cadencia_max]`` minutos de la spec (o de settings)
+
+Una portada que publica mucho se acerca al mínimo; una sección que casi no
+cambia se aleja hasta el máximo. El estado vive en Redis (el mismo del
+broker, sin él tampoco hay beat ni workers).
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+
+from .sections import SECCIONES, get_seccion
+from .state import clave, get_redis
+
+logger = logging.getLogger(__name__)
+
+ALFA = 0.5
+
+# Borra el candado solo si sigue siendo el de quien lo tomó
+LIBERAR_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def limites(spec):
+    """(mínimo, máximo) del intervalo de la sección en segundos"""
+    minimo = spec.get('cadencia_min') or settings.SCRAPER_CADENCE_MIN_MINUTES
+    maximo = spec.get('cadencia_max') or settings.SCRAPER_CADENCE_MAX_MINUTES
+    return minimo * 60, max(minimo, maximo) * 60
+
+
+def calcular_intervalo(spec, tasa):
+    """Segundos hasta la próxima corrida para ``tasa`` noticias nuevas por hora"""
+    minimo, maximo = limites(spec)
+    if not tasa:
+        return maximo
+    return min(maximo, max(minimo, settings.SCRAPER_CADENCE_TARGET / tasa * 3600))
+
+
+def _leer(r, slug):
+    datos = r.hgetall(clave('cadencia', slug))
+    return {
+        'intervalo': float(datos['intervalo']) if 'intervalo' in datos else None,
+        'ultima': float(datos['ultima']) if 'ultima' in datos else None,
+        'proxima': float(datos['proxima']) if 'proxima' in datos else None,
+        'tasa': float(datos['tasa']) if 'tasa' in datos else None,
+        'ultimas_nuevas': int(datos['ultimas_nuevas']) if 'ultimas_nuevas' in datos else None,
+    }
+
+
+def registrar_corrida(slug, nuevas, fin=None):
+    """Actualiza la tasa y la próxima corrida de la sección tras scrapearla"""
+    r = get_redis()
+    if r is None:
+        return None
+    spec = get_seccion(slug)
+    fin = fin or time.time()
+    try:
+        previo = _leer(r, slug)
+        if previo['ultima'] is None:
+            # Primera corrida: sin ventana conocida, se asume el intervalo por defecto
+            horas = settings.SCRAPER_CADENCE_DEFAULT_MINUTES / 60
+        else:
+            horas = max(fin - previo['ultima'], 60) / 3600
+        observada = nuevas / horas
+        tasa = observada if previo['tasa'] is None else ALFA * observada + (1 - ALFA) * previo['tasa']
+        intervalo = calcular_intervalo(spec, tasa)
+        estado = {
+            'intervalo': round(intervalo, 1),
+            'ultima': fin,
+            'proxima': fin + intervalo,
+            'tasa': round(tasa, 4),
+            'ultimas_nuevas': nuevas,
+        }
+        r.hset(clave('cadencia', slug), mapping=estado)
+        return estado
+    except Exception as e:
+        logger.warning(f"No se pudo registrar la cadencia de {slug}: {e}")
+        return None
+
+
+def reservar_si_vencida(slug, ttl, ahora=None):
+    """Token del candado si la sección tocaba y nadie la tiene en curso (la marca en curso ``ttl`` s); si no, None"""
+    r = get_redis()
+    if r is None:
+        return None
+    ahora = ahora or time.time()
+    try:
+        proxima = r.hget(clave('cadencia', slug), 'proxima')
+        if proxima is not None and float(proxima) > ahora:
+            return None
+        # El candado vence solo si el worker muere sin liberarlo
+        token = uuid.uuid4().hex
+        if r.set(clave('cadencia', slug, 'en_curso'), token, nx=True, ex=int(ttl)):
+            return token
+        return None
+    except Exception as e:
+        logger.warning(f"No se pudo revisar la cadencia de {slug}: {e}")
+        return None
+
+
+def posponer(slug, ahora=None):
+    """Tras un fallo: reintentar en el intervalo mínimo sin tocar la tasa"""
+    r = get_redis()
+    if r is None:
+        return
+    minimo, _ = limites(get_seccion(slug))
+    try:
+        r.hset(clave('cadencia', slug), 'proxima', (ahora or time.time()) + minimo)
+    except Exception as e:
+        logger.warning(f"No se pudo posponer {slug}: {e}")
+
+
+def liberar(slug, token):
+    """Suelta el candado de ``slug`` si ``token`` es el que devolvió reservar_si_vencida"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.register_script(LIBERAR_LUA)(keys=[clave('cadencia', slug, 'en_curso')], args=[token])
+    except Exception:
+        pass
+
+
+def cadencias():
+    """Cadencia actual de cada sección (para la vista y el comando)"""
+    r = get_redis()
+    ahora = time.time()
+    filas = []
+    for slug in SECCIONES:
+        spec = get_seccion(slug)
+        minimo, maximo = limites(spec)
+        estado = {}
+        en_curso = False
+        if r is not None:
+            try:
+                estado = _leer(r, slug)
+                en_curso = bool(r.exists(clave('cadencia', slug, 'en_curso')))
+            except Exception:
+                estado = {}
+        proxima = estado.get('proxima')
+        filas.append({
+            'seccion': slug,
+            'nombre': spec['nombre'],
+            'intervalo_min': round(estado['intervalo'] / 60, 1) if estado.get('intervalo') else None,
+            'minimo_min': minimo / 60,
+            'maximo_min': maximo / 60,
+            'tasa_hora': estado.get('tasa'),
+            'ultimas_nuevas': estado.get('ultimas_nuevas'),
+            'ultima': estado.get('ultima'),
+            'proxima': proxima,
+            'en_segundos': max(0, round(proxima - ahora)) if proxima else 0,
+            'en_curso': en_curso,
+        })
+    return filas
@@ -0,0 +1,68 @@
+"""
+Scroll adaptativo: baja hasta que la cantidad de tarjetas deja de crecer.
+
+Reemplaza los ``3 x (scrollTo + wait 2000 ms)`` fijos. Tras cada scroll se
+espera (con ``wait_for_function``) a que aparezcan tarjetas nuevas; si no
+aparecen dentro de ``scroll_espera`` ms la página se considera estable y se
+sigue con la extracción. Los topes ``scroll`` (iteraciones),
+``scroll_max_items`` y ``scroll_max_segundos`` vienen de la spec.
+"""
+import time
+
+from playwright.async_api import TimeoutError as AsyncTimeoutError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+JS_CONTAR = "(sel) => document.querySelectorAll(sel).length"
+JS_CRECIO = "([sel, n]) => document.querySelectorAll(sel).length > n"
+JS_SCROLL = "window.scrollTo(0, document.body.scrollHeight)"
+
+
+def _espera_ms(spec, limite):
+    restante = (limite - time.time()) * 1000
+    return max(0, min(spec['scroll_espera'], restante))
+
+
+def scroll_hasta_estable(page, spec):
+    """Scroll síncrono; devuelve cuántas iteraciones hicieron falta"""
+    if not spec['scroll']:
+        return 0
+    limite = time.time() + spec['scroll_max_segundos']
+    total = page.evaluate(JS_CONTAR, spec['item'])
+    iteraciones = 0
+
+    while iteraciones < spec['scroll'] and total < spec['scroll_max_items']:
+        espera = _espera_ms(spec, limite)
+        if not espera:
+            break
+        page.evaluate(JS_SCROLL)
+        iteraciones += 1
+        try:
+            page.wait_for_function(JS_CRECIO, arg=[spec['item'], total], timeout=espera)
+        except PlaywrightTimeoutError:
+            break  # sin tarjetas nuevas: página estable
+        total = page.evaluate(JS_CONTAR, spec['item'])
+
+    return iteraciones
+
+
+async def scroll_hasta_estable_async(page, spec):
+    """Versión async de ``scroll_hasta_estable``"""
+    if not spec['scroll']:
+        return 0
+    limite = time.time() + spec['scroll_max_segundos']
+    total = await page.evaluate(JS_CONTAR, spec['item'])
+    iteraciones = 0
+
+    while iteraciones < spec['scroll'] and total < spec['scroll_max_items']:
+        espera = _espera_ms(spec, limite)
+        if not espera:
+            break
+        await page.evaluate(JS_SCROLL)
+        iteraciones += 1
+        try:
+            await page.wait_for_function(JS_CRECIO, arg=[spec['item'], total], timeout=espera)
+        except AsyncTimeoutError:
+            break
+        total = await page.evaluate(JS_CONTAR, spec['item'])
+
+    return iteraciones
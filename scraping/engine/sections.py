@@ -0,0 +1,134 @@
+"""
+Registro declarativo de secciones scrapeables.
+
+Cada sección es un diccionario con la URL de listado, los selectores de
+cada campo, el filtro de enlaces y el origen con el que se guarda en
+``Noticia``. El motor (``scraping.engine.core``) es el único que interpreta
+estas especificaciones, así que agregar una sección nueva no requiere
+escribir otro comando.
+"""
+
+ELCOMERCIO_IMG_SELECTORES = [
+    "img.fs-wi__img",  # Clase específica de El Comercio
+    "img[src*='elcomercio.pe/resizer']",  # URLs del resizer de El Comercio
+    "img[data-src*='elcomercio.pe/resizer']",  # data-src con resizer
+    ".fs-wi__img-link img",  # Imágenes dentro de enlaces
+    "img.lazy",  # Imágenes con lazy loading
+    "img[src]",  # Cualquier imagen con src
+    "img[data-src]",  # Cualquier imagen con data-src
+]
+
+ELCOMERCIO_ENLACE_SELECTORES = [
+    ".fs-wi__img-link",  # Enlaces de imagen
+    ".fs-wi__title a",  # Enlaces en títulos
+    "a[href*='/noticia/']",  # Enlaces que contienen /noticia/
+    "a[data-mrf-link]",  # Enlaces con data-mrf-link
+    "a[href]",  # Cualquier enlace
+]
+
+# Valores comunes a todas las secciones; cada spec solo declara lo que cambia
+SECCION_DEFAULTS = {
+    'estatico': True,  # probar primero GET + parseo HTML sin navegador
+    'min_items': 5,  # tarjetas mínimas para aceptar el HTML estático
+    'wait_selector': None,  # por defecto se espera al selector de items
+    'scroll': 8,  # tope de iteraciones de scroll (0 = sin scroll)
+    'scroll_espera': 1500,  # ms esperando tarjetas nuevas tras cada scroll
+    'scroll_max_items': 150,  # dejar de bajar al llegar a esta cantidad
+    'scroll_max_segundos': 15,  # tope de tiempo total de scroll
+    'campo_timeout': 5000,
+    'titulo_requerido': False,  # descartar items sin título
+    'enlace_requerido': False,  # descartar items sin enlace
+    'fecha_texto': None,  # selector alternativo con la fecha en texto
+    'imagen_estrategia': 'primera',  # 'primera' | 'mejor_resolucion'
+    'imagen_dominio': None,  # solo aceptar imágenes de este dominio
+    'actualizar': ('imagen',),  # campos que se actualizan si ya existe
+    'red_permitir': (),  # fragmentos de URL que el bloqueo de red deja pasar
+    'cadencia_min': None,  # minutos entre corridas; None = SCRAPER_CADENCE_MIN_MINUTES
+    'cadencia_max': None,  # None = SCRAPER_CADENCE_MAX_MINUTES
+}
+
+
+def _elcomercio(comando, nombre, url):
+    return {
+        'comando': comando,
+        'nombre': nombre,
+        'url': url,
+        'origen': 'elcomercio',
+        'item': '.fs-wi',
+        'titulo': '.fs-wi__title, .story-item__content-title.overflow-hidden',
+        'autor': '.fs-wi__authors a',
+        'autor_defecto': 'Redacción El Comercio',
+        'fecha': 'time',
+        'imagen': ELCOMERCIO_IMG_SELECTORES,
+        'imagen_estrategia': 'mejor_resolucion',
+        'imagen_dominio': 'elcomercio.pe',
+        'enlace': ELCOMERCIO_ENLACE_SELECTORES,
+        'filtro_enlace': 'elcomercio.pe',
+    }
+
+
+def _peru21(comando, nombre, url, ruta):
+    return {
+        'comando': comando,
+        'nombre': nombre,
+        'url': url,
+        'origen': 'peru21',
+        'item': 'article.node--type-article',
+        'titulo': '.titulo-teaser-liquido a, .titulo-teaser-2col a, h2 a',
+        'autor': '.firma-teaser-liquido a, .firma-teaser-2col a',
+        'autor_defecto': 'Redacción Perú21',
+        'fecha': 'time',
+        'fecha_texto': '.field--name-field-fecha-actualizacion',
+        'imagen': ['img.img-fluid'],
+        'enlace': [f"a[href*='/{ruta}/']"],
+        'filtro_enlace': 'peru21.pe',
+    }
+
+
+SECCIONES = {
+    'elcomercio': _elcomercio('scrape_elcomercio', 'El Comercio', 'https://elcomercio.pe'),
+    'economia': _elcomercio('scrape_economia', 'El Comercio - Economia', 'https://elcomercio.pe/economia'),
+    'politica': _elcomercio('scrape_elcomercio_pol', 'El Comercio - Política', 'https://elcomercio.pe/politica'),
+    'mundo': _elcomercio('scrape_mundo', 'El Comercio - Mundo', 'https://elcomercio.pe/mundo'),
+    'tecnologia': _elcomercio('scrape_tecnologia', 'El Comercio - Tecnologia', 'https://elcomercio.pe/tecnologia'),
+    'peru21': {
+        **_peru21('scrape_peru21', 'Perú21', 'https://peru21.pe', ''),
+        'scroll': 0,
+        'campo_timeout': 2000,
+        'titulo': '.titulo-teaser-liquido a',
+        'autor': '.firma-teaser-liquido a',
+        'fecha_texto': None,
+        'imagen': ['img.image-style-teaser-liquido'],
+        'enlace': ['.col-teaser-liquido-media a'],
+        'titulo_requerido': True,
+        'enlace_requerido': True,
+        'actualizar': ('titulo', 'autor', 'fecha', 'imagen'),
+    },
+    'peru21_deportes': _peru21('scrape_peru21D', 'Perú21 - Deportes', 'https://peru21.pe/deportes', 'deportes'),
+    'peru21_gastronomia': _peru21('scrape_peru21G', 'Perú21 - Gastronomia', 'https://peru21.pe/gastronomia', 'gastronomia'),
+    'peru21_investigacion': _peru21('scrape_peru21I', 'Perú21 - Investigacion', 'https://peru21.pe/investigacion', 'investigacion'),
+    'peru21_lima': _peru21('scrape_peru21L', 'Perú21 - Lima', 'https://peru21.pe/lima', 'peru'),
+}
+
+
+def get_seccion(slug):
+    """Devuelve la spec completa (con valores por defecto) de una sección"""
+    if slug not in SECCIONES:
+        raise KeyError(f"Sección desconocida: {slug}")
+    spec = {**SECCION_DEFAULTS, **SECCIONES[slug], 'slug': slug}
+    if not spec['wait_selector']:
+        spec['wait_selector'] = spec['item']
+    return spec
+
+
+def get_seccion_por_comando(comando):
+    """Busca la sección asociada a un comando scrape_* existente"""
+    for slug, spec in SECCIONES.items():
+        if spec['comando'] == comando:
+            return get_seccion(slug)
+    raise KeyError(f"Ningún spec registrado para el comando: {comando}")
+
+
+def todas_las_secciones():
+    """Specs de todas las secciones, en el orden del registro"""
+    return [get_seccion(slug) for slug in SECCIONES]
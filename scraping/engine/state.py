@@ -0,0 +1,159 @@
+"""
+Estado compartido entre procesos del scraper (workers, comandos, beat).
+
+Usa el Redis que ya sirve de broker de Celery. Si Redis no está disponible
+las funciones degradan a "sin memoria" en vez de romper el scraping.
+"""
+import json
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'scraper'
+
+_cliente = None
+_reintentar_desde = 0.0
+
+
+def get_redis():
+    """Cliente Redis compartido del proceso, o None si no hay conexión"""
+    global _cliente, _reintentar_desde
+    if _cliente is None:
+        # Tras un fallo no se reintenta en cada llamada
+        if time.time() < _reintentar_desde:
+            return None
+        try:
+            import redis
+            cliente = redis.Redis.from_url(
+                settings.SCRAPER_REDIS_URL,
+                decode_responses=True,
+                socket_connect_timeout=2,
+                socket_timeout=5,
+            )
+            cliente.ping()
+            _cliente = cliente
+        except Exception as e:
+            logger.warning(f"Redis no disponible para el scraper: {e}")
+            _reintentar_desde = time.time() + 30
+            return None
+    return _cliente
+
+
+def clave(*partes):
+    return ':'.join((PREFIJO,) + tuple(str(p) for p in partes))
+
+
+# ===== TIER DE DESCARGA POR SECCIÓN =====
+def tier_preferido(slug):
+    """'static' o 'browser' según la última ejecución; None si no hay dato"""
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        return r.get(clave('tier', slug))
+    except Exception:
+        return None
+
+
+def registrar_tier(slug, tier):
+    """Recuerda qué tier funcionó. 'browser' expira para volver a probar HTTP"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        ttl = None
+        if tier == 'browser':
+            ttl = int(settings.SCRAPER_STATIC_RETRY_HOURS * 3600)
+        r.set(clave('tier', slug), tier, ex=ttl)
+    except Exception as e:
+        logger.warning(f"No se pudo registrar el tier de {slug}: {e}")
+
+
+# ===== CANCELACIÓN COOPERATIVA =====
+def solicitar_cancelacion(task_id, ttl=3600):
+    """Marca la tarea para que el motor se detenga en el próximo punto de control"""
+    r = get_redis()
+    if r is None:
+        return False
+    try:
+        r.set(clave('cancelar', task_id), 1, ex=ttl)
+        return True
+    except Exception as e:
+        logger.warning(f"No se pudo solicitar la cancelación de {task_id}: {e}")
+        return False
+
+
+def cancelacion_solicitada(task_id):
+    r = get_redis()
+    if r is None:
+        return False
+    try:
+        return bool(r.exists(clave('cancelar', task_id)))
+    except Exception:
+        return False
+
+
+# ===== LATENCIA DE ARRANQUE POR MODO DE EJECUCIÓN =====
+def registrar_arranque(modo, segundos):
+    """Último tiempo hasta el primer evento del motor ('subprocess' | 'inprocess')"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(clave('arranque', modo), round(segundos, 3))
+    except Exception as e:
+        logger.warning(f"No se pudo registrar el arranque {modo}: {e}")
+
+
+def ultimo_arranque(modo):
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        valor = r.get(clave('arranque', modo))
+        return float(valor) if valor is not None else None
+    except Exception:
+        return None
+
+
+# ===== CORRIDAS COMPLETAS (chord de secciones) =====
+def registrar_seccion_corrida(run_id, slug, resumen, ttl=86400):
+    """Guarda el resumen de una sección y devuelve los de todas las terminadas"""
+    r = get_redis()
+    if r is None:
+        return {slug: resumen}
+    try:
+        key = clave('corrida', run_id)
+        r.hset(key, slug, json.dumps(resumen, default=str))
+        r.expire(key, ttl)
+        return {s: json.loads(v) for s, v in r.hgetall(key).items()}
+    except Exception as e:
+        logger.warning(f"No se pudo registrar {slug} en la corrida {run_id}: {e}")
+        return {slug: resumen}
+
+
+# ===== SERVIDOR DE NAVEGADOR COMPARTIDO =====
+def registrar_servidor_navegador(datos, ttl):
+    """Latido del supervisor: endpoint, pid, RSS y reinicios; expira si el supervisor muere"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(clave('navegador', 'servidor'), json.dumps(datos, default=str), ex=ttl)
+    except Exception as e:
+        logger.warning(f"No se pudo registrar el servidor de navegador: {e}")
+
+
+def servidor_navegador():
+    """Último latido del supervisor; None si no hay o venció, {} si no hay Redis"""
+    r = get_redis()
+    if r is None:
+        return {}
+    try:
+        valor = r.get(clave('navegador', 'servidor'))
+        return json.loads(valor) if valor else None
+    except Exception:
+        return {}
@@ -0,0 +1,98 @@
+"""
+Tier HTTP estático para páginas de listado renderizadas en el servidor.
+
+Descarga la sección con un ``requests.Session`` con pool de conexiones y
+aplica los mismos selectores de la spec con BeautifulSoup. Produce los
+mismos "crudos" que ``EXTRACT_JS`` para reutilizar ``procesar_crudo``. Si
+faltan tarjetas o campos, el motor cae al navegador.
+"""
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+from .browser import USER_AGENT
+from .circuit import vigilar
+from .extract import resolver_enlace
+from .fixtures import html_grabado
+from .ratelimit import adquirir
+
+_session = None
+
+
+def get_session():
+    """Sesión HTTP compartida (keep-alive por host)"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+        _session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'es-PE,es;q=0.9',
+        })
+    return _session
+
+
+def descargar_html(url, timeout=15):
+    if settings.SCRAPER_REPLAY:
+        return html_grabado(url)
+    adquirir(url)
+    with vigilar(url):
+        response = get_session().get(url, timeout=timeout)
+        response.raise_for_status()
+    return response.text
+
+
+def _texto(el, selector):
+    if not selector:
+        return None
+    nodo = el.select_one(selector)
+    return nodo.get_text(" ", strip=True) if nodo else None
+
+
+def extraer_crudos_html(html, spec):
+    """Equivalente en Python de EXTRACT_JS sobre HTML estático"""
+    soup = BeautifulSoup(html, 'html.parser')
+    dominio = spec['imagen_dominio']
+    crudos = []
+
+    for el in soup.select(spec['item']):
+        time_el = el.select_one(spec['fecha']) if spec['fecha'] else None
+        enlaces = []
+        for selector in spec['enlace']:
+            a = el.select_one(selector)
+            enlaces.append((a.get('href') or a.get('data-mrf-link')) if a else None)
+
+        mejorable = None
+        if dominio:
+            img = el.select_one(f"img[src*='{dominio}'], img[data-src*='{dominio}']")
+            if img:
+                mejorable = img.get('src') or img.get('data-src')
+
+        crudos.append({
+            'titulo': _texto(el, spec['titulo']),
+            'autor': _texto(el, spec['autor']),
+            'fecha': time_el.get('datetime') if time_el else None,
+            'fecha_texto': _texto(el, spec['fecha_texto']),
+            'imagenes': [
+                [[img.get('src'), img.get('data-src')] for img in el.select(selector)]
+                for selector in spec['imagen']
+            ],
+            'enlaces': enlaces,
+            'mejorable': mejorable,
+        })
+    return crudos
+
+
+def crudos_suficientes(spec, crudos):
+    """True si el HTML estático trae suficientes tarjetas completas"""
+    if len(crudos) < spec['min_items']:
+        return False
+    completos = sum(
+        1 for crudo in crudos
+        if crudo['titulo'] and any(resolver_enlace(spec, href) for href in crudo['enlaces'])
+    )
+    return completos / len(crudos) >= 0.6
@@ -0,0 +1,231 @@
+"""Fase de guardado común a todas las secciones."""
+from django.db import transaction
+
+from scraping.models import Noticia, hash_enlace
+from scraping.utils.canonical import canonicalizar_url
+from .images import dimensiones_url, es_mejor_imagen
+
+BATCH_SIZE = 500
+CAMPOS = ('titulo', 'autor', 'fecha', 'imagen', 'enlace')
+# bulk_update arma un CASE por campo y fila: lotes chicos compilan mucho más rápido
+UPDATE_BATCH_SIZE = 50
+
+
+def normalizar_item(data):
+    """Trunca los campos al tamaño de las columnas de Noticia y parsea las dimensiones de la imagen"""
+    if data.get('imagen_ancho') or data.get('imagen_alto'):
+        # Dimensiones reales del sondeo (probe.py)
+        ancho, alto = data['imagen_ancho'], data['imagen_alto']
+    else:
+        ancho, alto = dimensiones_url(data.get('imagen'))
+    return {
+        **data,
+        'titulo': data['titulo'][:250] if data.get('titulo') else "Sin título",
+        'autor': data['autor'][:250] if data.get('autor') else "Redacción",
+        'enlace': canonicalizar_url(data.get('enlace')),
+        'imagen_ancho': ancho,
+        'imagen_alto': alto,
+    }
+
+
+def aplicar_cambios(noticia, data, campos):
+    """Copia sobre ``noticia`` los campos de ``data`` que mejoran lo guardado.
+
+    Devuelve True si hubo algún cambio.
+    """
+    actualizado = False
+
+    if 'titulo' in campos and data['titulo'] and noticia.titulo != data['titulo']:
+        noticia.titulo = data['titulo']
+        actualizado = True
+
+    if 'autor' in campos and data['autor'] and noticia.autor != data['autor']:
+        noticia.autor = data['autor']
+        actualizado = True
+
+    # Actualizar fecha solo si es más reciente
+    if 'fecha' in campos and data['fecha'] and (not noticia.fecha or data['fecha'] > noticia.fecha):
+        noticia.fecha = data['fecha']
+        actualizado = True
+
+    # Actualizar imagen si la nueva es mejor: se comparan las dimensiones ya guardadas
+    if 'imagen' in campos and es_mejor_imagen(
+        data['imagen'], noticia.imagen,
+        (data.get('imagen_ancho'), data.get('imagen_alto')),
+        (noticia.imagen_ancho, noticia.imagen_alto),
+    ):
+        noticia.imagen = data['imagen']
+        noticia.imagen_ancho, noticia.imagen_alto = data.get('imagen_ancho'), data.get('imagen_alto')
+        actualizado = True
+
+    if 'enlace' in campos and data['enlace'] and not noticia.enlace:
+        noticia.enlace = data['enlace']
+        noticia.enlace_hash = hash_enlace(data['enlace'])
+        actualizado = True
+
+    return actualizado
+
+
+def clave_dedup(data):
+    """Lookup de deduplicación: hash del enlace o, si no hay enlace, el título"""
+    enlace_hash = hash_enlace(data.get('enlace'))
+    if enlace_hash:
+        return ('enlace_hash', enlace_hash)
+    return ('titulo', data['titulo'])
+
+
+def nueva_noticia(spec, data):
+    return Noticia(
+        origen=spec['origen'],
+        enlace_hash=hash_enlace(data['enlace']),
+        imagen_ancho=data.get('imagen_ancho'),
+        imagen_alto=data.get('imagen_alto'),
+        **{c: data[c] for c in CAMPOS}
+    )
+
+
+def _lotes(valores, tamano=BATCH_SIZE):
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+
+def guardar_noticias(spec, items, write=print):
+    """Guarda los items de una sección en bloque y devuelve el resumen.
+
+    Se deduplica por ``(origen, enlace_hash)`` (índice único) y solo los items
+    sin enlace caen al título. Una consulta por lote trae las filas
+    existentes; las nuevas
+    van en un ``bulk_create`` y solo las que mejoraron en un ``bulk_update``.
+    Si una operación en bloque falla se repite fila a fila para aislar el
+    error sin perder el resto.
+    """
+    resumen = {'nuevas': 0, 'actualizadas': 0, 'errores': 0}
+    campos = [c for c in CAMPOS if c in spec['actualizar']]
+    if 'enlace' in campos:
+        campos.append('enlace_hash')
+    if 'imagen' in campos:
+        campos += ['imagen_ancho', 'imagen_alto']
+
+    validos = {}
+    for data in items:
+        data = normalizar_item(data)
+        validos.setdefault(clave_dedup(data), []).append(data)
+
+    existentes = {}
+    for campo in ('enlace_hash', 'titulo'):
+        valores = [valor for c, valor in validos if c == campo]
+        for lote in _lotes(valores):
+            # order_by('-id') + dict: con títulos repetidos gana el más antiguo
+            for noticia in Noticia.objects.filter(
+                origen=spec['origen'], **{f'{campo}__in': lote}
+            ).order_by('-id'):
+                existentes[(campo, getattr(noticia, campo))] = noticia
+
+    nuevas, modificadas = [], {}
+    for clave, repetidos in validos.items():
+        noticia = existentes.get(clave)
+        if noticia is None:
+            data = repetidos[0]
+            noticia = nueva_noticia(spec, data)
+            nuevas.append(noticia)
+            repetidos = repetidos[1:]
+        for data in repetidos:
+            if aplicar_cambios(noticia, data, campos) and noticia.pk:
+                modificadas[noticia.pk] = (noticia, data)
+
+    try:
+        with transaction.atomic():
+            Noticia.objects.bulk_create(nuevas, batch_size=BATCH_SIZE)
+            if modificadas and campos:
+                Noticia.objects.bulk_update(
+                    [n for n, _ in modificadas.values()], campos, batch_size=UPDATE_BATCH_SIZE
+                )
+    except Exception as e:
+        write(f"  ⚠️ Guardado en bloque falló ({e}), reintentando fila a fila")
+        return guardar_noticias_por_fila(spec, items, write=write)
+
+    # Los mensajes se escriben recién tras el commit: si se cae al guardado
+    # fila a fila, ese ya informa cada noticia
+    for noticia in nuevas:
+        write(f"  ✅ Nueva: {noticia.titulo[:50]}...")
+    for _, data in modificadas.values():
+        write(f"  🔄 Actualizada: {data['titulo'][:50]}...")
+    resumen['nuevas'] = len(nuevas)
+    resumen['actualizadas'] = len(modificadas)
+    return resumen
+
+
+def guardar_noticias_por_fila(spec, items, write=print):
+    """Guardado fila a fila con get_or_create (respaldo y línea base del benchmark)"""
+    resumen = {'nuevas': 0, 'actualizadas': 0, 'errores': 0}
+
+    with transaction.atomic():
+        for data in items:
+            try:
+                # Savepoint por fila: un error de la base deshace solo esa fila
+                # y no deja abortada la transacción para las siguientes
+                with transaction.atomic():
+                    data = normalizar_item(data)
+                    campo, valor = clave_dedup(data)
+
+                    noticia, created = Noticia.objects.get_or_create(
+                        origen=spec['origen'],
+                        defaults={c: data[c] for c in CAMPOS + ('imagen_ancho', 'imagen_alto') if c != campo},
+                        **{campo: valor}
+                    )
+
+                    if created:
+                        resumen['nuevas'] += 1
+                        write(f"  ✅ Nueva: {data['titulo'][:50]}...")
+                    elif aplicar_cambios(noticia, data, spec['actualizar']):
+                        noticia.save()
+                        resumen['actualizadas'] += 1
+                        write(f"  🔄 Actualizada: {data['titulo'][:50]}...")
+
+            except Exception as e:
+                resumen['errores'] += 1
+                write(f"  ❌ Error guardando: {e}")
+                continue
+
+    return resumen
+
+
+def fusionar_noticias(conservar, duplicados):
+    """Mueve a ``conservar`` las relaciones de ``duplicados`` y los borra.
+
+    Recorre todas las FKs hacia Noticia (vistas, análisis, actividad...). En
+    las tablas con ``unique_together`` sobre la FK se descartan las filas que
+    chocarían con una que ``conservar`` ya tiene.
+    """
+    ids = [d.pk for d in duplicados]
+    for relacion in Noticia._meta.related_objects:
+        if not relacion.one_to_many:
+            continue
+        modelo, campo = relacion.related_model, relacion.field.name
+        filas = modelo.objects.filter(**{f'{campo}__in': ids})
+        unicos = [u for u in modelo._meta.unique_together if campo in u]
+        if not unicos:
+            filas.update(**{campo: conservar})
+            continue
+
+        otros = [modelo._meta.get_field(c).attname for c in unicos[0] if c != campo]
+        ocupados = set(modelo.objects.filter(**{campo: conservar}).values_list(*otros))
+        for fila in filas.order_by('pk'):
+            valor = tuple(getattr(fila, c) for c in otros)
+            if valor in ocupados:
+                fila.delete()
+            else:
+                ocupados.add(valor)
+                modelo.objects.filter(pk=fila.pk).update(**{campo: conservar})
+
+    for duplicado in duplicados:
+        aplicar_cambios(conservar, {
+            'fecha': duplicado.fecha,
+            'imagen': duplicado.imagen,
+            'imagen_ancho': duplicado.imagen_ancho,
+            'imagen_alto': duplicado.imagen_alto,
+        }, ('fecha', 'imagen'))
+        if not conservar.autor and duplicado.autor:
+            conservar.autor = duplicado.autor
+    Noticia.objects.filter(pk__in=ids).delete()
+    conservar.save()
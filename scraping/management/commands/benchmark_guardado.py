@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from scraping.engine.sections import SECCIONES, get_seccion
+from scraping.engine.storage import guardar_noticias, guardar_noticias_por_fila, nueva_noticia
+from scraping.models import Noticia
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compara el guardado en bloque contra el bucle get_or_create fila a fila (sin persistir nada)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seccion', default='politica', choices=list(SECCIONES))
+        parser.add_argument('--items', type=int, default=60, help='Noticias por corrida')
+        parser.add_argument(
+            '--existentes', type=float, default=0.5,
+            help='Fracción de items que ya están en la base (se actualizan)'
+        )
+
+    def items_sinteticos(self, spec, n, marca):
+        base = spec['url'].rstrip('/')
+        return [{
+            'titulo': f"Benchmark {marca} {i}",
+            'autor': f"Autor {i}",
+            'fecha': timezone.now(),
+            'imagen': f"{base}/resizer/{marca}-{i}.jpg?width=800&height=600",
+            'enlace': f"{base}/benchmark-{marca}-{i}/",
+        } for i in range(n)]
+
+    def medir(self, guardar, spec, items, existentes):
+        """Corre ``guardar`` dentro de una transacción que se revierte"""
+        try:
+            with transaction.atomic():
+                # Filas previas sin imagen y con otro autor: todas califican para actualizarse
+                Noticia.objects.bulk_create([
+                    nueva_noticia(spec, {**data, 'autor': 'Redacción', 'imagen': None})
+                    for data in items[:existentes]
+                ])
+                with CaptureQueriesContext(connection) as consultas:
+                    inicio = time.perf_counter()
+                    resumen = guardar(spec, items, write=lambda *args, **kwargs: None)
+                    duracion = time.perf_counter() - inicio
+                raise _Rollback
+        except _Rollback:
+            pass
+        return resumen, duracion, len(consultas)
+
+    def handle(self, *args, **options):
+        spec = get_seccion(options['seccion'])
+        n = options['items']
+        existentes = int(n * options['existentes'])
+        marca = int(time.time())
+
+        resultados = {}
+        for nombre, guardar in (('fila a fila', guardar_noticias_por_fila), ('en bloque', guardar_noticias)):
+            items = self.items_sinteticos(spec, n, marca)
+            resumen, duracion, consultas = self.medir(guardar, spec, items, existentes)
+            resultados[nombre] = duracion
+            self.stdout.write(
+                f"{nombre:>12}: {duracion * 1000:8.1f} ms | {consultas:4d} consultas | "
+                f"{resumen['nuevas']} nuevas, {resumen['actualizadas']} actualizadas, {resumen['errores']} errores"
+            )
+
+        if resultados['en bloque']:
+            self.stdout.write(self.style.SUCCESS(
+                f"⚡ Aceleración: x{resultados['fila a fila'] / resultados['en bloque']:.1f} "
+                f"({n} items, {existentes} existentes, sección {spec['slug']})"
+            ))
@@ -0,0 +1,225 @@
+import json
+import resource
+import statistics
+import sys
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from scraping.engine import core, extract, state
+from scraping.engine.browser import BrowserPool, rss_navegador_mb
+from scraping.engine.core import ScraperEngine
+from scraping.engine.fixtures import ruta_har
+from scraping.engine.progress import Reportero
+from scraping.engine.sections import SECCIONES, get_seccion
+
+# Nombre de la fase del protocolo de progreso → clave en el JSON
+FASES = {
+    'estatico': 'http',
+    'navegando': 'navegacion',
+    'scroll': 'scroll',
+    'extrayendo': 'extraccion',
+    'guardando': 'guardado',
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def _revertido():
+    """Deshace noticias e historial de la corrida (el motor usa el ORM en este hilo, ver orm.en_hilo_orm)"""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+@contextmanager
+def _claves_aisladas():
+    """Redis bajo un prefijo propio: el benchmark no toca tier, circuitos ni cancelaciones reales"""
+    original = state.PREFIJO
+    state.PREFIJO = f'{original}-benchmark-{uuid.uuid4().hex[:8]}'
+    try:
+        yield
+    finally:
+        prefijo, state.PREFIJO = state.PREFIJO, original
+        r = state.get_redis()
+        if r is not None:
+            claves = list(r.scan_iter(match=f'{prefijo}:*'))
+            if claves:
+                r.delete(*claves)
+
+
+@contextmanager
+def _envuelto(objeto, nombre, envoltura):
+    original = getattr(objeto, nombre)
+    setattr(objeto, nombre, envoltura(original))
+    try:
+        yield
+    finally:
+        setattr(objeto, nombre, original)
+
+
+class Medidor:
+    """Acumula tiempos por fase y tiempo de imágenes de una corrida."""
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.fases = {}
+        self.fase = None
+        self.desde = None
+        self.imagenes = {}
+        self.rss_navegador = 0.0
+
+    def _cerrar_fase(self, ahora):
+        if self.fase:
+            self.fases[self.fase] = self.fases.get(self.fase, 0.0) + ahora - self.desde
+
+    def evento(self, datos):
+        if datos['evento'] not in ('fase', 'fin'):
+            return
+        ahora = time.perf_counter()
+        self._cerrar_fase(ahora)
+        self.fase = FASES.get(datos.get('fase')) if datos['evento'] == 'fase' else None
+        self.desde = ahora
+        self.rss_navegador = max(self.rss_navegador, rss_navegador_mb())
+
+    def cronometrar_imagen(self, funcion):
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                fase = self.fase or 'extraccion'
+                self.imagenes[fase] = self.imagenes.get(fase, 0.0) + time.perf_counter() - inicio
+        return envoltura
+
+    def resultado(self):
+        # La selección de imagen corre dentro de otra fase: se descuenta de ella
+        fases = dict(self.fases)
+        for fase, segundos in self.imagenes.items():
+            if fase in fases:
+                fases[fase] -= segundos
+        fases['imagenes'] = sum(self.imagenes.values(), 0.0)
+        return {fase: round(segundos, 4) for fase, segundos in fases.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el motor contra el corpus grabado (grabar_fixtures): tiempo por fase, requests, '
+        'timeouts de selectores, artículos/s y RSS pico, en JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('secciones', nargs='*', help=f"Slugs: {', '.join(SECCIONES)} (por defecto las grabadas)")
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--extraccion', choices=['bulk', 'locator'], default=None)
+        parser.add_argument('--sin-estatico', action='store_true', help='Forzar el tier navegador')
+        parser.add_argument('--persistir', action='store_true', help='No revertir el guardado ni el historial de cada corrida')
+        parser.add_argument('--salida', help='Archivo JSON de salida (por defecto stdout)')
+
+    def log(self, mensaje):
+        sys.stderr.write(mensaje + '\n')
+
+    def handle(self, *args, **options):
+        secciones = options['secciones'] or [s for s in SECCIONES if ruta_har(s)]
+        if not secciones:
+            raise CommandError("No hay fixtures grabados: corre antes grabar_fixtures")
+        sin_har = [s for s in secciones if s not in SECCIONES or not ruta_har(s)]
+        if sin_har:
+            raise CommandError(f"Sin fixtures para: {', '.join(sin_har)}")
+
+        ajustes = {'SCRAPER_REPLAY': True, 'SCRAPER_INCREMENTAL': False}
+        if options['sin_estatico']:
+            ajustes['SCRAPER_STATIC_TIER'] = False
+
+        medidor = Medidor()
+        pool = BrowserPool()
+        engine = ScraperEngine(
+            write=lambda *args, **kwargs: None,
+            pool=pool,
+            extraccion=options['extraccion'],
+            incremental=False,
+            # Sin hilo escritor: el guardado queda como fase propia y se puede revertir
+            streaming=False,
+            progreso=Reportero(callback=medidor.evento),
+        )
+
+        resultados = {}
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(override_settings(**ajustes))
+                stack.enter_context(_claves_aisladas())
+                # Tier fijo: lo decide la configuración, no lo que dejó la repetición anterior
+                stack.enter_context(_envuelto(core, 'tier_preferido', lambda original: lambda slug: None))
+                stack.enter_context(_envuelto(core, 'registrar_tier', lambda original: lambda slug, tier: None))
+                stack.enter_context(_envuelto(core.ScraperEngine, 'obtener_imagen', medidor.cronometrar_imagen))
+                stack.enter_context(_envuelto(extract, 'elegir_mejor_imagen', medidor.cronometrar_imagen))
+                for slug in secciones:
+                    resultados[slug] = self.medir_seccion(engine, medidor, get_seccion(slug), options)
+        finally:
+            pool.close()
+
+        reporte = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'repeticiones': options['repeticiones'],
+            'extraccion': engine.extraccion,
+            'estatico': not options['sin_estatico'],
+            'lanzamiento_navegador': round(pool.stats['tiempo_lanzamiento'], 3),
+            'rss_python_max_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            'secciones': resultados,
+        }
+        texto = json.dumps(reporte, ensure_ascii=False, indent=2)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as f:
+                f.write(texto + '\n')
+            self.log(f"✅ Reporte en {options['salida']}")
+        else:
+            self.stdout.write(texto)
+
+    def medir_seccion(self, engine, medidor, spec, options):
+        corridas = []
+        for i in range(options['repeticiones']):
+            medidor.reiniciar()
+            with ExitStack() as stack:
+                if not options['persistir']:
+                    stack.enter_context(_revertido())
+                inicio = time.perf_counter()
+                resumen = engine.run(spec)
+                duracion = time.perf_counter() - inicio
+
+            corridas.append({
+                'duracion': round(duracion, 4),
+                'tier': resumen['tier'],
+                'fases': medidor.resultado(),
+                'requests': resumen['requests'],
+                'timeouts_selector': resumen['timeouts_selector'],
+                'encontradas': resumen['encontradas'],
+                'articulos_por_segundo': round(resumen['encontradas'] / duracion, 2) if duracion else 0.0,
+                'rss_navegador_max_mb': round(medidor.rss_navegador, 1),
+            })
+            self.log(f"⏱️ {spec['slug']} #{i + 1}: {duracion:.2f}s, {resumen['requests']} requests")
+
+        fases = sorted({fase for c in corridas for fase in c['fases']})
+        return {
+            'corridas': corridas,
+            'mediana': {
+                'duracion': statistics.median(c['duracion'] for c in corridas),
+                'fases': {f: round(statistics.median(c['fases'].get(f, 0.0) for c in corridas), 4) for f in fases},
+                'requests': statistics.median(c['requests'] for c in corridas),
+                'timeouts_selector': statistics.median(c['timeouts_selector'] for c in corridas),
+                'articulos_por_segundo': statistics.median(c['articulos_por_segundo'] for c in corridas),
+            },
+            'rss_navegador_max_mb': max(c['rss_navegador_max_mb'] for c in corridas),
+        }
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from scraping.engine.scheduler import cadencias
+
+
+class Command(BaseCommand):
+    help = 'Muestra la cadencia adaptativa de cada sección (intervalo, tasa y próxima corrida)'
+
+    def handle(self, *args, **options):
+        for fila in cadencias():
+            if fila['intervalo_min'] is None:
+                self.stdout.write(f"⚪ {fila['seccion']:<24} sin corridas registradas (se despacha en el próximo tick)")
+                continue
+            proxima = datetime.fromtimestamp(fila['proxima']).strftime('%Y-%m-%d %H:%M')
+            estado = '🔄 en curso' if fila['en_curso'] else f"próxima {proxima}"
+            self.stdout.write(
+                f"🕒 {fila['seccion']:<24} cada {fila['intervalo_min']:>6} min "
+                f"[{fila['minimo_min']:.0f}-{fila['maximo_min']:.0f}] | "
+                f"{fila['tasa_hora']} nuevas/h (última: {fila['ultimas_nuevas']}) | {estado}"
+            )
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from scraping.engine.storage import fusionar_noticias
+from scraping.models import Noticia, hash_enlace
+from scraping.utils.canonical import canonicalizar_url
+
+
+class Command(BaseCommand):
+    help = 'Reescribe los enlaces guardados en su forma canónica y fusiona las noticias duplicadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar, sin escribir')
+
+    def handle(self, *args, **options):
+        lote = options['batch_size']
+        dry_run = options['dry_run']
+        stats = {'revisadas': 0, 'canonicalizadas': 0, 'fusionadas': 0, 'sin_canonico': 0}
+        ultimo_id = 0
+
+        while True:
+            noticias = list(
+                Noticia.objects.filter(pk__gt=ultimo_id)
+                .exclude(enlace__isnull=True)
+                .order_by('pk')[:lote]
+            )
+            if not noticias:
+                break
+            ultimo_id = noticias[-1].pk
+
+            with transaction.atomic():
+                for noticia in noticias:
+                    stats['revisadas'] += 1
+                    enlace = canonicalizar_url(noticia.enlace)
+                    if enlace is None:
+                        # javascript:, enlaces rotos...: con hash None el filtro
+                        # buscaría las noticias SIN enlace y las fusionaría
+                        stats['sin_canonico'] += 1
+                        continue
+                    enlace_hash = hash_enlace(enlace)
+                    if enlace == noticia.enlace and enlace_hash == noticia.enlace_hash:
+                        continue
+                    stats['canonicalizadas'] += 1
+                    if dry_run:
+                        continue
+
+                    otra = (
+                        Noticia.objects.filter(origen=noticia.origen, enlace_hash=enlace_hash)
+                        .exclude(pk=noticia.pk).first()
+                    )
+                    if otra is None:
+                        Noticia.objects.filter(pk=noticia.pk).update(enlace=enlace, enlace_hash=enlace_hash)
+                        continue
+
+                    # Se conserva la más antigua; la otra se fusiona en ella
+                    stats['fusionadas'] += 1
+                    if otra.pk < noticia.pk:
+                        fusionar_noticias(otra, [noticia])
+                    else:
+                        noticia.enlace = enlace
+                        fusionar_noticias(noticia, [otra])
+
+            self.stdout.write(
+                f"🔗 Hasta id {ultimo_id}: {stats['revisadas']} revisadas, "
+                f"{stats['canonicalizadas']} canonicalizadas, {stats['fusionadas']} fusionadas, "
+                f"{stats['sin_canonico']} sin forma canónica"
+            )
+            self.stdout.flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['canonicalizadas']} enlaces canonicalizados, {stats['fusionadas']} duplicados fusionados"
+            + (" (dry-run)" if dry_run else "")
+        ))
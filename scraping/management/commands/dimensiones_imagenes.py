@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from scraping.engine.images import dimensiones_url
+from scraping.models import Noticia
+
+
+class Command(BaseCommand):
+    help = 'Completa imagen_ancho/imagen_alto de las noticias guardadas a partir de la URL de su imagen'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--todas', action='store_true', help='Recalcular también las que ya tienen dimensiones')
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar, sin escribir')
+
+    def handle(self, *args, **options):
+        lote = options['batch_size']
+        dry_run = options['dry_run']
+        stats = {'revisadas': 0, 'actualizadas': 0, 'sin_dimensiones': 0}
+        ultimo_id = 0
+
+        noticias = Noticia.objects.exclude(imagen__isnull=True).exclude(imagen='')
+        if not options['todas']:
+            noticias = noticias.filter(imagen_ancho__isnull=True, imagen_alto__isnull=True)
+
+        while True:
+            filas = list(noticias.filter(pk__gt=ultimo_id).order_by('pk').only('id', 'imagen', 'imagen_ancho', 'imagen_alto')[:lote])
+            if not filas:
+                break
+            ultimo_id = filas[-1].pk
+
+            cambiadas = []
+            for noticia in filas:
+                stats['revisadas'] += 1
+                dimensiones = dimensiones_url(noticia.imagen)
+                if dimensiones == (None, None):
+                    stats['sin_dimensiones'] += 1
+                if dimensiones == (noticia.imagen_ancho, noticia.imagen_alto):
+                    continue
+                noticia.imagen_ancho, noticia.imagen_alto = dimensiones
+                cambiadas.append(noticia)
+
+            stats['actualizadas'] += len(cambiadas)
+            if cambiadas and not dry_run:
+                Noticia.objects.bulk_update(cambiadas, ['imagen_ancho', 'imagen_alto'], batch_size=lote)
+
+            self.stdout.write(
+                f"🖼️ Hasta id {ultimo_id}: {stats['revisadas']} revisadas, {stats['actualizadas']} actualizadas, "
+                f"{stats['sin_dimensiones']} sin dimensiones en la URL"
+            )
+            self.stdout.flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Dimensiones de {stats['actualizadas']} imágenes completadas"
+            + (" (dry-run)" if dry_run else "")
+        ))
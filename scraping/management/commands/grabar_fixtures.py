@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping.engine.browser import BrowserPool
+from scraping.engine.fixtures import grabar_seccion
+from scraping.engine.sections import SECCIONES, get_seccion
+
+
+class Command(BaseCommand):
+    help = 'Graba listados (HAR + HTML) y artículos en SCRAPER_FIXTURES_DIR para correr los scrapers sin red'
+
+    def add_arguments(self, parser):
+        parser.add_argument('secciones', nargs='*', help=f"Slugs: {', '.join(SECCIONES)}")
+        parser.add_argument('--all', action='store_true', help='Grabar todas las secciones')
+        parser.add_argument('--articulos', type=int, default=5, help='Notas a grabar por sección')
+
+    def handle(self, *args, **options):
+        if settings.SCRAPER_REPLAY:
+            raise CommandError("SCRAPER_REPLAY está activo: la grabación necesita red")
+        secciones = list(SECCIONES) if options['all'] else options['secciones']
+        if not secciones:
+            raise CommandError("Indica al menos una sección o usa --all")
+        desconocidas = [s for s in secciones if s not in SECCIONES]
+        if desconocidas:
+            raise CommandError(f"Secciones desconocidas: {', '.join(desconocidas)}")
+
+        pool = BrowserPool()
+        try:
+            for slug in secciones:
+                try:
+                    grabar_seccion(pool, get_seccion(slug), options['articulos'], write=self.stdout.write)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"❌ Error grabando {slug}: {e}"))
+        finally:
+            pool.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Corpus en {settings.SCRAPER_FIXTURES_DIR}; usa SCRAPER_REPLAY=True para reproducirlo"
+        ))
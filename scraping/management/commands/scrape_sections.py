@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping.engine.async_core import AsyncScraperEngine
+from scraping.engine.command import agregar_opciones_incrementales, opciones_incrementales
+from scraping.engine.core import ScraperEngine
+from scraping.engine.sections import SECCIONES
+
+
+class Command(BaseCommand):
+    help = 'Scrapea una o varias secciones del registro con un solo motor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('secciones', nargs='*', help=f"Slugs: {', '.join(SECCIONES)}")
+        parser.add_argument('--all', action='store_true', help='Scrapear todas las secciones')
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Secciones en paralelo con Playwright async (1 = secuencial)'
+        )
+        agregar_opciones_incrementales(parser)
+
+    def safe_write(self, message, style=None, ending='\n'):
+        """Escribe a stdout con flush inmediato para evitar bloqueos"""
+        if style:
+            message = style(message)
+        self.stdout.write(message, ending=ending)
+        self.stdout.flush()
+
+    def handle(self, *args, **options):
+        secciones = list(SECCIONES) if options['all'] else options['secciones']
+        if not secciones:
+            raise CommandError("Indica al menos una sección o usa --all")
+        desconocidas = [s for s in secciones if s not in SECCIONES]
+        if desconocidas:
+            raise CommandError(f"Secciones desconocidas: {', '.join(desconocidas)}")
+
+        incremental = opciones_incrementales(options)
+        if options['concurrency'] > 1:
+            engine = AsyncScraperEngine(
+                write=self.safe_write, concurrency=options['concurrency'], **incremental
+            )
+        else:
+            engine = ScraperEngine(write=self.safe_write, **incremental)
+        resumenes = engine.run_many(secciones)
+
+        nuevas = sum(r.get('nuevas', 0) for r in resumenes)
+        actualizadas = sum(r.get('actualizadas', 0) for r in resumenes)
+        conocidas = sum(r.get('conocidas', 0) for r in resumenes)
+        self.safe_write(self.style.SUCCESS(
+            f"✅ {len(resumenes)} secciones: {nuevas} nuevas, {actualizadas} actualizadas, "
+            f"{conocidas} ya conocidas"
+        ))
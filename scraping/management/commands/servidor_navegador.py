@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping.engine.browser_server import Supervisor
+
+
+class Command(BaseCommand):
+    help = 'Lanza y supervisa el Chromium compartido al que se conectan los workers (SCRAPER_BROWSER_WS)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint', default=settings.SCRAPER_BROWSER_WS or 'ws://127.0.0.1:3000/scraper',
+            help='ws://host:puerto/ruta donde escuchar'
+        )
+        parser.add_argument('--max-rss-mb', type=int, default=settings.SCRAPER_BROWSER_SERVER_MAX_RSS_MB)
+        parser.add_argument(
+            '--intervalo', type=float, default=settings.SCRAPER_BROWSER_SERVER_INTERVAL,
+            help='Segundos entre chequeos de salud'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SCRAPER_BROWSER_WS:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ SCRAPER_BROWSER_WS está vacío: los workers no se conectarán a {options['endpoint']}"
+            ))
+        supervisor = Supervisor(
+            options['endpoint'],
+            max_rss_mb=options['max_rss_mb'],
+            intervalo=options['intervalo'],
+            write=self.stdout.write,
+        )
+        try:
+            supervisor.supervisar()
+        except KeyboardInterrupt:
+            self.stdout.write("🛑 Servidor de navegador detenido")
+        except RuntimeError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,92 @@
+import hashlib
+
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def _hash(enlace):
+    # hash_enlace tal como era en esta migración: sha1 del enlace sin
+    # canonicalizar. El hash_enlace actual canonicaliza antes de hashear, así
+    # que estos valores se recalculan en la migración que lo introdujo
+    if not enlace or not enlace.strip():
+        return None
+    return hashlib.sha1(enlace.strip().encode('utf-8')).hexdigest()
+
+
+def fusionar_en(apps, conservar, duplicados):
+    """Mueve relaciones y datos de ``duplicados`` a ``conservar`` y los borra"""
+    Noticia = apps.get_model('scraping', 'Noticia')
+    NoticiasVistas = apps.get_model('scraping', 'NoticiasVistas')
+    AnalisisNoticia = apps.get_model('analisis', 'AnalisisNoticia')
+    Actividad = apps.get_model('accounts', 'Actividad')
+    ids = [d.pk for d in duplicados]
+
+    # Tablas con unique (usuario, noticia): solo se mueven las que no chocan
+    for modelo in (NoticiasVistas, AnalisisNoticia):
+        usuarios = set(modelo.objects.filter(noticia=conservar).values_list('usuario_id', flat=True))
+        for fila in modelo.objects.filter(noticia_id__in=ids).order_by('id'):
+            if fila.usuario_id in usuarios:
+                fila.delete()
+            else:
+                usuarios.add(fila.usuario_id)
+                modelo.objects.filter(pk=fila.pk).update(noticia=conservar)
+    Actividad.objects.filter(noticia_id__in=ids).update(noticia=conservar)
+
+    for duplicado in duplicados:
+        for campo in ('autor', 'fecha', 'imagen'):
+            if not getattr(conservar, campo) and getattr(duplicado, campo):
+                setattr(conservar, campo, getattr(duplicado, campo))
+    conservar.save(update_fields=['autor', 'fecha', 'imagen'])
+    Noticia.objects.filter(pk__in=ids).delete()
+
+
+def backfill_y_fusionar(apps, schema_editor):
+    Noticia = apps.get_model('scraping', 'Noticia')
+
+    pendientes = []
+    for noticia in Noticia.objects.exclude(enlace__isnull=True).only('id', 'enlace').iterator(chunk_size=BATCH_SIZE):
+        noticia.enlace_hash = _hash(noticia.enlace)
+        pendientes.append(noticia)
+        if len(pendientes) >= BATCH_SIZE:
+            Noticia.objects.bulk_update(pendientes, ['enlace_hash'])
+            pendientes = []
+    if pendientes:
+        Noticia.objects.bulk_update(pendientes, ['enlace_hash'])
+
+    repetidas = (
+        Noticia.objects.exclude(enlace_hash__isnull=True)
+        .order_by()
+        .values('origen', 'enlace_hash')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    # Se conserva la fila más antigua: es la que ya tienen enlazada vistas y análisis
+    for grupo in list(repetidas):
+        filas = list(Noticia.objects.filter(
+            origen=grupo['origen'], enlace_hash=grupo['enlace_hash']
+        ).order_by('id'))
+        fusionar_en(apps, filas[0], filas[1:])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0005_noticiasvistas'),
+        ('analisis', '0008_remove_analisisnoticia_unique_analisis_por_usuario_and_more'),
+        ('accounts', '0004_actividad'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='enlace_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True),
+        ),
+        migrations.RunPython(backfill_y_fusionar, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='noticia',
+            constraint=models.UniqueConstraint(fields=('origen', 'enlace_hash'), name='noticia_origen_enlace_hash_uniq'),
+        ),
+    ]
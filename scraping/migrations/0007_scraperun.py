@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0006_noticia_enlace_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=64, unique=True)),
+                ('tipo', models.CharField(choices=[('completa', 'Corrida completa'), ('comando', 'Comando'), ('seccion', 'Sección')], default='seccion', max_length=20)),
+                ('estado', models.CharField(choices=[('en_curso', 'En curso'), ('ok', 'OK'), ('parcial', 'Parcial'), ('error', 'Error')], default='en_curso', max_length=20)),
+                ('inicio', models.DateTimeField()),
+                ('fin', models.DateTimeField(blank=True, null=True)),
+                ('duracion', models.FloatField(blank=True, null=True)),
+                ('secciones_total', models.PositiveIntegerField(default=0)),
+                ('encontradas', models.PositiveIntegerField(default=0)),
+                ('nuevas', models.PositiveIntegerField(default=0)),
+                ('actualizadas', models.PositiveIntegerField(default=0)),
+                ('saltadas', models.PositiveIntegerField(default=0)),
+                ('errores', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-inicio'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapeSectionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seccion', models.CharField(max_length=50)),
+                ('origen', models.CharField(max_length=100)),
+                ('inicio', models.DateTimeField()),
+                ('fin', models.DateTimeField()),
+                ('duracion', models.FloatField(default=0)),
+                ('tier', models.CharField(blank=True, max_length=20)),
+                ('paginas', models.PositiveIntegerField(default=0)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('requests_bloqueados', models.PositiveIntegerField(default=0)),
+                ('encontradas', models.PositiveIntegerField(default=0)),
+                ('nuevas', models.PositiveIntegerField(default=0)),
+                ('actualizadas', models.PositiveIntegerField(default=0)),
+                ('saltadas', models.PositiveIntegerField(default=0)),
+                ('errores', models.PositiveIntegerField(default=0)),
+                ('conocidas', models.PositiveIntegerField(default=0)),
+                ('timeouts_selector', models.PositiveIntegerField(default=0)),
+                ('rss_navegador_mb', models.FloatField(default=0)),
+                ('rss_proceso_mb', models.FloatField(default=0)),
+                ('espera_limite', models.FloatField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('corrida', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secciones', to='scraping.scraperun')),
+            ],
+            options={
+                'ordering': ['-inicio'],
+                'indexes': [models.Index(fields=['seccion', '-inicio'], name='scraping_sc_seccion_642d63_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0007_scraperun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='imagen_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
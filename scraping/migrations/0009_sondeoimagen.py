@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0008_noticia_imagen_dimensiones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SondeoImagen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('url', models.TextField()),
+                ('estado_http', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('tamano', models.PositiveIntegerField(blank=True, null=True)),
+                ('ancho', models.PositiveIntegerField(blank=True, null=True)),
+                ('alto', models.PositiveIntegerField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
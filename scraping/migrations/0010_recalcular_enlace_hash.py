@@ -0,0 +1,105 @@
+import hashlib
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# No se congela: el hash tiene que coincidir con el que calcula
+# scraping.models.hash_enlace al guardar, y ese usa esta misma función
+from scraping.utils.canonical import canonicalizar_url
+
+BATCH_SIZE = 1000
+
+
+def _hash(enlace):
+    enlace = canonicalizar_url(enlace)
+    if not enlace:
+        return None
+    return hashlib.sha1(enlace.encode('utf-8')).hexdigest()
+
+
+def fusionar_en(apps, conservar, duplicados):
+    """Mueve a ``conservar`` las relaciones de ``duplicados`` y los borra (ver storage.fusionar_noticias)"""
+    Noticia = apps.get_model('scraping', 'Noticia')
+    ids = [d.pk for d in duplicados]
+    for relacion in Noticia._meta.related_objects:
+        if not relacion.one_to_many:
+            continue
+        modelo, campo = relacion.related_model, relacion.field.name
+        filas = modelo.objects.filter(**{f'{campo}__in': ids})
+        unicos = [u for u in modelo._meta.unique_together if campo in u]
+        if not unicos:
+            filas.update(**{campo: conservar})
+            continue
+
+        otros = [modelo._meta.get_field(c).attname for c in unicos[0] if c != campo]
+        ocupados = set(modelo.objects.filter(**{campo: conservar}).values_list(*otros))
+        for fila in filas.order_by('pk'):
+            valor = tuple(getattr(fila, c) for c in otros)
+            if valor in ocupados:
+                fila.delete()
+            else:
+                ocupados.add(valor)
+                modelo.objects.filter(pk=fila.pk).update(**{campo: conservar})
+
+    for duplicado in duplicados:
+        for campo in ('autor', 'fecha'):
+            if not getattr(conservar, campo) and getattr(duplicado, campo):
+                setattr(conservar, campo, getattr(duplicado, campo))
+        if not conservar.imagen and duplicado.imagen:
+            conservar.imagen = duplicado.imagen
+            conservar.imagen_ancho, conservar.imagen_alto = duplicado.imagen_ancho, duplicado.imagen_alto
+    conservar.save(update_fields=['autor', 'fecha', 'imagen', 'imagen_ancho', 'imagen_alto'])
+    Noticia.objects.filter(pk__in=ids).delete()
+
+
+def recalcular_y_fusionar(apps, schema_editor):
+    """enlace_hash con el enlace canónico; las noticias que pasan a coincidir se fusionan"""
+    Noticia = apps.get_model('scraping', 'Noticia')
+
+    pendientes = []
+    for noticia in Noticia.objects.exclude(enlace__isnull=True).only('id', 'enlace', 'enlace_hash').iterator(chunk_size=BATCH_SIZE):
+        enlace_hash = _hash(noticia.enlace)
+        if enlace_hash == noticia.enlace_hash:
+            continue
+        noticia.enlace_hash = enlace_hash
+        pendientes.append(noticia)
+        if len(pendientes) >= BATCH_SIZE:
+            Noticia.objects.bulk_update(pendientes, ['enlace_hash'])
+            pendientes = []
+    if pendientes:
+        Noticia.objects.bulk_update(pendientes, ['enlace_hash'])
+
+    repetidas = (
+        Noticia.objects.exclude(enlace_hash__isnull=True)
+        .order_by()
+        .values('origen', 'enlace_hash')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    # Se conserva la fila más antigua, igual que en 0006 y canonicalizar_enlaces
+    for grupo in list(repetidas):
+        filas = list(Noticia.objects.filter(
+            origen=grupo['origen'], enlace_hash=grupo['enlace_hash']
+        ).order_by('id'))
+        fusionar_en(apps, filas[0], filas[1:])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0009_sondeoimagen'),
+    ]
+
+    operations = [
+        # Sin la restricción mientras tanto: dos enlaces que solo difieren en
+        # tracking o barra final chocan hasta que se fusionan
+        migrations.RemoveConstraint(
+            model_name='noticia',
+            name='noticia_origen_enlace_hash_uniq',
+        ),
+        migrations.RunPython(recalcular_y_fusionar, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='noticia',
+            constraint=models.UniqueConstraint(fields=('origen', 'enlace_hash'), name='noticia_origen_enlace_hash_uniq'),
+        ),
+    ]
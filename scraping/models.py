@@ -1,6 +1,20 @@
+import hashlib
+
 from django.db import models
 from django.contrib.auth.models import User
 
+from scraping.engine.images import dimensiones_url
+from scraping.utils.canonical import canonicalizar_url
+
+
+def hash_enlace(enlace):
+    """Hash de longitud fija del enlace canónico, indexable (enlace es TextField)"""
+    enlace = canonicalizar_url(enlace)
+    if not enlace:
+        return None
+    return hashlib.sha1(enlace.encode('utf-8')).hexdigest()
+
+
 class Noticia(models.Model):
     titulo = models.CharField(max_length=255)
     autor = models.CharField(max_length=255, blank=True, null=True)
@@ -9,10 +23,24 @@ class Noticia(models.Model):
     enlace = models.TextField(blank=True, null=True)  # TextField para URLs largas
     origen = models.CharField(max_length=100, default='desconocido')
     fecha_scraping = models.DateTimeField(auto_now_add=True)  # Para saber cuándo se scrapeó
+    enlace_hash = models.CharField(max_length=40, blank=True, null=True, editable=False)  # Clave de deduplicación
+    # Dimensiones declaradas en la URL de la imagen, parseadas una vez al guardar
+    imagen_ancho = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    imagen_alto = models.PositiveIntegerField(blank=True, null=True, editable=False)
     
     class Meta:
         ordering = ['-fecha', '-fecha_scraping']  # Ordenar por fecha de publicación, luego por scraping
+        constraints = [
+            models.UniqueConstraint(fields=['origen', 'enlace_hash'], name='noticia_origen_enlace_hash_uniq'),
+        ]
         
+    def save(self, *args, **kwargs):
+        self.enlace_hash = hash_enlace(self.enlace)
+        if self.imagen_ancho is None and self.imagen_alto is None:
+            # Sin dimensiones reales del sondeo: las que declara la URL
+            self.imagen_ancho, self.imagen_alto = dimensiones_url(self.imagen)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"[{self.origen}] {self.titulo}"
 
@@ -26,4 +54,92 @@ class NoticiasVistas(models.Model):
         ordering = ['-fecha_vista']
     
     def __str__(self):
-        return f"{self.usuario.username} - {self.noticia.titulo}"
\ No newline at end of file
+        return f"{self.usuario.username} - {self.noticia.titulo}"
+
+class ScrapeRun(models.Model):
+    """Una corrida de scraping: el chord completo, un comando o una sección suelta"""
+    TIPOS = [
+        ('completa', 'Corrida completa'),
+        ('comando', 'Comando'),
+        ('seccion', 'Sección'),
+    ]
+    ESTADOS = [
+        ('en_curso', 'En curso'),
+        ('ok', 'OK'),
+        ('parcial', 'Parcial'),
+        ('error', 'Error'),
+    ]
+
+    run_id = models.CharField(max_length=64, unique=True)
+    tipo = models.CharField(max_length=20, choices=TIPOS, default='seccion')
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='en_curso')
+    inicio = models.DateTimeField()
+    fin = models.DateTimeField(blank=True, null=True)
+    duracion = models.FloatField(blank=True, null=True)  # segundos de reloj de pared
+    secciones_total = models.PositiveIntegerField(default=0)
+    encontradas = models.PositiveIntegerField(default=0)
+    nuevas = models.PositiveIntegerField(default=0)
+    actualizadas = models.PositiveIntegerField(default=0)
+    saltadas = models.PositiveIntegerField(default=0)
+    errores = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-inicio']
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.inicio:%Y-%m-%d %H:%M} ({self.estado})"
+
+
+class ScrapeSectionRun(models.Model):
+    """Métricas de una sección dentro de una corrida, escritas por el motor"""
+    corrida = models.ForeignKey(ScrapeRun, on_delete=models.CASCADE, related_name='secciones')
+    seccion = models.CharField(max_length=50)
+    origen = models.CharField(max_length=100)
+    inicio = models.DateTimeField()
+    fin = models.DateTimeField()
+    duracion = models.FloatField(default=0)
+    tier = models.CharField(max_length=20, blank=True)  # 'static' | 'browser'
+    paginas = models.PositiveIntegerField(default=0)  # páginas de navegador abiertas
+    requests = models.PositiveIntegerField(default=0)  # requests salientes (HTTP o del navegador)
+    requests_bloqueados = models.PositiveIntegerField(default=0)
+    encontradas = models.PositiveIntegerField(default=0)
+    nuevas = models.PositiveIntegerField(default=0)
+    actualizadas = models.PositiveIntegerField(default=0)
+    saltadas = models.PositiveIntegerField(default=0)
+    errores = models.PositiveIntegerField(default=0)
+    conocidas = models.PositiveIntegerField(default=0)
+    timeouts_selector = models.PositiveIntegerField(default=0)
+    rss_navegador_mb = models.FloatField(default=0)
+    rss_proceso_mb = models.FloatField(default=0)
+    espera_limite = models.FloatField(default=0)  # segundos esperando al rate limit
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-inicio']
+        indexes = [models.Index(fields=['seccion', '-inicio'])]
+
+    @property
+    def articulos_por_segundo(self):
+        return round(self.encontradas / self.duracion, 2) if self.duracion else 0.0
+
+    def __str__(self):
+        return f"{self.seccion} {self.inicio:%Y-%m-%d %H:%M}"
+
+
+class SondeoImagen(models.Model):
+    """Datos reales de una URL de imagen (tipo, peso, dimensiones), sondeada una sola vez"""
+    url_hash = models.CharField(max_length=40, unique=True)  # sha1 de la URL exacta
+    url = models.TextField()
+    estado_http = models.PositiveSmallIntegerField(blank=True, null=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    tamano = models.PositiveIntegerField(blank=True, null=True)  # bytes del archivo completo
+    ancho = models.PositiveIntegerField(blank=True, null=True)
+    alto = models.PositiveIntegerField(blank=True, null=True)
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def es_imagen(self):
+        return self.estado_http is not None and self.estado_http < 400 and self.content_type.startswith('image/')
+
+    def __str__(self):
+        return f"{self.url[:60]} ({self.ancho}x{self.alto})"
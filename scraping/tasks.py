@@ -1,188 +1,535 @@
-from celery import shared_task
-from django.core.management import call_command
+from celery import chord, group, shared_task
 import time
 import subprocess
 import sys
 import threading
 import queue
 import os
-import re
-from celery.exceptions import TimeoutError
+from celery.exceptions import SoftTimeLimitExceeded, TimeoutError
+from celery.utils import uuid
+from django.conf import settings
+from .engine.browser import get_browser_pool
+from .engine.circuit import CircuitoAbierto
+from .engine.control import Cancelacion, ScrapeCancelado
+from .engine.history import abrir_corrida, cerrar_corrida
+from .engine.core import ScraperEngine
+from .engine.progress import PREFIJO, Reportero, parsear_evento
+from .engine.scheduler import liberar, posponer, registrar_corrida, reservar_si_vencida
+from .engine.sections import SECCIONES, get_seccion, get_seccion_por_comando
+from .engine.state import registrar_arranque, registrar_seccion_corrida, ultimo_arranque
+from .utils.thumbnails import desalojar
+
+# Fase del protocolo de progreso -> índice en las 'phases' de cada comando
+FASE_A_INDICE = {
+    'inicio': 0, 'estatico': 1, 'navegando': 1, 'scroll': 2,
+    'extrayendo': 3, 'guardando': 4, 'fin': 5,
+}
+PROGRESS_HEARTBEAT = 3  # segundos sin eventos antes de refrescar elapsed_time
+
+def iniciar_scraping_completo():
+    """Reparte todas las secciones como un chord y devuelve el AsyncResult de la corrida.
+
+    Cada sección es una tarea ``scrape_section`` independiente (su propio
+    reintento y timeout) que puede tomar cualquier worker; el callback
+    ``resumir_scraping`` junta los resúmenes. El id del callback se fija de
+    antemano: es el único task id que la UI consulta, y las secciones van
+    publicando en él el progreso de la corrida.
+    """
+    run_id = uuid()
+    inicio = time.time()
+    secciones = list(SECCIONES)
+    header = group(
+        scrape_section.s(slug, run_id, len(secciones)).set(
+            soft_time_limit=section_timeout(slug), time_limit=section_timeout(slug) + 60
+        )
+        for slug in secciones
+    )
+    callback = resumir_scraping.s(run_id, inicio).set(task_id=run_id)
+    abrir_corrida(run_id, 'completa', len(secciones), inicio)
+    scrape_section.update_state(
+        task_id=run_id,
+        state='PROGRESS',
+        meta={
+            'current': 0,
+            'total': 100,
+            'status': f"🔄 Repartiendo {len(secciones)} secciones...",
+            'command': 'scrape_all_sections',
+            'sections_done': 0,
+            'sections_total': len(secciones),
+        }
+    )
+    return chord(header)(callback)
+
+
+def section_timeout(slug):
+    comando = get_seccion(slug)['comando']
+    return COMMAND_CONFIG.get(comando, DEFAULT_COMMAND_CONFIG)['timeout']
+
 
 @shared_task
 def scrape_all_sections():
-    """Tarea para ejecutar todos los scrapers (sin progreso individual)"""
-    call_command('scrape_elcomercio')
-    call_command('scrape_economia') 
-    call_command('scrape_elcomercio_pol')
-    call_command('scrape_mundo')
-    call_command('scrape_tecnologia')
-    call_command('scrape_peru21')
-    call_command('scrape_peru21D')
-    call_command('scrape_peru21G')
-    call_command('scrape_peru21I')
-    call_command('scrape_peru21L')
+    """Tarea periódica (beat): lanza la corrida completa en paralelo"""
+    return {'run_id': iniciar_scraping_completo().id}
+
+
+@shared_task
+def programar_secciones():
+    """Tarea periódica (beat): despacha las secciones cuya próxima corrida ya venció"""
+    despachadas = []
+    for slug in SECCIONES:
+        timeout = section_timeout(slug)
+        candado = reservar_si_vencida(slug, ttl=timeout + 120)
+        if candado:
+            scrape_section.apply_async(
+                (slug,), {'candado': candado}, soft_time_limit=timeout, time_limit=timeout + 60
+            )
+            despachadas.append(slug)
+    return {'despachadas': despachadas}
+
+
+@shared_task
+def desalojar_miniaturas():
+    """Tarea periódica (beat): recorta la caché de miniaturas a SCRAPER_THUMB_MAX_MB"""
+    return {'desalojados': desalojar()}
+
+
+@shared_task(bind=True, max_retries=2)
+def scrape_section(self, slug, run_id=None, sections_total=None, candado=None):
+    """Scrapea una sección en este worker y publica el avance de la corrida.
+
+    ``candado`` es el token de ``reservar_si_vencida`` cuando la despachó
+    ``programar_secciones``; solo entonces la tarea suelta ese candado.
+    """
+    try:
+        engine = ScraperEngine(
+            pool=get_browser_pool(),
+            cancelacion=Cancelacion(self.request.id, timeout=section_timeout(slug)),
+            run_id=run_id,
+        )
+        resumen = engine.run(slug)
+    except (SoftTimeLimitExceeded, ScrapeCancelado) as exc:
+        # Un timeout no se reintenta: volvería a tardar lo mismo
+        resumen = {'seccion': slug, 'error': str(exc) or 'timeout'}
+    except CircuitoAbierto as exc:
+        # El dominio está en espera: la cadencia la vuelve a intentar tras el sondeo
+        resumen = {'seccion': slug, 'error': str(exc)}
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=30 * (self.request.retries + 1))
+        # Sin reintentos: se devuelve el error para no romper el chord
+        resumen = {'seccion': slug, 'error': str(exc)}
+
+    # Cadencia adaptativa: las nuevas de esta corrida fijan cuándo toca la próxima
+    if 'error' in resumen:
+        posponer(slug)
+    else:
+        registrar_corrida(slug, resumen.get('nuevas', 0))
+    if candado:
+        # Las secciones del chord no lo tomaron: no sueltan el de una corrida programada
+        liberar(slug, candado)
+
+    if run_id:
+        terminadas = registrar_seccion_corrida(run_id, slug, resumen)
+        total = sections_total or len(SECCIONES)
+        self.update_state(
+            task_id=run_id,
+            state='PROGRESS',
+            meta={
+                'current': min(99, int(len(terminadas) * 100 / total)),
+                'total': 100,
+                'status': f"📄 Secciones terminadas ({len(terminadas)}/{total})",
+                'command': 'scrape_all_sections',
+                'sections_done': len(terminadas),
+                'sections_total': total,
+                'articles_new': sum(r.get('nuevas', 0) for r in terminadas.values()),
+                'articles_updated': sum(r.get('actualizadas', 0) for r in terminadas.values()),
+            }
+        )
+    return resumen
+
+
+@shared_task
+def resumir_scraping(resumenes, run_id=None, inicio=None):
+    """Callback del chord: un solo resumen de la corrida completa"""
+    totales = {
+        campo: sum(r.get(campo, 0) for r in resumenes)
+        for campo in ('encontradas', 'nuevas', 'actualizadas', 'errores', 'conocidas')
+    }
+    fallidas = [r['seccion'] for r in resumenes if 'error' in r]
+    duraciones = {r['seccion']: r.get('duracion') for r in resumenes if r.get('duracion') is not None}
+    resumen = {
+        'status': 'success' if not fallidas else 'partial',
+        'run_id': run_id,
+        'secciones': resumenes,
+        'totales': totales,
+        'secciones_fallidas': fallidas,
+        'duraciones': duraciones,
+        # Suma de secciones vs. reloj de pared: cuánto se ganó al repartir
+        'duracion_secuencial': round(sum(duraciones.values()), 2),
+        'duracion_total': round(time.time() - inicio, 2) if inicio else None,
+        'completed': True,
+    }
+    if run_id:
+        cerrar_corrida(run_id)
+    duracion = f" en {resumen['duracion_total']}s" if resumen['duracion_total'] is not None else ""
+    print(f"✅ Corrida {run_id}: {totales['nuevas']} nuevas, {totales['actualizadas']} actualizadas, "
+          f"{len(fallidas)} secciones fallidas{duracion}")
+    return resumen
+
+
+# Configuración por comando: timeout, noticias estimadas y mensajes por fase
+COMMAND_CONFIG = {
+    'scrape_elcomercio': {
+        'timeout': 900,
+        'estimated_articles': 80,
+        'phases': [
+            (5, "🔄 Iniciando scraping El Comercio..."),
+            (15, "🌐 Navegando a portada principal..."),
+            (25, "📜 Cargando secciones..."),
+            (40, "📄 Extrayendo noticias..."),
+            (85, "💾 Guardando en base de datos..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping El Comercio completado!")
+        ]
+    },
+    'scrape_economia': {
+        'timeout': 480,
+        'estimated_articles': 25,
+        'phases': [
+            (5, "🔄 Iniciando scraping Economía..."),
+            (20, "🌐 Accediendo a sección económica..."),
+            (35, "📜 Cargando datos financieros..."),
+            (50, "📄 Procesando noticias económicas..."),
+            (85, "💾 Guardando información..."),
+            (95, "📊 Finalizando..."),
+            (100, "✅ Scraping Economía completado!")
+        ]
+    },
+    'scrape_elcomercio_pol': {
+        'timeout': 480,
+        'estimated_articles': 25,
+        'phases': [
+            (5, "🔄 Iniciando scraping Política..."),
+            (20, "🌐 Accediendo a sección política..."),
+            (35, "📜 Cargando noticias políticas..."),
+            (50, "📄 Procesando contenido..."),
+            (85, "💾 Guardando datos..."),
+            (95, "📊 Finalizando..."),
+            (100, "✅ Scraping Política completado!")
+        ]
+    },
+    'scrape_mundo': {
+        'timeout': 480,
+        'estimated_articles': 25,
+        'phases': [
+            (5, "🔄 Iniciando scraping Mundo..."),
+            (20, "🌐 Accediendo a noticias internacionales..."),
+            (35, "📜 Cargando noticias globales..."),
+            (50, "📄 Procesando información..."),
+            (85, "💾 Guardando datos..."),
+            (95, "📊 Finalizando..."),
+            (100, "✅ Scraping Mundo completado!")
+        ]
+    },
+    'scrape_tecnologia': {
+        'timeout': 480,
+        'estimated_articles': 25,
+        'phases': [
+            (5, "🔄 Iniciando scraping Tecnología..."),
+            (20, "🌐 Accediendo a sección tecnológica..."),
+            (35, "📜 Cargando noticias de tech..."),
+            (50, "📄 Procesando innovaciones..."),
+            (85, "💾 Guardando datos..."),
+            (95, "📊 Finalizando..."),
+            (100, "✅ Scraping Tecnología completado!")
+        ]
+    },
+    'scrape_peru21': {
+        'timeout': 1800,
+        'estimated_articles': 50,
+        'phases': [
+            (5, "🔄 Iniciando scraping Peru21..."),
+            (15, "🌐 Navegando a portada..."),
+            (25, "📜 Cargando noticias..."),
+            (40, "📄 Procesando noticias..."),
+            (85, "💾 Guardando en base de datos..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping Peru21 completado!")
+        ]
+    },
+    'scrape_peru21D': {
+        'timeout': 1800,
+        'estimated_articles': 30,
+        'phases': [
+            (5, "🔄 Iniciando scraping Deportes..."),
+            (15, "🌐 Navegando a sección deportiva..."),
+            (25, "📜 Cargando noticias deportivas..."),
+            (40, "📄 Procesando resultados..."),
+            (85, "💾 Guardando datos..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping Deportes completado!")
+        ]
+    },
+    'scrape_peru21G': {
+        'timeout': 1800,
+        'estimated_articles': 25,
+        'phases': [
+            (5, "🔄 Iniciando scraping Gastronomía..."),
+            (15, "🌐 Navegando a sección gastronómica..."),
+            (25, "📜 Cargando recetas y noticias..."),
+            (40, "📄 Procesando contenido..."),
+            (85, "💾 Guardando datos..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping Gastronomía completado!")
+        ]
+    },
+    'scrape_peru21I': {
+        'timeout': 1800,
+        'estimated_articles': 20,
+        'phases': [
+            (5, "🔄 Iniciando scraping Investigación..."),
+            (15, "🌐 Navegando a reportajes..."),
+            (25, "📜 Cargando investigaciones..."),
+            (40, "📄 Procesando datos..."),
+            (85, "💾 Guardando información..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping Investigación completado!")
+        ]
+    },
+    'scrape_peru21L': {
+        'timeout': 1800,
+        'estimated_articles': 30,
+        'phases': [
+            (5, "🔄 Iniciando scraping Lima..."),
+            (15, "🌐 Navegando a sección Lima..."),
+            (25, "📜 Cargando noticias locales..."),
+            (40, "📄 Procesando noticias de Lima..."),
+            (85, "💾 Guardando en base de datos..."),
+            (95, "📊 Generando reporte..."),
+            (100, "✅ Scraping Lima completado!")
+        ]
+    },
+}
+
+DEFAULT_COMMAND_CONFIG = {
+    'timeout': 600,
+    'estimated_articles': 20,
+    'phases': [
+        (5, "🔄 Preparando scraping..."),
+        (25, "🌐 Navegando..."),
+        (40, "📄 Procesando contenido..."),
+        (70, "💾 Guardando datos..."),
+        (90, "📊 Finalizando..."),
+        (100, "✅ Scraping completado")
+    ]
+}
+
+
+class ProgressTracker:
+    """Traduce los eventos del motor (engine/progress.py) a update_state de Celery.
+
+    Lo usan los dos modos de ejecución: en ``subprocess`` los eventos llegan
+    como JSON lines por el pipe, en ``inprocess`` por callback directo.
+    """
+
+    def __init__(self, task, command_name, config, start_time):
+        self.task = task
+        self.command_name = command_name
+        self.phases = config['phases']
+        self.timeout = config['timeout']
+        self.start_time = start_time
+        self.phase_index = 0
+        self.articles_processed = 0
+        self.total_articles_found = 0
+        self.section_summary = {}
+        self.startup_seconds = None
+
+    def apply(self, evento):
+        tipo = evento['evento']
+        if tipo == 'inicio' and self.startup_seconds is None:
+            # Desde que arrancó la tarea hasta que el motor empieza a trabajar
+            self.startup_seconds = round(time.time() - self.start_time, 3)
+        elif tipo == 'fase':
+            self.phase_index = min(FASE_A_INDICE.get(evento['fase'], self.phase_index), len(self.phases) - 1)
+        elif tipo == 'encontradas':
+            self.total_articles_found = evento['total']
+            self.phase_index = min(3, len(self.phases) - 1)
+        elif tipo == 'procesada':
+            self.articles_processed = evento['i']
+            self.total_articles_found = max(self.total_articles_found, evento['total'])
+        elif tipo == 'fin':
+            self.section_summary = evento.get('resumen', {})
+            self.phase_index = min(5, len(self.phases) - 1)
+        elif tipo == 'lote':
+            # Llega desde el hilo escritor: no se publica desde ahí
+            return
+        self.publish()
+
+    def publish(self):
+        """Actualizar progreso basado en noticias procesadas"""
+        current_progress, current_status = self.phases[self.phase_index]
+
+        # PROGRESO REAL BASADO EN NOTICIAS
+        if self.total_articles_found > 0 and self.phase_index == 3:
+            article_ratio = self.articles_processed / self.total_articles_found
+            current_progress = min(85, int(40 + (article_ratio * 45)))  # 40% a 85%
+            current_status = f"📄 Procesando noticias ({self.articles_processed}/{self.total_articles_found})"
+
+        self.task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': current_progress,
+                'total': 100,
+                'status': current_status,
+                'command': self.command_name,
+                'articles_processed': self.articles_processed,
+                'total_articles_found': self.total_articles_found,
+                'elapsed_time': int(time.time() - self.start_time),
+                'timeout': self.timeout,
+                'phase': f'phase_{self.phase_index + 1}'
+            }
+        )
+
+
+def _run_subprocess(task, command_name, tracker, timeout):
+    """Ejecuta ``manage.py <comando>`` aislado; devuelve el código de salida"""
+    # Configurar entorno UTF-8
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+    
+    creation_flags = 0
+    popen_kwargs = {}
+    progress_read = None
+    if sys.platform == 'win32':
+        creation_flags = subprocess.CREATE_NO_WINDOW
+        # Windows no hereda descriptores: el protocolo va por stdout con prefijo
+        env['SCRAPER_PROGRESS_STDOUT'] = '1'
+    else:
+        # Canal dedicado para los eventos JSON del motor (ver engine/progress.py)
+        progress_read, progress_write = os.pipe()
+        env['SCRAPER_PROGRESS_FD'] = str(progress_write)
+        popen_kwargs['pass_fds'] = (progress_write,)
+    
+    events = queue.Queue()
+    
+    def _reader_thread(pipe, canal):
+        """Hilo que pasa cada línea de ``pipe`` a la cola de eventos"""
+        try:
+            for line in iter(pipe.readline, ''):
+                events.put((canal, line.rstrip('\n')))
+        finally:
+            events.put((canal, None))  # Señal de fin
+            pipe.close()
+    
+    # Iniciar proceso con buffer line-buffered
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', command_name],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=env,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1,  # CRÍTICO: Line-buffered
+        creationflags=creation_flags,
+        **popen_kwargs
+    )
+    
+    readers = [threading.Thread(target=_reader_thread, args=(process.stdout, 'log'), daemon=True)]
+    if progress_read is not None:
+        os.close(progress_write)  # El hijo tiene su copia: EOF cuando termine
+        progress_pipe = os.fdopen(progress_read, encoding='utf-8', errors='replace')
+        readers.append(threading.Thread(target=_reader_thread, args=(progress_pipe, 'progreso'), daemon=True))
+    for reader in readers:
+        reader.start()
+    
+    print(f"🔄 Comando {command_name} ejecutándose (PID: {process.pid})")
+    
+    # Bucle principal: bloquea en la cola hasta el próximo evento (sin polling)
+    time_limit = timeout + 60
+    cancelacion = Cancelacion(task.request.id)
+    open_readers = len(readers)
+    while open_readers:
+        remaining = time_limit - (time.time() - tracker.start_time)
+        
+        # Timeout con margen de seguridad
+        if remaining <= 0:
+            print(f"⏰ Timeout alcanzado: {int(time.time() - tracker.start_time)}s > {time_limit}s")
+            process.kill()
+            for reader in readers:
+                reader.join(timeout=2)
+            raise TimeoutError(f"Tiempo límite excedido: {time_limit}s")
+        
+        # Cancelación pedida desde la UI: el subproceso no coopera, se termina
+        try:
+            cancelacion.verificar()
+        except ScrapeCancelado:
+            process.kill()
+            raise
+        
+        try:
+            canal, line = events.get(timeout=min(PROGRESS_HEARTBEAT, remaining))
+        except queue.Empty:
+            tracker.publish()  # Latido: mantiene elapsed_time al día
+            continue
+        
+        if line is None:
+            open_readers -= 1
+            continue
+        
+        evento = parsear_evento(line) if canal == 'progreso' or line.startswith(PREFIJO) else None
+        if evento is None:
+            print(f"📝 {command_name}: {line}")
+            continue
+        tracker.apply(evento)
+    
+    # Los lectores ya vieron EOF: el proceso terminó o está cerrando
+    try:
+        return process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return process.wait()
+
+
+def _run_in_process(task, spec, tracker, timeout):
+    """Ejecuta el motor dentro del worker, reutilizando su Chromium"""
+    engine = ScraperEngine(
+        pool=get_browser_pool(),
+        progreso=Reportero(callback=tracker.apply),
+        cancelacion=Cancelacion(task.request.id, timeout=timeout),
+    )
+    engine.run(spec)
+    return 0
+
 
 @shared_task(bind=True)
 def run_single_scrape(self, command_name):
-    """Versión MEJORADA con progreso REAL basado en noticias procesadas."""
+    """Versión MEJORADA con progreso REAL basado en noticias procesadas.
+
+    Con ``SCRAPER_EXECUTION_MODE='inprocess'`` el motor corre dentro del
+    worker (sin arrancar intérprete, Django ni Playwright por clic) con
+    timeout y cancelación cooperativos; ``'subprocess'`` mantiene el
+    aislamiento de un proceso por comando.
+    """
+    articles_processed = 0
     try:
-        # Configuración MEJORADA con progreso por noticias
-        command_config = {
-            'scrape_elcomercio': {
-                'timeout': 900,
-                'estimated_articles': 80,
-                'phases': [
-                    (5, "🔄 Iniciando scraping El Comercio..."),
-                    (15, "🌐 Navegando a portada principal..."),
-                    (25, "📜 Cargando secciones..."),
-                    (40, "📄 Extrayendo noticias..."),
-                    (85, "💾 Guardando en base de datos..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping El Comercio completado!")
-                ]
-            },
-            'scrape_economia': {
-                'timeout': 480,
-                'estimated_articles': 25,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Economía..."),
-                    (20, "🌐 Accediendo a sección económica..."),
-                    (35, "📜 Cargando datos financieros..."),
-                    (50, "📄 Procesando noticias económicas..."),
-                    (85, "💾 Guardando información..."),
-                    (95, "📊 Finalizando..."),
-                    (100, "✅ Scraping Economía completado!")
-                ]
-            },
-            'scrape_elcomercio_pol': {
-                'timeout': 480,
-                'estimated_articles': 25,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Política..."),
-                    (20, "🌐 Accediendo a sección política..."),
-                    (35, "📜 Cargando noticias políticas..."),
-                    (50, "📄 Procesando contenido..."),
-                    (85, "💾 Guardando datos..."),
-                    (95, "📊 Finalizando..."),
-                    (100, "✅ Scraping Política completado!")
-                ]
-            },
-            'scrape_mundo': {
-                'timeout': 480,
-                'estimated_articles': 25,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Mundo..."),
-                    (20, "🌐 Accediendo a noticias internacionales..."),
-                    (35, "📜 Cargando noticias globales..."),
-                    (50, "📄 Procesando información..."),
-                    (85, "💾 Guardando datos..."),
-                    (95, "📊 Finalizando..."),
-                    (100, "✅ Scraping Mundo completado!")
-                ]
-            },
-            'scrape_tecnologia': {
-                'timeout': 480,
-                'estimated_articles': 25,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Tecnología..."),
-                    (20, "🌐 Accediendo a sección tecnológica..."),
-                    (35, "📜 Cargando noticias de tech..."),
-                    (50, "📄 Procesando innovaciones..."),
-                    (85, "💾 Guardando datos..."),
-                    (95, "📊 Finalizando..."),
-                    (100, "✅ Scraping Tecnología completado!")
-                ]
-            },
-            'scrape_peru21': {
-                'timeout': 1800,
-                'estimated_articles': 50,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Peru21..."),
-                    (15, "🌐 Navegando a portada..."),
-                    (25, "📜 Cargando noticias..."),
-                    (40, "📄 Procesando noticias..."),
-                    (85, "💾 Guardando en base de datos..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping Peru21 completado!")
-                ]
-            },
-            'scrape_peru21D': {
-                'timeout': 1800,
-                'estimated_articles': 30,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Deportes..."),
-                    (15, "🌐 Navegando a sección deportiva..."),
-                    (25, "📜 Cargando noticias deportivas..."),
-                    (40, "📄 Procesando resultados..."),
-                    (85, "💾 Guardando datos..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping Deportes completado!")
-                ]
-            },
-            'scrape_peru21G': {
-                'timeout': 1800,
-                'estimated_articles': 25,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Gastronomía..."),
-                    (15, "🌐 Navegando a sección gastronómica..."),
-                    (25, "📜 Cargando recetas y noticias..."),
-                    (40, "📄 Procesando contenido..."),
-                    (85, "💾 Guardando datos..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping Gastronomía completado!")
-                ]
-            },
-            'scrape_peru21I': {
-                'timeout': 1800,
-                'estimated_articles': 20,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Investigación..."),
-                    (15, "🌐 Navegando a reportajes..."),
-                    (25, "📜 Cargando investigaciones..."),
-                    (40, "📄 Procesando datos..."),
-                    (85, "💾 Guardando información..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping Investigación completado!")
-                ]
-            },
-            'scrape_peru21L': {
-                'timeout': 1800,
-                'estimated_articles': 30,
-                'phases': [
-                    (5, "🔄 Iniciando scraping Lima..."),
-                    (15, "🌐 Navegando a sección Lima..."),
-                    (25, "📜 Cargando noticias locales..."),
-                    (40, "📄 Procesando noticias de Lima..."),
-                    (85, "💾 Guardando en base de datos..."),
-                    (95, "📊 Generando reporte..."),
-                    (100, "✅ Scraping Lima completado!")
-                ]
-            },
-        }
-        
         # Obtener configuración para este comando o usar valores por defecto
-        config = command_config.get(command_name, {
-            'timeout': 600,
-            'estimated_articles': 20,
-            'phases': [
-                (5, "🔄 Preparando scraping..."),
-                (25, "🌐 Navegando..."),
-                (40, "📄 Procesando contenido..."),
-                (70, "💾 Guardando datos..."),
-                (90, "📊 Finalizando..."),
-                (100, "✅ Scraping completado")
-            ]
-        })
+        config = COMMAND_CONFIG.get(command_name, DEFAULT_COMMAND_CONFIG)
         
         timeout = config['timeout']
         estimated_articles = config['estimated_articles']
         phases = config['phases']
         
         start_time = time.time()
-        current_phase_index = 0
+        tracker = ProgressTracker(self, command_name, config, start_time)
+        
+        try:
+            spec = get_seccion_por_comando(command_name)
+        except KeyError:
+            spec = None
+        mode = settings.SCRAPER_EXECUTION_MODE if spec is not None else 'subprocess'
         
-        print(f"🎯 Iniciando {command_name} (timeout: {timeout}s, estimado: {estimated_articles} noticias)")
+        print(f"🎯 Iniciando {command_name} (timeout: {timeout}s, estimado: {estimated_articles} noticias, modo: {mode})")
         
         # FASE 1: Inicio
         self.update_state(
@@ -198,148 +545,32 @@ def run_single_scrape(self, command_name):
                 'phase': 'starting'
             }
         )
-        time.sleep(1)
         
-        # Configurar entorno UTF-8
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
+        try:
+            if mode == 'inprocess':
+                return_code = _run_in_process(self, spec, tracker, timeout)
+            else:
+                return_code = _run_subprocess(self, command_name, tracker, timeout)
+        except ScrapeCancelado as exc:
+            if exc.motivo == 'timeout':
+                raise TimeoutError(str(exc))
+            raise
+        finally:
+            articles_processed = tracker.articles_processed
         
-        creation_flags = 0
-        if sys.platform == 'win32':
-            creation_flags = subprocess.CREATE_NO_WINDOW
+        total_articles_found = tracker.total_articles_found
+        section_summary = tracker.section_summary
         
-        # Función del hilo lector
-        def _reader_thread(pipe, output_queue):
-            """Hilo que lee la salida del proceso sin bloquear"""
-            try:
-                for line in iter(pipe.readline, ''):
-                    if line:
-                        output_queue.put(line.strip())
-            finally:
-                output_queue.put(None)  # Señal de fin
-                pipe.close()
-        
-        # Iniciar proceso con buffer line-buffered
-        process = subprocess.Popen(
-            [sys.executable, 'manage.py', command_name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            env=env,
-            encoding='utf-8',
-            errors='replace',
-            bufsize=1,  # CRÍTICO: Line-buffered
-            creationflags=creation_flags
-        )
-        
-        # Configurar hilo de lectura
-        output_queue = queue.Queue()
-        reader_thread = threading.Thread(target=_reader_thread, args=(process.stdout, output_queue))
-        reader_thread.daemon = True
-        reader_thread.start()
-        
-        print(f"🔄 Comando {command_name} ejecutándose (PID: {process.pid})")
-        
-        # Variables de seguimiento
-        articles_processed = 0
-        total_articles_found = 0
-        last_articles_count = 0
-        processing_started = False
-        
-        def update_progress():
-            """Actualizar progreso basado en noticias procesadas"""
-            nonlocal current_phase_index
-            
-            current_progress = phases[current_phase_index][0]
-            current_status = phases[current_phase_index][1]
-            
-            # PROGRESO REAL BASADO EN NOTICIAS
-            if processing_started and total_articles_found > 0:
-                if articles_processed > 0:
-                    article_ratio = articles_processed / total_articles_found
-                    article_progress = 40 + (article_ratio * 45)  # 40% a 85%
-                    current_progress = min(85, int(article_progress))
-                    current_status = f"📄 Procesando noticias ({articles_processed}/{total_articles_found})"
-                
-                if articles_processed >= total_articles_found and total_articles_found > 0:
-                    if current_phase_index < 4:
-                        current_phase_index = 4
-            
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': current_progress,
-                    'total': 100,
-                    'status': current_status,
-                    'command': command_name,
-                    'articles_processed': articles_processed,
-                    'total_articles_found': total_articles_found,
-                    'elapsed_time': int(time.time() - start_time),
-                    'timeout': timeout,
-                    'phase': f'phase_{current_phase_index + 1}'
-                }
-            )
-            
-            if articles_processed != last_articles_count:
-                print(f"📊 Progreso: {current_progress}% - {current_status} "
-                      f"(Noticias: {articles_processed}/{total_articles_found})")
-        
-        last_progress_update = time.time()
-        
-        # Bucle principal de monitoreo (SIMPLIFICADO - SIN select)
-        while True:
-            elapsed = time.time() - start_time
-            time_limit = timeout + 60
-            
-            # Timeout con margen de seguridad
-            if elapsed > time_limit:
-                print(f"⏰ Timeout alcanzado: {elapsed}s > {time_limit}s")
-                process.kill()
-                reader_thread.join(timeout=2)
-                raise TimeoutError(f"Tiempo límite excedido: {time_limit}s")
-            
-            # LEER OUTPUT SOLO DEL HILO (sin bloquear)
-            try:
-                line = output_queue.get_nowait()
-                if line is None:  # Fin del stream
-                    break
-                    
-                print(f"📝 {command_name}: {line}")
-                
-                # DETECTAR EVENTOS (regex mejorados)
-                if "Se encontraron" in line and "noticias" in line:
-                    match = re.search(r'Se encontraron\s+(\d+)\s+noticias', line)
-                    if match:
-                        total_articles_found = int(match.group(1))
-                        processing_started = True
-                        print(f"🎯 Total de noticias detectadas: {total_articles_found}")
-                
-                elif "Procesando noticia" in line:
-                    match = re.search(r'noticia\s+(\d+)/(\d+)', line)
-                    if match:
-                        articles_processed = int(match.group(1))
-                        total_num = int(match.group(2))
-                        if total_num > total_articles_found:
-                            total_articles_found = total_num
-                        print(f"📄 Noticia procesada: {articles_processed}/{total_articles_found}")
-                        
-            except queue.Empty:
-                # No hay datos, verificar si el proceso terminó
-                if process.poll() is not None and output_queue.empty():
-                    break
-            
-            # Actualizar progreso cada 3 segundos o cuando hay cambio
-            if (time.time() - last_progress_update > 3 or 
-                articles_processed != last_articles_count):
-                update_progress()
-                last_progress_update = time.time()
-                last_articles_count = articles_processed
-            
-            time.sleep(0.1)
-        
-        # Esperar a que el hilo de lectura termine
-        reader_thread.join(timeout=5)
-        return_code = process.poll()
+        # Latencia de arranque: se guarda por modo para comparar entre ejecuciones
+        startup = {'startup_seconds': tracker.startup_seconds}
+        if tracker.startup_seconds is not None:
+            registrar_arranque(mode, tracker.startup_seconds)
+            other = ultimo_arranque('subprocess' if mode == 'inprocess' else 'inprocess')
+            if other is not None:
+                saved = other - tracker.startup_seconds if mode == 'inprocess' else tracker.startup_seconds - other
+                startup['startup_saved_seconds'] = round(saved, 3)
+                print(f"⏱️ Arranque {mode}: {tracker.startup_seconds}s "
+                      f"(in-process ahorra {startup['startup_saved_seconds']}s por tarea)")
         
         if return_code == 0:
             success_message = (f"✅ {command_name} completado! "
@@ -369,6 +600,10 @@ def run_single_scrape(self, command_name):
                 "articles_processed": articles_processed,
                 "total_articles_found": total_articles_found,
                 "elapsed_time": int(time.time() - start_time),
+                "new_articles": section_summary.get('nuevas', 0),
+                "updated_articles": section_summary.get('actualizadas', 0),
+                "execution_mode": mode,
+                **startup,
                 "completed": True
             }
         else:
@@ -403,7 +638,7 @@ def run_single_scrape(self, command_name):
                 'command': command_name,
                 'error': str(exc),
                 'timeout': True,
-                'articles_processed': articles_processed if 'articles_processed' in locals() else 0
+                'articles_processed': articles_processed
             }
         )
         raise
@@ -420,7 +655,7 @@ def run_single_scrape(self, command_name):
                 'status': error_msg,
                 'command': command_name,
                 'error': str(exc),
-                'articles_processed': articles_processed if 'articles_processed' in locals() else 0
+                'articles_processed': articles_processed
             }
         )
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,13 @@
+import hashlib
+
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+
+@register.simple_tag
+def miniatura(noticia, ancho):
+    """URL de la miniatura de ``noticia``; ``v`` cambia con la imagen (la caché es inmutable)"""
+    version = hashlib.sha1(noticia.imagen.encode('utf-8')).hexdigest()[:12]
+    return f"{reverse('miniatura_noticia', args=[noticia.pk, ancho])}?v={version}"
@@ -1,3 +1,1052 @@
-from django.test import TestCase
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import httpx
+import requests
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase
+
+from scraping.engine.async_core import AsyncScraperEngine
+from scraping.engine.blocking import BloqueoRed
+from scraping.engine.browser import BrowserPool
+from scraping.engine.browser_server import Supervisor
+from scraping.engine.command import agregar_opciones_incrementales, opciones_incrementales
+from scraping.engine.control import Cancelacion, ScrapeCancelado
+from scraping.engine.fixtures import FixtureFaltante, html_grabado, indice_corpus
+from scraping.engine.core import ScraperEngine
+from scraping.engine.static import descargar_html
+from scraping.engine.pipeline import EscritorEnLotes
+from scraping.engine.scroll import JS_CONTAR, scroll_hasta_estable
+from scraping.engine.progress import PREFIJO, Reportero, parsear_evento
+from scraping.engine import scheduler
+from scraping.engine import circuit, core, history, probe, ratelimit, state
+from scraping.engine.extract import procesar_crudo, urls_a_sondear
+from scraping.engine.images import dimensiones_url, elegir_mejor_imagen, es_imagen_valida, imagen_mejorada, es_mejor_imagen, obtener_resolucion_url
+from scraping.engine.sections import SECCIONES, get_seccion, get_seccion_por_comando
+from scraping.engine.storage import guardar_noticias, guardar_noticias_por_fila
+from scraping.models import Noticia, NoticiasVistas, ScrapeRun, SondeoImagen
+from scraping.tasks import _run_in_process, programar_secciones, resumir_scraping, scrape_section
+from scraping.utils import thumbnails
+from scraping.utils.canonical import canonicalizar_url
+
+
+class SeccionesTests(SimpleTestCase):
+    def test_todas_las_secciones_tienen_campos_obligatorios(self):
+        for slug in SECCIONES:
+            spec = get_seccion(slug)
+            for campo in ('url', 'item', 'titulo', 'enlace', 'origen', 'comando'):
+                self.assertTrue(spec[campo], f"{slug} sin {campo}")
+            self.assertEqual(spec['wait_selector'], spec['item'])
+
+    def test_busqueda_por_comando(self):
+        self.assertEqual(get_seccion_por_comando('scrape_peru21D')['slug'], 'peru21_deportes')
+        with self.assertRaises(KeyError):
+            get_seccion_por_comando('scrape_inexistente')
+
+
+class ImagenesTests(SimpleTestCase):
+    def test_resolucion_desde_parametros(self):
+        self.assertEqual(obtener_resolucion_url('https://elcomercio.pe/resizer/a?width=640&height=360'), 640)
+        self.assertEqual(obtener_resolucion_url('https://x.pe/a_1200x800.jpg'), 1200)
+        self.assertEqual(obtener_resolucion_url('https://x.pe/a.jpg'), 300)
+        self.assertEqual(dimensiones_url('https://elcomercio.pe/resizer/a?width=640&height=360'), (640, 360))
+        self.assertEqual(dimensiones_url('https://x.pe/a_thumb.jpg'), (None, None))
+
+    def test_imagen_invalida_y_mejor(self):
+        self.assertFalse(es_imagen_valida('data:image/png;base64,xx'))
+        self.assertFalse(es_imagen_valida('/relativa.jpg'))
+        self.assertTrue(es_mejor_imagen('https://x.pe/a?width=800', 'https://x.pe/a?width=400'))
+        self.assertFalse(es_mejor_imagen(None, 'https://x.pe/a.jpg'))
+
+    def test_dimensiones_guardadas_vacias_se_leen_de_la_url(self):
+        actual = 'https://x.pe/a?width=1200&height=800'
+        self.assertFalse(es_mejor_imagen('https://x.pe/b?width=800', actual, (800, 600), (None, None)))
+        self.assertTrue(es_mejor_imagen('https://x.pe/b?width=800', 'https://x.pe/a?width=400', (None, None), None))
+
+
+class ExtraccionBulkTests(SimpleTestCase):
+    def crudo(self, **kwargs):
+        return {
+            'titulo': 'Título', 'autor': None, 'fecha': '2025-10-10T10:00:00Z', 'fecha_texto': None,
+            'imagenes': [], 'enlaces': [], 'mejorable': None, **kwargs,
+        }
+
+    def test_elige_mejor_imagen_y_primer_enlace_valido(self):
+        spec = get_seccion('politica')
+        data = procesar_crudo(spec, self.crudo(
+            imagenes=[[['https://elcomercio.pe/resizer/a?width=400&amp;height=200', None]],
+                      [['https://elcomercio.pe/resizer/a?width=640', 'data:image/gif']]],
+            enlaces=[None, '/politica/noticia/uno/'],
+        ))
+        self.assertEqual(data['imagen'], 'https://elcomercio.pe/resizer/a?width=640')
+        self.assertEqual(data['enlace'], 'https://elcomercio.pe/politica/noticia/uno/')
+        self.assertEqual(data['autor'], 'Redacción El Comercio')
+        self.assertEqual(data['fecha'].year, 2025)
+
+    def test_descarta_sin_enlace_cuando_es_requerido(self):
+        self.assertIsNone(procesar_crudo(get_seccion('peru21'), self.crudo(enlaces=[None])))
+
+
+@mock.patch('scraping.engine.browser.rss_navegador_mb', return_value=0)
+@mock.patch('scraping.engine.browser.usar_servidor', return_value=False)
+@mock.patch('scraping.engine.browser.sync_playwright')
+class PoolNavegadorTests(SimpleTestCase):
+    def test_recicla_tras_max_paginas(self, sync_playwright, _servidor, _rss):
+        chromium = sync_playwright.return_value.start.return_value.chromium
+        pool = BrowserPool(max_pages=2, max_rss_mb=1024)
+
+        for _ in range(3):
+            with pool.context():
+                pass
+
+        self.assertEqual(chromium.launch.call_count, 2)
+        self.assertEqual(pool.stats['reciclajes'], 1)
+        self.assertEqual(pool.stats['contextos'], 3)
+        chromium.launch.return_value.close.assert_called_once()
+        # Playwright se arranca una sola vez aunque Chromium se relance
+        sync_playwright.return_value.start.assert_called_once()
+
+    def test_relanza_si_chromium_se_cae(self, sync_playwright, _servidor, _rss):
+        chromium = sync_playwright.return_value.start.return_value.chromium
+        caido, nuevo = mock.Mock(), mock.Mock()
+        chromium.launch.side_effect = [caido, nuevo]
+        pool = BrowserPool(max_pages=10, max_rss_mb=1024)
+
+        with pool.context():
+            pass
+        caido.is_connected.return_value = False
+        with pool.context():
+            pass
+
+        self.assertEqual(chromium.launch.call_count, 2)
+        nuevo.new_context.assert_called_once()
+        self.assertEqual(pool.stats['reciclajes'], 0)
+
+
+class PoolHiloPropioTests(TestCase):
+    def test_playwright_no_deja_un_loop_en_el_hilo_del_worker(self):
+        pool = BrowserPool()
+        self.addCleanup(pool.close)
+        with self.settings(SCRAPER_BROWSER_WS=''):
+            try:
+                pool.ejecutar(lambda: pool.browser)
+            except Exception:
+                pass  # Sin Chromium instalado falla el launch, pero Playwright ya arrancó
+
+        self.assertIsNotNone(pool._playwright)
+        # Antes esto lanzaba SynchronousOnlyOperation en el hilo que arrancó Playwright
+        self.assertEqual(Noticia.objects.count(), 0)
+        pool.close()
+        self.assertIsNone(pool._playwright)
+
+
+class EjecucionEnWorkerTests(TestCase):
+    @mock.patch('scraping.engine.core.ScraperEngine.scrape_page', return_value=[])
+    def test_seccion_en_proceso_no_rompe_el_orm_del_worker(self, _scrape_page):
+        pool = BrowserPool()
+        self.addCleanup(pool.close)
+        tarea = mock.Mock()
+        tarea.request.id = 'tarea-1'
+        with mock.patch('scraping.tasks.get_browser_pool', return_value=pool), \
+                self.settings(SCRAPER_STATIC_TIER=False, SCRAPER_STREAMING=False, SCRAPER_BROWSER_WS=''):
+            self.assertEqual(_run_in_process(tarea, get_seccion('politica'), mock.Mock(), timeout=60), 0)
+
+        # El pool sigue vivo (como en el worker) y el ORM del hilo principal funciona
+        self.assertIsNotNone(pool._playwright)
+        self.assertEqual(Noticia.objects.count(), 0)
+        self.assertEqual(ScrapeRun.objects.get().secciones.get().seccion, 'politica')
+
+
+class MotorAsyncTests(SimpleTestCase):
+    def test_limita_concurrencia_y_aisla_errores_por_seccion(self):
+        activas, maximo = 0, 0
+
+        async def scrape_page(spec, page, resumen):
+            nonlocal activas, maximo
+            activas += 1
+            maximo = max(maximo, activas)
+            await asyncio.sleep(0.01)
+            activas -= 1
+            if spec['slug'] == 'mundo':
+                raise circuit.CircuitoAbierto('elcomercio.pe', 60)
+            return []
+
+        engine = AsyncScraperEngine(
+            write=lambda *args, **kwargs: None, concurrency=2, incremental=False, streaming=False, run_id='corrida-1',
+        )
+        navegador = mock.AsyncMock()
+        navegador.new_context.return_value.new_page.return_value = mock.Mock()
+        secciones = ['politica', 'mundo', 'peru21', 'peru21_lima']
+        with mock.patch('scraping.engine.async_core.async_playwright'), \
+                mock.patch('scraping.engine.async_core.registrar_seccion'), \
+                mock.patch.object(engine, 'abrir_navegador', mock.AsyncMock(return_value=navegador)), \
+                mock.patch.object(engine, 'usar_estatico', return_value=False), \
+                mock.patch.object(engine, 'guardar'), \
+                mock.patch.object(engine, 'scrape_page', scrape_page):
+            resumenes = asyncio.run(engine.run_many_async(secciones))
+
+        self.assertEqual(maximo, 2)
+        self.assertEqual([r['seccion'] for r in resumenes], secciones)
+        self.assertIn('Circuito abierto', resumenes[1]['error'])
+        self.assertTrue(all('error' not in r for i, r in enumerate(resumenes) if i != 1))
+        self.assertEqual(navegador.new_context.call_count, 4)
+        navegador.close.assert_awaited_once()
+
+
+@mock.patch('scraping.engine.core.registrar_tier')
+@mock.patch('scraping.engine.core.tier_preferido', return_value=None)
+@mock.patch('scraping.engine.core.descargar_html', return_value='<html></html>')
+class TierEstaticoTests(SimpleTestCase):
+    def crudos(self, n):
+        return [
+            {'titulo': f'Nota {i}', 'autor': None, 'fecha': None, 'fecha_texto': None,
+             'imagenes': [], 'enlaces': [f'/politica/nota-{i}/'], 'mejorable': None}
+            for i in range(n)
+        ]
+
+    def correr(self, crudos):
+        engine = ScraperEngine(write=lambda *args, **kwargs: None, incremental=False, streaming=False)
+        spec = get_seccion('politica')
+        with mock.patch('scraping.engine.core.extraer_crudos_html', return_value=crudos), \
+                mock.patch('scraping.engine.core.sondear', return_value={}), \
+                mock.patch.object(engine, 'scrape_browser', return_value=[]) as scrape_browser, \
+                mock.patch.object(engine, 'guardar'), \
+                self.settings(SCRAPER_STATIC_TIER=True):
+            resumen = engine._run(spec, engine._nuevo_resumen(spec))
+        return resumen, scrape_browser
+
+    def test_html_suficiente_evita_el_navegador(self, _descargar, _preferido, registrar_tier):
+        resumen, scrape_browser = self.correr(self.crudos(6))
+
+        scrape_browser.assert_not_called()
+        self.assertEqual(resumen['tier'], 'static')
+        self.assertEqual(resumen['encontradas'], 6)
+        registrar_tier.assert_called_once_with('politica', 'static')
+
+    def test_pocas_tarjetas_cae_al_navegador(self, _descargar, _preferido, registrar_tier):
+        resumen, scrape_browser = self.correr(self.crudos(3))
+
+        scrape_browser.assert_called_once()
+        self.assertEqual(resumen['tier'], 'browser')
+        registrar_tier.assert_called_once_with('politica', 'browser')
+
+    def test_tier_recordado_como_browser_no_descarga(self, descargar, preferido, _registrar):
+        preferido.return_value = 'browser'
+        _, scrape_browser = self.correr(self.crudos(6))
+
+        descargar.assert_not_called()
+        scrape_browser.assert_called_once()
+
+
+class ScrollTests(SimpleTestCase):
+    def pagina(self, conteos, crece):
+        page = mock.Mock()
+        conteos = iter(conteos)
+        page.evaluate.side_effect = lambda js, *args: next(conteos) if js == JS_CONTAR else None
+        page.wait_for_function.side_effect = crece
+        return page
+
+    def spec(self, **kwargs):
+        return {**get_seccion('politica'), 'scroll': 8, 'scroll_max_items': 100,
+                'scroll_max_segundos': 60, 'scroll_espera': 1000, **kwargs}
+
+    def test_para_cuando_no_aparecen_tarjetas(self):
+        page = self.pagina([10, 20], [None, PlaywrightTimeoutError('estable')])
+
+        self.assertEqual(scroll_hasta_estable(page, self.spec()), 2)
+        self.assertEqual(page.wait_for_function.call_args.kwargs['arg'][1], 20)
+
+    def test_respeta_el_tope_de_iteraciones(self):
+        page = self.pagina(range(10, 100, 10), None)
+
+        self.assertEqual(scroll_hasta_estable(page, self.spec(scroll=3)), 3)
+        self.assertEqual(page.wait_for_function.call_count, 3)
+
+    def test_respeta_el_tope_de_tarjetas(self):
+        page = self.pagina([10, 60, 120], None)
+
+        self.assertEqual(scroll_hasta_estable(page, self.spec()), 2)
+
+
+class BloqueoRedTests(SimpleTestCase):
+    def test_perfil_default(self):
+        bloqueo = BloqueoRed('default')
+        self.assertEqual(bloqueo.decidir('https://www.google-analytics.com/a.js', 'script'), 'abortar')
+        self.assertEqual(bloqueo.decidir('https://elcomercio.pe/resizer/a.jpg', 'image'), 'placeholder')
+        self.assertEqual(bloqueo.decidir('https://elcomercio.pe/economia', 'document'), 'continuar')
+
+    def test_allowlist_de_seccion_tiene_prioridad(self):
+        bloqueo = BloqueoRed('default')
+        self.assertEqual(
+            bloqueo.decidir('https://elcomercio.pe/resizer/a.jpg', 'image', ['/resizer/']),
+            'continuar'
+        )
+        self.assertFalse(BloqueoRed('off').activo)
+
+
+class IncrementalTests(SimpleTestCase):
+    def crudo(self, ruta):
+        return {
+            'titulo': ruta, 'autor': None, 'fecha': None, 'fecha_texto': None,
+            'imagenes': [], 'enlaces': [ruta], 'mejorable': None,
+        }
+
+    def test_salta_conocidas_y_corta_tras_k_seguidas(self):
+        spec = get_seccion('politica')
+        engine = ScraperEngine(write=lambda *args, **kwargs: None, incremental=True, parar_tras=2)
+        engine._conocidos[spec['origen']] = {
+            'https://elcomercio.pe/politica/b/', 'https://elcomercio.pe/politica/d/',
+            'https://elcomercio.pe/politica/e/',
+        }
+        crudos = [self.crudo(f'/politica/{r}/') for r in 'abcdef']
+        resumen = engine._nuevo_resumen(spec)
+
+        items = engine.procesar_crudos(spec, crudos, resumen)
+
+        self.assertEqual([i['titulo'] for i in items], ['/politica/a/', '/politica/c/'])
+        self.assertEqual(resumen['conocidas'], 3)
+        self.assertTrue(resumen['corte_incremental'])
+
+    def test_flag_de_linea_de_comandos_pisa_el_setting(self):
+        parser = argparse.ArgumentParser()
+        agregar_opciones_incrementales(parser)
+        opciones = lambda *args: opciones_incrementales(vars(parser.parse_args(args)))
+
+        with self.settings(SCRAPER_INCREMENTAL=True):
+            self.assertTrue(ScraperEngine(**opciones()).incremental)
+            self.assertFalse(ScraperEngine(**opciones('--no-incremental')).incremental)
+        with self.settings(SCRAPER_INCREMENTAL=False):
+            self.assertTrue(ScraperEngine(**opciones('--incremental')).incremental)
+
+
+class GuardadoEnBloqueTests(TestCase):
+    def test_crea_nuevas_y_actualiza_solo_las_que_mejoran(self):
+        spec = get_seccion('politica')
+        Noticia.objects.create(titulo='Igual', autor='A', imagen=None, origen=spec['origen'])
+        Noticia.objects.create(
+            titulo='Mejora', autor='A', origen=spec['origen'],
+            imagen='https://elcomercio.pe/resizer/a.jpg?width=300&height=200',
+        )
+        items = [
+            {'titulo': 'Igual', 'autor': 'B', 'fecha': None, 'imagen': None, 'enlace': None},
+            {'titulo': 'Mejora', 'autor': 'A', 'fecha': None, 'enlace': None,
+             'imagen': 'https://elcomercio.pe/resizer/a.jpg?width=800&height=600'},
+            {'titulo': 'Nueva', 'autor': None, 'fecha': None, 'imagen': None, 'enlace': None},
+            {'titulo': None, 'autor': None, 'fecha': None, 'imagen': None, 'enlace': None},
+        ]
+
+        with self.assertNumQueries(5):
+            resumen = guardar_noticias(spec, items, write=lambda *args: None)
+
+        self.assertEqual(resumen, {'nuevas': 2, 'actualizadas': 1, 'errores': 0})
+        self.assertEqual(Noticia.objects.get(titulo='Igual').autor, 'A')
+        mejora = Noticia.objects.get(titulo='Mejora')
+        self.assertIn('width=800', mejora.imagen)
+        self.assertEqual((mejora.imagen_ancho, mejora.imagen_alto), (800, 600))
+
+    def test_respaldo_fila_a_fila_informa_cada_nueva_una_vez(self):
+        spec = get_seccion('politica')
+        items = [{'titulo': t, 'autor': None, 'fecha': None, 'imagen': None, 'enlace': None} for t in ('Uno', 'Dos')]
+        mensajes = []
+
+        with mock.patch.object(Noticia.objects, 'bulk_create', side_effect=RuntimeError('lock')):
+            resumen = guardar_noticias(spec, items, write=mensajes.append)
+
+        self.assertEqual(resumen['nuevas'], 2)
+        self.assertEqual(sum('Nueva' in m for m in mensajes), 2)
+
+    def test_error_de_una_fila_solo_deshace_esa_fila(self):
+        spec = get_seccion('politica')
+        items = [{'titulo': t, 'autor': None, 'fecha': None, 'imagen': None, 'enlace': None} for t in ('Uno', 'Rota', 'Dos')]
+        get_or_create = Noticia.objects.get_or_create
+
+        def fallar_tras_escribir(**kwargs):
+            noticia, creada = get_or_create(**kwargs)
+            if noticia.titulo == 'Rota':
+                raise IntegrityError('restricción violada')
+            return noticia, creada
+
+        with mock.patch.object(Noticia.objects, 'get_or_create', side_effect=fallar_tras_escribir):
+            resumen = guardar_noticias_por_fila(spec, items, write=lambda *args: None)
+
+        self.assertEqual(resumen, {'nuevas': 2, 'actualizadas': 0, 'errores': 1})
+        self.assertEqual(sorted(Noticia.objects.values_list('titulo', flat=True)), ['Dos', 'Uno'])
+
+    def test_compara_dimensiones_guardadas(self):
+        spec = get_seccion('politica')
+        guardada = Noticia.objects.create(
+            titulo='Foto', autor='A', origen=spec['origen'], imagen='https://elcomercio.pe/resizer/a.jpg',
+        )
+        # Dimensiones ya guardadas (p. ej. sondeadas): la URL sin parámetros no se vuelve a leer
+        Noticia.objects.filter(pk=guardada.pk).update(imagen_ancho=1200, imagen_alto=800)
+        item = {'titulo': 'Foto', 'autor': 'A', 'fecha': None, 'enlace': None,
+                'imagen': 'https://elcomercio.pe/resizer/b.jpg?width=800&height=600'}
+
+        resumen = guardar_noticias(spec, [item], write=lambda *args: None)
+
+        self.assertEqual(resumen['actualizadas'], 0)
+        self.assertEqual(Noticia.objects.get(pk=guardada.pk).imagen, 'https://elcomercio.pe/resizer/a.jpg')
+
+    def test_deduplica_por_hash_del_enlace(self):
+        spec = get_seccion('peru21')
+        existente = Noticia.objects.create(
+            titulo='Viejo', autor='A', origen=spec['origen'], enlace='https://peru21.pe/lima/uno/'
+        )
+        item = {'titulo': 'Nuevo', 'autor': 'A', 'fecha': None, 'imagen': None,
+                'enlace': 'https://peru21.pe/lima/uno/'}
+
+        resumen = guardar_noticias(spec, [item, dict(item)], write=lambda *args: None)
+
+        self.assertEqual(resumen, {'nuevas': 0, 'actualizadas': 1, 'errores': 0})
+        existente.refresh_from_db()
+        self.assertEqual(existente.titulo, 'Nuevo')
+        self.assertEqual(Noticia.objects.count(), 1)
+
+
+def _png(ancho, alto):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', ancho, alto) + b'\x08\x02'
+
+
+class SondeoImagenesTests(TestCase):
+    def test_dimensiones_desde_la_cabecera(self):
+        jpeg = (
+            b'\xff\xd8' + b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+            + b'\xff\xc0' + struct.pack('>HBHH', 17, 8, 600, 800) + b'\x03'
+        )
+        webp = b'RIFF' + b'\x00' * 4 + b'WEBPVP8X' + b'\x00' * 8 + (1279).to_bytes(3, 'little') + (719).to_bytes(3, 'little')
+
+        self.assertEqual(tuple(probe.dimensiones_cabecera(_png(640, 360))), (640, 360))
+        self.assertEqual(tuple(probe.dimensiones_cabecera(b'GIF89a' + struct.pack('<HH', 120, 90))), (120, 90))
+        self.assertEqual(probe.dimensiones_cabecera(jpeg), (800, 600))
+        self.assertEqual(probe.dimensiones_cabecera(webp), (1280, 720))
+        self.assertEqual(probe.dimensiones_cabecera(b'<html>'), (None, None))
+
+    def test_sondea_una_vez_y_guarda_en_cache(self):
+        pedidas = []
+
+        def responder(request):
+            pedidas.append(str(request.url))
+            if request.url.path == '/grande.png':
+                self.assertEqual(request.headers['range'], 'bytes=0-32767')
+                return httpx.Response(206, headers={'content-type': 'image/png', 'content-range': 'bytes 0-32767/95000'},
+                                      content=_png(1200, 800))
+            if request.url.path == '/caida.jpg':
+                return httpx.Response(503)
+            return httpx.Response(404, headers={'content-type': 'text/html'})
+
+        cliente = lambda: httpx.AsyncClient(transport=httpx.MockTransport(responder))
+        self.addCleanup(circuit._locales.clear)
+        urls = {'https://img.pe/grande.png', 'https://img.pe/no-existe.jpg', 'https://img.pe/caida.jpg'}
+        with mock.patch('scraping.engine.probe._cliente', cliente), self.settings(SCRAPER_IMAGE_PROBE_BYTES=32768):
+            sondeos = probe._sondear(urls)
+            probe._sondear(urls)
+
+        grande = sondeos['https://img.pe/grande.png']
+        self.assertEqual((grande.ancho, grande.alto, grande.tamano), (1200, 800, 95000))
+        self.assertFalse(sondeos['https://img.pe/no-existe.jpg'].es_imagen)
+        # El 503 no se guarda: se vuelve a intentar, las conocidas no
+        self.assertNotIn('https://img.pe/caida.jpg', sondeos)
+        self.assertEqual(SondeoImagen.objects.count(), 2)
+        self.assertEqual(sorted(pedidas).count('https://img.pe/grande.png'), 1)
+        self.assertEqual(pedidas.count('https://img.pe/caida.jpg'), 2)
+
+    @mock.patch('scraping.engine.ratelimit.get_redis', return_value=None)
+    @mock.patch('scraping.engine.circuit.get_redis', return_value=None)
+    def test_bucket_propio_sin_tocar_el_circuito(self, _redis_circuito, _redis_ratelimit):
+        circuit._locales.clear()
+        ratelimit._locales.clear()
+        self.addCleanup(circuit._locales.clear)
+        self.addCleanup(ratelimit._locales.clear)
+        pedidas = []
+
+        def responder(request):
+            pedidas.append(str(request.url))
+            if request.url.host == 'caido.pe':
+                return httpx.Response(503)
+            if request.url.path == '/limitada.png':
+                return httpx.Response(429)
+            return httpx.Response(200, content=_png(10, 10))
+
+        cliente = lambda: httpx.AsyncClient(transport=httpx.MockTransport(responder))
+        urls = [f'https://caido.pe/{i}.png' for i in range(4)] + ['https://img.pe/ok.png', 'https://img.pe/limitada.png']
+        with mock.patch('scraping.engine.probe._cliente', cliente), \
+                self.settings(SCRAPER_CIRCUIT_BREAKER=True, SCRAPER_CIRCUIT_FAILURES=2, SCRAPER_CIRCUIT_COOLDOWN=60,
+                              SCRAPER_IMAGE_PROBE_CONCURRENCY=1):
+            sondeos = probe._sondear(urls)
+            # Los 503 de las imágenes no abren el circuito de la navegación
+            self.assertEqual(circuit.consultar('caido.pe').get('fallos', 0), 0)
+            self.assertEqual(ratelimit.reservar('https://caido.pe/pagina'), 0.0)
+
+            # Con el circuito ya abierto por las páginas el dominio no se sondea
+            circuit.registrar('https://caido.pe/pagina', False)
+            circuit.registrar('https://caido.pe/pagina', False)
+            pedidas.clear()
+            probe._sondear(['https://caido.pe/otra.png'])
+
+        # El 429 tampoco se guarda: se reintenta la próxima corrida
+        self.assertEqual(list(sondeos), ['https://img.pe/ok.png'])
+        self.assertEqual(pedidas, [])
+        self.assertIn(('imagenes', 'caido.pe'), ratelimit._locales)
+
+    def test_solo_sondea_candidatos_validos_del_dominio(self):
+        spec = get_seccion('politica')
+        crudo = {'imagenes': [[
+            ['/resizer/a.jpg?width=300&amp;height=200', 'data:image/gif;base64,R0lG'],
+            ['https://elcomercio.pe/placeholder.svg', 'https://tracker.com/pixel.jpg'],
+        ]], 'mejorable': None}
+
+        self.assertEqual(urls_a_sondear(spec, [crudo]), {'https://elcomercio.pe/resizer/a.jpg?width=300&height=200'})
+
+    def test_elige_con_datos_reales(self):
+        sondeos = {
+            'https://elcomercio.pe/a.jpg?width=1200': SondeoImagen(estado_http=404, content_type='text/html'),
+            'https://elcomercio.pe/b.jpg?width=300': SondeoImagen(estado_http=200, content_type='image/jpeg', ancho=900, alto=600),
+        }
+        candidatos = list(sondeos) + ['https://elcomercio.pe/c.jpg?width=600']
+
+        self.assertEqual(
+            elegir_mejor_imagen(candidatos, 'elcomercio.pe', sondeos),
+            ('https://elcomercio.pe/b.jpg?width=300', 900),
+        )
+        src = 'https://elcomercio.pe/resizer/x.jpg?width=200&height=100'
+        mejorada = imagen_mejorada(src)
+        self.assertIn('width=800', mejorada)
+        self.assertEqual(imagen_mejorada(src, {mejorada: SondeoImagen(estado_http=404)}), src)
+
+
+class MiniaturasTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        ajustes = self.settings(SCRAPER_THUMB_DIR=self.dir.name, SCRAPER_THUMB_WIDTHS=(400, 800))
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client.force_login(User.objects.create_user('lector', password='x'))
+
+    def test_sirve_desde_la_cache_con_cabeceras_largas(self):
+        noticia = Noticia.objects.create(titulo='A', origen='elcomercio', imagen='https://elcomercio.pe/a.jpg')
+        digest = 'ab' * 32
+        indice = Path(self.dir.name) / 'urls' / hashlib.sha1(noticia.imagen.encode()).hexdigest()
+        indice.parent.mkdir()
+        indice.write_text(digest)
+        variante = Path(self.dir.name) / 'ab' / f'{digest}-400.webp'
+        variante.parent.mkdir()
+        variante.write_bytes(b'RIFF-webp')
+
+        url = Template('{% load miniaturas %}{% miniatura noticia 400 %}').render(Context({'noticia': noticia}))
+        respuesta = self.client.get(url, HTTP_ACCEPT='image/avif,image/webp,*/*')
+
+        self.assertTrue(url.startswith(f'/noticias/miniatura/{noticia.pk}/400/?v='))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(b''.join(respuesta.streaming_content), b'RIFF-webp')
+        self.assertEqual(respuesta['Content-Type'], 'image/webp')
+        self.assertIn('immutable', respuesta['Cache-Control'])
+        self.assertIn('Accept', respuesta['Vary'])
+        self.assertEqual(self.client.get(f'/noticias/miniatura/{noticia.pk}/123/').status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_desaloja_los_menos_usados(self):
+        raiz = Path(self.dir.name)
+        for i in range(4):
+            archivo = raiz / f'{i}.webp'
+            archivo.write_bytes(b'x' * 400)
+            os.utime(archivo, (1000 + i, 1000 + i))
+
+        with self.settings(SCRAPER_THUMB_MAX_MB=1000 / (1024 * 1024)):
+            borrados = thumbnails.desalojar()
+
+        self.assertEqual(borrados, 2)
+        self.assertEqual(sorted(p.name for p in raiz.iterdir()), ['2.webp', '3.webp'])
+
+    @mock.patch('scraping.views.miniatura')
+    def test_archivo_desalojado_redirige_a_la_original(self, miniatura):
+        noticia = Noticia.objects.create(titulo='A', origen='elcomercio', imagen='https://elcomercio.pe/a.jpg')
+        miniatura.return_value = Path(self.dir.name) / 'desalojada.webp'
+
+        respuesta = self.client.get(f'/noticias/miniatura/{noticia.pk}/400/')
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(respuesta['Location'], noticia.imagen)
+
+    @mock.patch('scraping.engine.ratelimit.time.sleep')
+    @mock.patch('scraping.engine.circuit.registrar')
+    @mock.patch('scraping.utils.thumbnails._sesion')
+    def test_descarga_limitada_fuera_del_rate_limit_y_circuito(self, sesion, registrar, sleep):
+        respuesta = sesion.return_value.get.return_value.__enter__.return_value
+        respuesta.headers = {'content-type': 'image/jpeg'}
+        respuesta.iter_content.return_value = iter([b'x' * 600, b'x' * 600])
+
+        with self.settings(SCRAPER_THUMB_MAX_BYTES=1000, SCRAPER_THUMB_TIMEOUT=3), \
+                self.assertRaisesMessage(ValueError, 'supera 1000 bytes'):
+            thumbnails.descargar_fuente('https://elcomercio.pe/enorme.jpg')
+
+        # En el request no se espera turno ni se toca el circuito del scraper
+        sleep.assert_not_called()
+        registrar.assert_not_called()
+        self.assertEqual(sesion.return_value.get.call_args.kwargs, {'timeout': 3, 'stream': True})
+        self.assertEqual(list(Path(self.dir.name).iterdir()), [])
+
+    @skipUnless(importlib.util.find_spec('PIL'), 'Pillow no instalado')
+    def test_redimensiona_sin_ampliar(self):
+        from PIL import Image
+
+        fuente = Path(self.dir.name) / 'fuente.png'
+        Image.new('RGBA', (1200, 600)).save(fuente)
+        with Image.open(io.BytesIO(thumbnails.redimensionar(fuente, 400, 'jpeg'))) as chica:
+            self.assertEqual((chica.format, chica.size), ('JPEG', (400, 200)))
+        with Image.open(io.BytesIO(thumbnails.redimensionar(fuente, 1600, 'webp'))) as igual:
+            self.assertEqual(igual.size, (1200, 600))
+        with self.settings(SCRAPER_THUMB_MAX_PIXELS=1000 * 600), self.assertRaises(ValueError):
+            thumbnails.redimensionar(fuente, 400, 'jpeg')
+
+
+class DimensionesImagenesCommandTests(TestCase):
+    def test_completa_dimensiones_de_filas_existentes(self):
+        noticia = Noticia.objects.create(titulo='A', origen='elcomercio', imagen='https://x.pe/a_1200x800.jpg')
+        sin_imagen = Noticia.objects.create(titulo='B', origen='elcomercio')
+        Noticia.objects.update(imagen_ancho=None, imagen_alto=None)
+
+        call_command('dimensiones_imagenes', stdout=StringIO())
+
+        noticia.refresh_from_db()
+        sin_imagen.refresh_from_db()
+        self.assertEqual((noticia.imagen_ancho, noticia.imagen_alto), (1200, 800))
+        self.assertIsNone(sin_imagen.imagen_ancho)
+
+
+class CanonicalTests(SimpleTestCase):
+    def test_normaliza_esquema_host_path_y_tracking(self):
+        self.assertEqual(
+            canonicalizar_url('HTTP://ElComercio.pe//politica/./uno?utm_source=fb&amp;b=2&a=1#top'),
+            'https://elcomercio.pe/politica/uno/?a=1&b=2'
+        )
+        self.assertEqual(
+            canonicalizar_url('/lima/nota.html?fbclid=x', base='https://peru21.pe/lima'),
+            'https://peru21.pe/lima/nota.html'
+        )
+        self.assertIsNone(canonicalizar_url('javascript:void(0)'))
+
+
+class CanonicalizarEnlacesCommandTests(TestCase):
+    def test_fusiona_duplicados_y_mueve_relaciones(self):
+        usuario = User.objects.create(username='lector')
+        original = Noticia.objects.create(titulo='Uno', origen='peru21', enlace='https://peru21.pe/lima/uno/')
+        duplicada = Noticia.objects.create(titulo='Uno', origen='peru21', imagen='https://peru21.pe/a.jpg')
+        Noticia.objects.filter(pk=duplicada.pk).update(
+            enlace='https://peru21.pe/lima/uno?utm_source=x', enlace_hash='legacy'
+        )
+        NoticiasVistas.objects.create(usuario=usuario, noticia=duplicada)
+
+        call_command('canonicalizar_enlaces', stdout=StringIO())
+
+        self.assertEqual(list(Noticia.objects.values_list('pk', flat=True)), [original.pk])
+        original.refresh_from_db()
+        self.assertEqual(original.imagen, 'https://peru21.pe/a.jpg')
+        self.assertEqual(NoticiasVistas.objects.get().noticia_id, original.pk)
+
+    def test_enlace_sin_forma_canonica_no_fusiona_noticias_sin_enlace(self):
+        sin_enlace = Noticia.objects.create(titulo='Sin enlace', origen='peru21')
+        javascript = Noticia.objects.create(titulo='JS', origen='peru21', enlace='javascript:void(0)')
+
+        call_command('canonicalizar_enlaces', stdout=StringIO())
+
+        self.assertEqual(Noticia.objects.count(), 2)
+        javascript.refresh_from_db()
+        sin_enlace.refresh_from_db()
+        self.assertEqual(javascript.enlace, 'javascript:void(0)')
+        self.assertIsNone(sin_enlace.enlace)
+
+
+class EscritorEnLotesTests(SimpleTestCase):
+    @mock.patch('scraping.engine.pipeline.connection')
+    @mock.patch('scraping.engine.pipeline.guardar_noticias')
+    def test_guarda_por_lotes_y_vacia_al_cerrar(self, guardar, _connection):
+        guardar.side_effect = lambda spec, items, write: {'nuevas': len(items), 'actualizadas': 0, 'errores': 0}
+        guardadas = []
+        escritor = EscritorEnLotes(
+            get_seccion('politica'), write=lambda *args: None, lote=2, intervalo=60,
+            capacidad=1, al_guardar=guardadas.extend,
+        )
+        for i in range(5):
+            escritor.put({'titulo': str(i)})
+        resumen = escritor.cerrar()
+
+        self.assertEqual([len(c.args[1]) for c in guardar.call_args_list], [2, 2, 1])
+        self.assertEqual(resumen['nuevas'], 5)
+        self.assertEqual(resumen['lotes'], 3)
+        self.assertEqual(len(guardadas), 5)
+
+    @mock.patch('scraping.engine.core.sondear', return_value={})
+    def test_modo_async_entrega_fuera_del_event_loop(self, _sondear):
+        spec = get_seccion('politica')
+        engine = AsyncScraperEngine(write=lambda *args, **kwargs: None, extraccion='bulk', incremental=False)
+        hilos = []
+        escritor = mock.Mock()
+        escritor.put.side_effect = lambda data: hilos.append(threading.current_thread())
+        engine._escritores[spec['slug']] = escritor
+        page = mock.AsyncMock()
+        page.evaluate.return_value = [{'titulo': 'x', 'autor': None, 'fecha': None, 'fecha_texto': None,
+                                       'imagenes': [], 'enlaces': ['/politica/x/'], 'mejorable': None}]
+
+        with mock.patch.object(engine, 'cargar_pagina', mock.AsyncMock()):
+            asyncio.run(engine.scrape_page(spec, page, engine._nuevo_resumen(spec)))
+
+        # put() bloquea con la cola llena: no debe frenar el loop de las demás secciones
+        self.assertEqual(len(hilos), 1)
+        self.assertIsNot(hilos[0], threading.main_thread())
+
+
+class ProgresoTests(SimpleTestCase):
+    def test_eventos_ida_y_vuelta(self):
+        salida = StringIO()
+        Reportero(salida, prefijo=PREFIJO).emitir('procesada', 'peru21', i=3, total=10)
+
+        evento = parsear_evento(salida.getvalue().strip())
+        self.assertEqual((evento['evento'], evento['seccion'], evento['i'], evento['total']),
+                         ('procesada', 'peru21', 3, 10))
+        self.assertIsNone(parsear_evento('📰 Se encontraron 10 artículos.'))
+
+    def test_reportero_inactivo_no_escribe(self):
+        reportero = Reportero()
+        reportero.emitir('inicio', 'peru21')
+        self.assertFalse(reportero.activo)
+
+
+class CancelacionTests(SimpleTestCase):
+    def test_timeout_corta_el_recorrido(self):
+        spec = get_seccion('politica')
+        engine = ScraperEngine(write=lambda *args, **kwargs: None, cancelacion=Cancelacion(timeout=-1))
+        crudo = {'titulo': 'x', 'autor': None, 'fecha': None, 'fecha_texto': None,
+                 'imagenes': [], 'enlaces': ['/politica/x/'], 'mejorable': None}
+
+        with self.assertRaises(ScrapeCancelado) as ctx:
+            engine.procesar_crudos(spec, [crudo], engine._nuevo_resumen(spec))
+        self.assertEqual(ctx.exception.motivo, 'timeout')
+
+    @mock.patch('scraping.engine.control.cancelacion_solicitada', return_value=True)
+    def test_flag_de_cancelacion(self, solicitada):
+        with self.assertRaises(ScrapeCancelado):
+            Cancelacion('tarea-1').verificar()
+        solicitada.assert_called_once_with('tarea-1')
+        Cancelacion().verificar()
+
+
+class ResumenCorridaTests(TestCase):
+    def test_agrega_secciones_y_marca_fallidas(self):
+        history.abrir_corrida('corrida-1', 'completa', secciones_total=3, inicio=1000)
+        for slug, resumen, error in (
+            ('politica', {'encontradas': 8, 'nuevas': 3, 'actualizadas': 1}, ''),
+            ('peru21', {'encontradas': 5, 'nuevas': 2, 'errores': 1}, ''),
+            ('mundo', {}, 'timeout'),
+        ):
+            history.registrar_seccion('corrida-1', get_seccion(slug), resumen, 1000, 1010, error=error)
+
+        with mock.patch('sys.stdout', new_callable=StringIO) as salida:
+            resumen = resumir_scraping.run([
+                {'seccion': 'politica', 'nuevas': 3, 'actualizadas': 1, 'errores': 0, 'duracion': 4.0},
+                {'seccion': 'peru21', 'nuevas': 2, 'actualizadas': 0, 'errores': 1, 'duracion': 6.5},
+                {'seccion': 'mundo', 'error': 'timeout'},
+            ], run_id='corrida-1')
+
+        self.assertEqual(resumen['status'], 'partial')
+        self.assertEqual(resumen['totales']['nuevas'], 5)
+        self.assertEqual(resumen['totales']['errores'], 1)
+        self.assertEqual(resumen['secciones_fallidas'], ['mundo'])
+        self.assertEqual(resumen['duracion_secuencial'], 10.5)
+        # Sin ``inicio`` no hay duración total que informar
+        self.assertNotIn('None', salida.getvalue())
+
+        corrida = ScrapeRun.objects.get(run_id='corrida-1')
+        self.assertEqual(corrida.estado, 'parcial')
+        self.assertEqual((corrida.encontradas, corrida.nuevas, corrida.errores), (13, 5, 1))
+        self.assertIsNotNone(corrida.fin)
+        self.assertEqual(
+            sorted(corrida.secciones.exclude(error='').values_list('seccion', flat=True)), ['mundo']
+        )
+
+
+@mock.patch('scraping.engine.ratelimit.get_redis', return_value=None)
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        ratelimit._locales.clear()
+
+    def test_rafaga_y_luego_espera(self, redis):
+        with self.settings(SCRAPER_RATE_LIMIT=True, SCRAPER_RATE_LIMITS={'peru21.pe': (2, 3)}):
+            esperas = [ratelimit.reservar('https://www.peru21.pe/politica/') for _ in range(5)]
+
+        self.assertEqual(esperas[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(esperas[3], 0.5, places=2)
+        self.assertAlmostEqual(esperas[4], 1.0, places=2)
+
+    def test_buckets_por_dominio_y_desactivado(self, redis):
+        with self.settings(SCRAPER_RATE_LIMIT=True, SCRAPER_RATE_PER_SEC=1, SCRAPER_RATE_BURST=1):
+            self.assertEqual(ratelimit.reservar('https://elcomercio.pe/politica/'), 0.0)
+            self.assertEqual(ratelimit.reservar('https://peru21.pe/politica/'), 0.0)
+            self.assertGreater(ratelimit.reservar('https://elcomercio.pe/mundo/'), 0.0)
+        with self.settings(SCRAPER_RATE_LIMIT=False):
+            self.assertEqual(ratelimit.reservar('https://elcomercio.pe/mundo/'), 0.0)
+
+
+@mock.patch('scraping.engine.circuit.get_redis', return_value=None)
+class CircuitoTests(SimpleTestCase):
+    URL = 'https://peru21.pe/lima'
+
+    def setUp(self):
+        circuit._locales.clear()
+        ajustes = self.settings(
+            SCRAPER_CIRCUIT_BREAKER=True, SCRAPER_CIRCUIT_FAILURES=2,
+            SCRAPER_CIRCUIT_COOLDOWN=60, SCRAPER_CIRCUIT_SLOW_SECONDS=30,
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def fallar(self):
+        with self.assertRaises(TimeoutError), circuit.vigilar(self.URL):
+            raise TimeoutError('goto')
+
+    def test_abre_tras_fallos_y_falla_rapido(self, redis):
+        self.fallar()
+        circuit.comprobar(self.URL)
+        self.fallar()
+
+        with self.assertRaises(circuit.CircuitoAbierto) as ctx:
+            circuit.comprobar('https://www.peru21.pe/deportes')
+        self.assertEqual(ctx.exception.reintentar_en, 60)
+        # Otro dominio no se ve afectado
+        circuit.comprobar('https://elcomercio.pe/politica/')
+
+    def test_semiabierto_deja_un_solo_sondeo(self, redis):
+        self.fallar()
+        self.fallar()
+        with mock.patch('scraping.engine.circuit.time.time', return_value=time.time() + 61):
+            circuit.comprobar(self.URL)
+            with self.assertRaises(circuit.CircuitoAbierto):
+                circuit.comprobar(self.URL)
+            self.assertEqual(circuit.registrar(self.URL, ok=True), 'cerrado')
+            circuit.comprobar(self.URL)
+
+    def test_sondeo_fallido_reabre_y_lentitud_cuenta_como_fallo(self, redis):
+        self.fallar()
+        self.fallar()
+        ahora = time.time() + 61
+        with mock.patch('scraping.engine.circuit.time.time', return_value=ahora):
+            circuit.comprobar(self.URL)
+            self.assertEqual(circuit.registrar(self.URL, ok=False), 'abierto')
+        self.assertEqual(circuit.consultar('peru21.pe')['aperturas'], 2)
+
+        circuit._locales.clear()
+        with mock.patch('scraping.engine.circuit.time.monotonic', side_effect=[0, 31, 0, 31]):
+            with circuit.vigilar(self.URL):
+                pass
+            with circuit.vigilar(self.URL):
+                pass
+        self.assertEqual(circuit.consultar('peru21.pe')['estado'], 'abierto')
+
+    def test_4xx_no_abre_el_circuito(self, redis):
+        error = requests.HTTPError(response=mock.Mock(status_code=404))
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError), circuit.vigilar(self.URL):
+                raise error
+        circuit.comprobar(self.URL)
+
+    def test_estatico_no_cae_al_navegador_con_circuito_abierto(self, redis):
+        engine = ScraperEngine(write=lambda *a, **k: None)
+        spec = get_seccion('peru21_lima')
+        abierto = circuit.CircuitoAbierto('peru21.pe', 60)
+        with mock.patch('scraping.engine.core.descargar_html', side_effect=abierto), \
+                mock.patch('scraping.engine.core.registrar_tier') as registrar_tier:
+            with self.assertRaises(circuit.CircuitoAbierto):
+                engine.intentar_estatico(spec, engine._nuevo_resumen(spec))
+        registrar_tier.assert_not_called()
+
+
+class ReplayTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        carpeta = Path(self.tmp.name) / 'politica'
+        (carpeta / 'articulos').mkdir(parents=True)
+        (carpeta / 'listado.html').write_text('<html>listado</html>', encoding='utf-8')
+        (carpeta / 'articulos' / 'a.html').write_text('<html>nota</html>', encoding='utf-8')
+        (carpeta / 'manifest.json').write_text(json.dumps({'paginas': {
+            'https://elcomercio.pe/politica/': 'listado.html',
+            'https://elcomercio.pe/politica/nota-123/': 'articulos/a.html',
+        }}), encoding='utf-8')
+        indice_corpus.cache_clear()
+        self.addCleanup(indice_corpus.cache_clear)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_descarga_desde_el_corpus_sin_red(self):
+        with self.settings(SCRAPER_FIXTURES_DIR=self.tmp.name, SCRAPER_REPLAY=True), \
+                mock.patch('scraping.engine.static.get_session') as session:
+            self.assertEqual(descargar_html('https://elcomercio.pe/politica'), '<html>listado</html>')
+            self.assertEqual(
+                html_grabado('https://elcomercio.pe/politica/nota-123?utm_source=x'), '<html>nota</html>'
+            )
+            with self.assertRaises(FixtureFaltante):
+                descargar_html('https://elcomercio.pe/mundo/')
+        session.assert_not_called()
+
+
+class ServidorNavegadorTests(SimpleTestCase):
+    @mock.patch('scraping.engine.browser_server.registrar_servidor_navegador')
+    def test_reinicia_si_el_proceso_cae_o_crece(self, registrar):
+        supervisor = Supervisor('ws://127.0.0.1:3000/scraper', max_rss_mb=500, write=lambda *a: None)
+        supervisor.proceso = mock.Mock(pid=123)
+        with mock.patch.object(supervisor, 'reiniciar') as reiniciar, \
+                mock.patch.object(supervisor, 'responde', return_value=True):
+            supervisor.proceso.poll.return_value = 1
+            self.assertEqual(supervisor.chequear(), 'proceso caído')
+
+            supervisor.proceso.poll.return_value = None
+            with mock.patch.object(supervisor, 'rss_mb', return_value=800):
+                self.assertIn('RSS', supervisor.chequear())
+            with mock.patch.object(supervisor, 'rss_mb', return_value=100):
+                self.assertIsNone(supervisor.chequear())
+        self.assertEqual(reiniciar.call_count, 2)
+        self.assertEqual(registrar.call_args.kwargs['ttl'], 90)
+
+    @mock.patch('scraping.engine.browser.servidor_navegador', return_value={'pid': 123})
+    @mock.patch('scraping.engine.browser.sync_playwright')
+    def test_pool_se_conecta_al_servidor(self, sync_playwright, latido):
+        chromium = sync_playwright.return_value.start.return_value.chromium
+        with self.settings(SCRAPER_BROWSER_WS='ws://127.0.0.1:3000/scraper'):
+            pool = BrowserPool()
+            pool.browser
+        chromium.connect.assert_called_once()
+        chromium.launch.assert_not_called()
+        self.assertTrue(pool.remoto)
+        self.assertEqual(pool.stats['conexiones'], 1)
+
+
+class CadenciaTests(SimpleTestCase):
+    def test_intervalo_acotado_por_tasa(self):
+        spec = get_seccion('politica')
+        with self.settings(SCRAPER_CADENCE_TARGET=5, SCRAPER_CADENCE_MIN_MINUTES=15, SCRAPER_CADENCE_MAX_MINUTES=720):
+            self.assertEqual(scheduler.calcular_intervalo(spec, 0), 720 * 60)
+            self.assertEqual(scheduler.calcular_intervalo(spec, 100), 15 * 60)
+            self.assertEqual(scheduler.calcular_intervalo(spec, 5), 3600)
+            self.assertEqual(scheduler.calcular_intervalo({**spec, 'cadencia_max': 60}, 0.1), 3600)
+
+    def test_corrida_actualiza_tasa_con_media_movil(self):
+        r = mock.Mock()
+        r.hgetall.return_value = {'ultima': '0', 'tasa': '2.0', 'intervalo': '3600', 'proxima': '3600'}
+        with mock.patch('scraping.engine.scheduler.get_redis', return_value=r), \
+                self.settings(SCRAPER_CADENCE_TARGET=5, SCRAPER_CADENCE_MIN_MINUTES=15, SCRAPER_CADENCE_MAX_MINUTES=720):
+            estado = scheduler.registrar_corrida('politica', nuevas=12, fin=7200)
+
+        # 12 nuevas en 2 h = 6/h; media con la tasa previa (2/h) = 4/h -> 5 / 4 h
+        self.assertEqual(estado['tasa'], 4.0)
+        self.assertEqual(estado['intervalo'], 4500.0)
+        self.assertEqual(estado['proxima'], 7200 + 4500.0)
+        r.hset.assert_called_once()
+
+    @mock.patch('scraping.tasks.registrar_corrida')
+    @mock.patch('scraping.tasks.get_browser_pool')
+    @mock.patch('scraping.tasks.liberar')
+    @mock.patch('scraping.tasks.scrape_section.apply_async')
+    def test_solo_suelta_el_candado_que_tomo(self, apply_async, liberar, _pool, _registrar):
+        with mock.patch('scraping.tasks.reservar_si_vencida', side_effect=lambda slug, ttl: f'token-{slug}'), \
+                mock.patch('scraping.tasks.SECCIONES', ['politica']):
+            programar_secciones()
+        self.assertEqual(apply_async.call_args.args, (('politica',), {'candado': 'token-politica'}))
+
+        with mock.patch('scraping.tasks.ScraperEngine') as engine:
+            engine.return_value.run.return_value = {'seccion': 'politica', 'nuevas': 1}
+            # Sección de un chord: el candado en curso es de otra corrida
+            scrape_section('politica')
+            liberar.assert_not_called()
+            scrape_section('politica', candado='token-politica')
+        liberar.assert_called_once_with('politica', 'token-politica')
+
+        r = mock.Mock()
+        with mock.patch('scraping.engine.scheduler.get_redis', return_value=r):
+            scheduler.liberar('politica', 'token-politica')
+        r.register_script.return_value.assert_called_once_with(
+            keys=['scraper:cadencia:politica:en_curso'], args=['token-politica']
+        )
+
+
+class BenchmarkTests(TestCase):
+    def test_repeticiones_con_tier_fijo_revertidas_y_sin_tocar_redis(self):
+        tiers = []
+
+        def correr(engine, spec, resumen):
+            tiers.append(engine.usar_estatico(spec))
+            core.registrar_tier(spec['slug'], 'browser')
+            Noticia.objects.create(titulo='Bench', origen=spec['origen'])
+            resumen['tier'] = 'static'
+            return resumen
+
+        r = mock.Mock(**{'scan_iter.return_value': ['scraper-benchmark-x:circuito:elcomercio.pe']})
+        with mock.patch('scraping.management.commands.benchmark_scraper.ruta_har', return_value='politica.har'), \
+                mock.patch('scraping.management.commands.benchmark_scraper.BrowserPool') as pool, \
+                mock.patch.object(ScraperEngine, '_run', autospec=True, side_effect=correr), \
+                mock.patch('scraping.engine.state.get_redis', return_value=r), \
+                mock.patch('sys.stderr', StringIO()):
+            pool.return_value.stats = {'tiempo_lanzamiento': 0.0}
+            call_command('benchmark_scraper', 'politica', '--repeticiones', '2', stdout=StringIO())
+
+        self.assertEqual(tiers, [True, True])
+        r.set.assert_not_called()
+        self.assertTrue(r.scan_iter.call_args.kwargs['match'].startswith('scraper-benchmark-'))
+        r.delete.assert_called_once_with('scraper-benchmark-x:circuito:elcomercio.pe')
+        self.assertEqual(state.PREFIJO, 'scraper')
+        self.assertEqual((Noticia.objects.count(), ScrapeRun.objects.count()), (0, 0))
+
+
+class HistorialTests(TestCase):
+    def test_cierre_agrega_secciones_y_reintentos(self):
+        history.abrir_corrida('corrida-1', 'completa', secciones_total=2, inicio=1000)
+        politica, mundo = get_seccion('politica'), get_seccion('mundo')
+        history.registrar_seccion('corrida-1', politica, {'tier': 'static', 'encontradas': 10, 'nuevas': 4}, 1000, 1005)
+        history.registrar_seccion('corrida-1', mundo, {'tier': 'browser'}, 1000, 1030, error='timeout')
+        # El reintento de mundo sale bien: la corrida queda completa
+        history.registrar_seccion('corrida-1', mundo, {'tier': 'browser', 'encontradas': 6, 'nuevas': 1}, 1040, 1050)
+
+        corrida = history.cerrar_corrida('corrida-1', fin=1060)
+
+        self.assertEqual(corrida.estado, 'ok')
+        self.assertEqual((corrida.encontradas, corrida.nuevas), (16, 5))
+        self.assertEqual(corrida.duracion, 60)
+        self.assertEqual(corrida.secciones.get(seccion='politica', error='').articulos_por_segundo, 2.0)
+
+    def test_con_loop_corriendo_va_al_hilo_del_orm_y_propaga_errores(self):
+        hilos = []
+
+        def fallar(**kwargs):
+            hilos.append(threading.current_thread())
+            raise ScrapeRun.DoesNotExist('corrida-x')
+
+        async def cerrar():
+            return history.cerrar_corrida('corrida-x')
+
+        with mock.patch.object(ScrapeRun.objects, 'get', side_effect=fallar), \
+                self.assertRaises(ScrapeRun.DoesNotExist):
+            asyncio.run(cerrar())
+        self.assertIsNot(hilos[0], threading.main_thread())
+
+    def test_seccion_suelta_crea_su_corrida(self):
+        history.registrar_seccion('suelta', get_seccion('politica'), {}, 1000, 1001, error='boom')
+        corrida = history.cerrar_corrida('suelta')
+
+        self.assertEqual(corrida.tipo, 'seccion')
+        self.assertEqual(corrida.estado, 'error')
+        self.assertEqual(ScrapeRun.objects.count(), 1)
@@ -25,6 +25,9 @@ urlpatterns = [
     path('scraping/peru21/lima', views.ejecutar_scraping_peru21_lima, name='scraping_peru21_lima'),
     #scraping status
     path('scraping/task-status/<str:task_id>/', views.ver_estado_tarea, name='task_status'),
+    path('scraping/task-cancel/<str:task_id>/', views.cancelar_tarea, name='task_cancel'),
+    path('scraping/cadencia/', views.cadencia_secciones, name='cadencia_secciones'),
+    path('miniatura/<int:noticia_id>/<int:ancho>/', views.miniatura_noticia, name='miniatura_noticia'),
     #Regstrar actividades
     path('registrar-vista/<int:noticia_id>/', views.registrar_vista_noticia, name='registrar_vista_noticia'),
     path('registrar-compartir/<int:noticia_id>/', views.registrar_compartir_noticia, name='registrar_compartir_noticia'),
@@ -0,0 +1,70 @@
+"""
+URL canónica de una noticia.
+
+Los enlaces llegan relativos, con ``&amp;`` sin decodificar, con parámetros de
+tracking o con/sin barra final. ``canonicalizar_url`` los reduce a una sola
+forma para que el mismo artículo produzca siempre el mismo ``enlace`` (y el
+mismo ``enlace_hash``). La usan la extracción, la deduplicación y el análisis.
+"""
+import html
+import posixpath
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Parámetros que no cambian el contenido de la página
+PARAMETROS_TRACKING = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'ocid', 'outputtype', 'ns_source',
+    'ns_mchannel', 'ns_campaign', '_ga', '_gl', 'amp',
+}
+PREFIJOS_TRACKING = ('utm_', 'pk_', 'mtm_', 'hsa_')
+
+BARRAS_REPETIDAS = re.compile(r'/{2,}')
+# Último segmento con extensión (``.html``, ``.jpg``): no se le agrega barra final
+CON_EXTENSION = re.compile(r'\.[A-Za-z0-9]{1,5}$')
+
+
+def es_tracking(parametro):
+    parametro = parametro.lower()
+    return parametro in PARAMETROS_TRACKING or parametro.startswith(PREFIJOS_TRACKING)
+
+
+def canonicalizar_url(url, base=None):
+    """Forma canónica de ``url`` (resuelta contra ``base`` si es relativa).
+
+    - ``&amp;`` y demás entidades HTML decodificadas
+    - esquema ``https`` y host en minúsculas, sin puerto por defecto
+    - path sin ``//`` ni segmentos ``.``/``..`` y con barra final
+      (salvo que termine en un archivo con extensión)
+    - sin parámetros de tracking, el resto ordenados; sin fragmento
+
+    Devuelve None si no hay URL o no es http(s).
+    """
+    if not url or not url.strip():
+        return None
+    url = html.unescape(url.strip())
+    if base:
+        url = urljoin(base, url)
+    elif url.startswith('//'):
+        url = 'https:' + url
+
+    partes = urlsplit(url)
+    esquema = partes.scheme.lower()
+    if esquema not in ('http', 'https') or not partes.hostname:
+        return None
+
+    host = partes.hostname.lower().rstrip('.')
+    if partes.port and partes.port not in (80, 443):
+        host = f'{host}:{partes.port}'
+
+    path = BARRAS_REPETIDAS.sub('/', partes.path or '/')
+    path = posixpath.normpath(path) if path != '/' else path
+    if not path.startswith('/'):
+        path = '/' + path
+    if not path.endswith('/') and not CON_EXTENSION.search(path):
+        path += '/'
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True) if not es_tracking(k)
+    ))
+    return urlunsplit(('https', host, path, query, ''))
@@ -0,0 +1,202 @@
+"""
+Miniaturas locales de las imágenes de noticias.
+
+Las tarjetas mostraban la imagen remota completa (hasta 800x600) para
+pintarla chica. ``miniatura(url, ancho, formato)`` descarga la fuente una
+sola vez y guarda variantes WebP/JPEG redimensionadas en
+``SCRAPER_THUMB_DIR``:
+
+- direccionado por contenido: la fuente se guarda como ``<sha256>.orig`` y
+  sus variantes como ``<sha256>-<ancho>.<ext>``; ``urls/<sha1 de la URL>``
+  solo apunta al sha256, así dos URLs con la misma imagen comparten archivos
+- LRU: cada uso actualiza el mtime del archivo; la tarea periódica
+  ``desalojar_miniaturas`` borra los menos usados hasta quedar bajo
+  ``SCRAPER_THUMB_MAX_MB`` (recorrer la caché en cada escritura sería O(caché)
+  por miniatura nueva)
+- la descarga corre dentro del request: usa su propia sesión con
+  ``SCRAPER_THUMB_TIMEOUT`` y sin el rate limit ni el circuit breaker del
+  scraper, así no espera turno detrás de las páginas ni un error del CDN abre
+  el circuito del sitio; se corta a los ``SCRAPER_THUMB_MAX_BYTES`` y no se
+  decodifican imágenes de más de ``SCRAPER_THUMB_MAX_PIXELS``
+
+Pillow es opcional: sin él ``miniatura`` devuelve None y la vista redirige
+a la imagen original.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import requests
+from django.conf import settings
+
+from scraping.engine.browser import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+_lock = threading.Lock()
+_session = None
+
+
+def _sesion():
+    """Sesión HTTP de las miniaturas, aparte de la del scraper"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update({'User-Agent': USER_AGENT})
+    return _session
+
+
+def _raiz():
+    return Path(settings.SCRAPER_THUMB_DIR)
+
+
+def _ruta(digest, sufijo):
+    return _raiz() / digest[:2] / f"{digest}{sufijo}"
+
+
+def _indice(url):
+    return _raiz() / 'urls' / hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def _escribir(ruta, datos):
+    # Archivo temporal + rename: nadie sirve una miniatura a medio escribir
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def _usar(*rutas):
+    """Marca los archivos como recién usados (el mtime es la clave del LRU)"""
+    for ruta in rutas:
+        try:
+            os.utime(ruta, None)
+        except FileNotFoundError:
+            pass
+
+
+def _digest_conocido(url):
+    try:
+        return _indice(url).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _leer_limitado(respuesta, limite):
+    """Cuerpo de la respuesta o None si supera ``limite`` bytes (sin bajar el resto)"""
+    declarado = respuesta.headers.get('content-length', '')
+    if declarado.isdigit() and int(declarado) > limite:
+        return None
+    datos = bytearray()
+    for bloque in respuesta.iter_content(64 * 1024):
+        datos += bloque
+        if len(datos) > limite:
+            return None
+    return bytes(datos)
+
+
+def descargar_fuente(url):
+    """sha256 y ruta del archivo fuente, descargándolo solo si no está en disco"""
+    digest = _digest_conocido(url)
+    if digest and _ruta(digest, '.orig').exists():
+        return digest, _ruta(digest, '.orig')
+
+    limite = settings.SCRAPER_THUMB_MAX_BYTES
+    with _sesion().get(url, timeout=settings.SCRAPER_THUMB_TIMEOUT, stream=True) as respuesta:
+        respuesta.raise_for_status()
+        tipo = respuesta.headers.get('content-type', '')
+        datos = _leer_limitado(respuesta, limite) if tipo.startswith('image/') else None
+    if not tipo.startswith('image/'):
+        raise ValueError(f"{url} no es una imagen ({tipo})")
+    if datos is None:
+        raise ValueError(f"{url} supera {limite} bytes")
+    digest = hashlib.sha256(datos).hexdigest()
+    fuente = _ruta(digest, '.orig')
+    if not fuente.exists():
+        _escribir(fuente, datos)
+    _escribir(_indice(url), digest.encode('ascii'))
+    return digest, fuente
+
+
+def redimensionar(fuente, ancho, formato):
+    """Bytes de ``fuente`` reducida a ``ancho`` px (nunca ampliada) en ``formato``"""
+    from PIL import Image, ImageOps
+
+    with Image.open(fuente) as imagen:
+        # open() solo lee la cabecera: se rechaza antes de decodificar
+        if imagen.width * imagen.height > settings.SCRAPER_THUMB_MAX_PIXELS:
+            raise ValueError(f"{fuente.name}: {imagen.width}x{imagen.height} supera SCRAPER_THUMB_MAX_PIXELS")
+        imagen = ImageOps.exif_transpose(imagen)
+        if imagen.width > ancho:
+            alto = max(1, round(imagen.height * ancho / imagen.width))
+            imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+        if formato == 'jpeg' and imagen.mode not in ('RGB', 'L'):
+            imagen = imagen.convert('RGB')
+        buffer = io.BytesIO()
+        imagen.save(buffer, FORMATOS[formato][0], quality=settings.SCRAPER_THUMB_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def miniatura(url, ancho, formato):
+    """Ruta de la variante ``ancho``/``formato`` de ``url``; None si no hay Pillow"""
+    digest = _digest_conocido(url)
+    if digest:
+        ruta = _ruta(digest, f"-{ancho}.{formato}")
+        if ruta.exists():
+            _usar(ruta, _indice(url))
+            return ruta
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return None
+
+    digest, fuente = descargar_fuente(url)
+    ruta = _ruta(digest, f"-{ancho}.{formato}")
+    if not ruta.exists():
+        _escribir(ruta, redimensionar(fuente, ancho, formato))
+    _usar(ruta, fuente, _indice(url))
+    return ruta
+
+
+def desalojar():
+    """Borra los archivos usados hace más tiempo hasta quedar bajo ``SCRAPER_THUMB_MAX_MB``"""
+    limite = settings.SCRAPER_THUMB_MAX_MB * 1024 * 1024
+    with _lock:
+        archivos = []
+        for carpeta, _, nombres in os.walk(_raiz()):
+            for nombre in nombres:
+                if nombre.endswith('.tmp'):
+                    continue
+                try:
+                    info = os.stat(os.path.join(carpeta, nombre))
+                except FileNotFoundError:
+                    continue
+                archivos.append((info.st_mtime, info.st_size, os.path.join(carpeta, nombre)))
+        total = sum(tamano for _, tamano, _ in archivos)
+        if total <= limite:
+            return 0
+
+        borrados = 0
+        # Se baja al 90%: margen para lo que se escriba hasta la próxima pasada
+        for _, tamano, ruta in sorted(archivos):
+            if total <= limite * 0.9:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+            borrados += 1
+        logger.info(f"🧹 Caché de miniaturas: {borrados} archivos desalojados")
+        return borrados
@@ -1,19 +1,27 @@
 import io
 import logging
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, redirect, render
 from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, datetime
 from .models import Noticia, NoticiasVistas
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_GET
 from django.core.management import call_command
-from .tasks import scrape_all_sections, run_single_scrape
+from .tasks import iniciar_scraping_completo, run_single_scrape
+from .engine.scheduler import cadencias
+from .engine.state import solicitar_cancelacion
+from .utils.thumbnails import FORMATOS, miniatura
 from celery.result import AsyncResult
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from accounts.utils import registrar_busqueda, registrar_scraping, registrar_vista_noticia_actividad, registrar_compartir
 
+logger = logging.getLogger(__name__)
+
 # Función helper mejorada para manejar lógica común de listas de noticias
 @login_required
 def lista_noticias_helper(request, queryset_base, template_name, nav_type='comercio'):
@@ -210,9 +218,9 @@ def ejecutar_scraping_generico(request, command_name=None):
                     task = run_single_scrape.delay(command_name)
                     message = f"Tarea '{command_name}' enviada a Celery"
             else:
-                # Ejecuta todas las secciones a la vez (la tarea ya existe)
-                task = scrape_all_sections.delay()
-                message = "Tarea global de scraping enviada a Celery"
+                # Reparte las secciones entre los workers; el id es el de la corrida
+                task = iniciar_scraping_completo()
+                message = "Scraping de todas las secciones repartido en Celery"
 
             return JsonResponse({
                 "status": "ok",
@@ -334,7 +342,39 @@ def estadisticas_noticias(request):
         'origen': origen
     })
 
-logger = logging.getLogger(__name__)
+@login_required
+def cadencia_secciones(request):
+    """Intervalo actual, tasa de publicación y próxima corrida de cada sección"""
+    return JsonResponse({'secciones': cadencias()})
+
+@login_required
+@require_GET
+def miniatura_noticia(request, noticia_id, ancho):
+    """Imagen de la tarjeta reducida a ``ancho`` px desde la caché local (WebP si el navegador lo acepta)"""
+    if ancho not in settings.SCRAPER_THUMB_WIDTHS:
+        raise Http404("Ancho de miniatura no permitido")
+    noticia = get_object_or_404(Noticia.objects.only('imagen'), pk=noticia_id)
+    if not noticia.imagen:
+        raise Http404("La noticia no tiene imagen")
+
+    formato = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+    try:
+        ruta = miniatura(noticia.imagen, ancho, formato)
+        # desalojar() de otro request puede borrar el archivo antes de abrirlo
+        archivo = open(ruta, 'rb') if ruta is not None else None
+    except Exception as e:
+        logger.warning(f"No se pudo generar la miniatura de la noticia {noticia_id}: {e}")
+        archivo = None
+    if archivo is None:
+        # Sin Pillow o con la fuente caída: la imagen original, sin caché larga
+        return redirect(noticia.imagen)
+
+    respuesta = FileResponse(archivo, content_type=FORMATOS[formato][1])
+    # La URL lleva la versión de la imagen (?v=): puede cachearse sin revalidar
+    respuesta['Cache-Control'] = f"public, max-age={settings.SCRAPER_THUMB_MAX_AGE}, immutable"
+    patch_vary_headers(respuesta, ['Accept'])
+    return respuesta
+
 @login_required
 def ver_estado_tarea(request, task_id):
     """Ver el estado de una tarea Celery con manejo robusto de errores."""
@@ -441,6 +481,27 @@ def ver_estado_tarea(request, task_id):
             'completed': False
         }, status=500)
 
+@login_required
+def cancelar_tarea(request, task_id):
+    """Pide a una tarea de scraping que se detenga en su próximo punto de control"""
+    if request.method != "POST":
+        return JsonResponse({"status": "error", "message": "Solo se permiten peticiones POST"}, status=405)
+    if request.user.profile.role not in ['premium', 'admin']:
+        return JsonResponse({
+            "status": "error",
+            "message": "Solo usuarios Premium pueden cancelar scraping",
+            "error_type": "permission_denied"
+        }, status=403)
+
+    # En cola: revoke basta; en ejecución: el motor lee el flag y se detiene
+    AsyncResult(task_id).revoke()
+    solicitada = solicitar_cancelacion(task_id)
+    return JsonResponse({
+        "status": "ok" if solicitada else "error",
+        "task_id": task_id,
+        "message": "Cancelación solicitada" if solicitada else "No se pudo registrar la cancelación"
+    })
+
 @login_required
 def registrar_vista_noticia(request, noticia_id):
     """Registra cuando un usuario ve una noticia"""
@@ -148,9 +148,16 @@ CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:63
 CELERY_TIMEZONE = os.getenv('CELERY_TIMEZONE', 'America/Lima')
 
 CELERY_BEAT_SCHEDULE = {
-    'scrape-all-every-5-hours': {
-        'task': 'scraping.tasks.scrape_all_sections',
-        'schedule': 5 * 60 * 60.0,        # 18,000 segundos = 5 horas
+    # Cada minuto se despachan solo las secciones a las que ya les toca
+    # (cadencia adaptativa, ver scraping/engine/scheduler.py)
+    'programar-secciones': {
+        'task': 'scraping.tasks.programar_secciones',
+        'schedule': 60.0,
+    },
+    # La caché de miniaturas se recorta fuera del request (ver scraping/utils/thumbnails.py)
+    'desalojar-miniaturas': {
+        'task': 'scraping.tasks.desalojar_miniaturas',
+        'schedule': 600.0,
     },
 }
 
@@ -158,6 +165,76 @@ CELERY_BEAT_SCHEDULE = {
 CELERY_BEAT_SCHEDULE_FILENAME = 'celerybeat-schedule'
 CELERY_BEAT_SCHEDULER = 'celery.beat:PersistentScheduler'
 
+# Pool de Chromium compartido por los scrapers (ver scraping/engine/browser.py)
+SCRAPER_POOL_MAX_PAGES = int(os.getenv('SCRAPER_POOL_MAX_PAGES', '50'))
+SCRAPER_POOL_MAX_RSS_MB = int(os.getenv('SCRAPER_POOL_MAX_RSS_MB', '1024'))
+# Secciones en paralelo de scrape_sections --concurrency (motor async)
+SCRAPER_CONCURRENCY = int(os.getenv('SCRAPER_CONCURRENCY', '4'))
+# 'bulk' = un page.evaluate por página; 'locator' = llamadas por campo
+SCRAPER_EXTRACTION_MODE = os.getenv('SCRAPER_EXTRACTION_MODE', 'bulk')
+# Tier HTTP sin navegador; si falla se reintenta tras SCRAPER_STATIC_RETRY_HOURS
+SCRAPER_STATIC_TIER = os.getenv('SCRAPER_STATIC_TIER', 'True') == 'True'
+SCRAPER_STATIC_RETRY_HOURS = float(os.getenv('SCRAPER_STATIC_RETRY_HOURS', '24'))
+# Modo incremental: saltar enlaces guardados en los últimos N días (STOP = K seguidos, 0 = sin corte)
+SCRAPER_INCREMENTAL = os.getenv('SCRAPER_INCREMENTAL', 'False') == 'True'
+SCRAPER_INCREMENTAL_DIAS = int(os.getenv('SCRAPER_INCREMENTAL_DIAS', '7'))
+SCRAPER_INCREMENTAL_STOP = int(os.getenv('SCRAPER_INCREMENTAL_STOP', '0'))
+# run_single_scrape: 'inprocess' (motor dentro del worker) | 'subprocess' (manage.py aislado)
+SCRAPER_EXECUTION_MODE = os.getenv('SCRAPER_EXECUTION_MODE', 'inprocess')
+# Streaming extracción → guardado: lotes de N items o cada T segundos, cola acotada
+SCRAPER_STREAMING = os.getenv('SCRAPER_STREAMING', 'True') == 'True'
+SCRAPER_WRITER_BATCH = int(os.getenv('SCRAPER_WRITER_BATCH', '20'))
+SCRAPER_WRITER_INTERVAL = float(os.getenv('SCRAPER_WRITER_INTERVAL', '2'))
+SCRAPER_WRITER_QUEUE = int(os.getenv('SCRAPER_WRITER_QUEUE', '200'))
+# Token bucket por dominio en Redis para toda descarga saliente (req/s y ráfaga)
+SCRAPER_RATE_LIMIT = os.getenv('SCRAPER_RATE_LIMIT', 'True') == 'True'
+SCRAPER_RATE_PER_SEC = float(os.getenv('SCRAPER_RATE_PER_SEC', '1'))
+SCRAPER_RATE_BURST = float(os.getenv('SCRAPER_RATE_BURST', '5'))
+SCRAPER_RATE_LIMITS = {
+    # 'peru21.pe': (0.5, 3),
+}
+# Circuit breaker por dominio: abrir tras N fallos (o respuestas más lentas que SLOW s) y esperar COOLDOWN s
+SCRAPER_CIRCUIT_BREAKER = os.getenv('SCRAPER_CIRCUIT_BREAKER', 'True') == 'True'
+SCRAPER_CIRCUIT_FAILURES = int(os.getenv('SCRAPER_CIRCUIT_FAILURES', '3'))
+SCRAPER_CIRCUIT_SLOW_SECONDS = float(os.getenv('SCRAPER_CIRCUIT_SLOW_SECONDS', '30'))
+SCRAPER_CIRCUIT_COOLDOWN = float(os.getenv('SCRAPER_CIRCUIT_COOLDOWN', '300'))
+# Chromium compartido (manage.py servidor_navegador); vacío = cada worker lanza el suyo
+SCRAPER_BROWSER_WS = os.getenv('SCRAPER_BROWSER_WS', '')
+SCRAPER_BROWSER_CONNECT_TIMEOUT = int(os.getenv('SCRAPER_BROWSER_CONNECT_TIMEOUT', '5000'))
+SCRAPER_BROWSER_SERVER_MAX_RSS_MB = int(os.getenv('SCRAPER_BROWSER_SERVER_MAX_RSS_MB', '2048'))
+SCRAPER_BROWSER_SERVER_INTERVAL = float(os.getenv('SCRAPER_BROWSER_SERVER_INTERVAL', '30'))
+# Cadencia adaptativa: buscar ~SCRAPER_CADENCE_TARGET nuevas por corrida, entre min y max minutos
+SCRAPER_CADENCE_TARGET = float(os.getenv('SCRAPER_CADENCE_TARGET', '5'))
+SCRAPER_CADENCE_MIN_MINUTES = float(os.getenv('SCRAPER_CADENCE_MIN_MINUTES', '15'))
+SCRAPER_CADENCE_MAX_MINUTES = float(os.getenv('SCRAPER_CADENCE_MAX_MINUTES', '720'))
+SCRAPER_CADENCE_DEFAULT_MINUTES = float(os.getenv('SCRAPER_CADENCE_DEFAULT_MINUTES', '300'))
+# Sondeo de imágenes (GET con Range de la cabecera) para elegir con dimensiones reales
+SCRAPER_IMAGE_PROBE = os.getenv('SCRAPER_IMAGE_PROBE', 'True') == 'True'
+SCRAPER_IMAGE_PROBE_CONCURRENCY = int(os.getenv('SCRAPER_IMAGE_PROBE_CONCURRENCY', '8'))
+SCRAPER_IMAGE_PROBE_TIMEOUT = float(os.getenv('SCRAPER_IMAGE_PROBE_TIMEOUT', '5'))
+SCRAPER_IMAGE_PROBE_BYTES = int(os.getenv('SCRAPER_IMAGE_PROBE_BYTES', '32768'))
+# Bucket propio del sondeo (req/s, ráfaga por dominio): no gasta los tokens de las páginas
+SCRAPER_IMAGE_PROBE_RATE = (
+    float(os.getenv('SCRAPER_IMAGE_PROBE_RATE_PER_SEC', '4')),
+    float(os.getenv('SCRAPER_IMAGE_PROBE_RATE_BURST', '8')),
+)
+# Miniaturas locales de las tarjetas (anchos permitidos, caché LRU en disco)
+SCRAPER_THUMB_DIR = os.getenv('SCRAPER_THUMB_DIR', str(BASE_DIR / 'cache' / 'miniaturas'))
+SCRAPER_THUMB_MAX_MB = int(os.getenv('SCRAPER_THUMB_MAX_MB', '512'))
+SCRAPER_THUMB_WIDTHS = (400, 800)
+SCRAPER_THUMB_QUALITY = int(os.getenv('SCRAPER_THUMB_QUALITY', '80'))
+SCRAPER_THUMB_MAX_AGE = int(os.getenv('SCRAPER_THUMB_MAX_AGE', str(60 * 60 * 24 * 365)))
+SCRAPER_THUMB_MAX_BYTES = int(os.getenv('SCRAPER_THUMB_MAX_BYTES', str(10 * 1024 * 1024)))
+SCRAPER_THUMB_MAX_PIXELS = int(os.getenv('SCRAPER_THUMB_MAX_PIXELS', str(40_000_000)))
+SCRAPER_THUMB_TIMEOUT = float(os.getenv('SCRAPER_THUMB_TIMEOUT', '5'))
+# Corpus offline (grabar_fixtures); con SCRAPER_REPLAY el motor no sale a la red
+SCRAPER_FIXTURES_DIR = os.getenv('SCRAPER_FIXTURES_DIR', str(BASE_DIR / 'fixtures' / 'scraping'))
+SCRAPER_REPLAY = os.getenv('SCRAPER_REPLAY', 'False') == 'True'
+# Bloqueo de red en el navegador: 'default' | 'estricto' | 'off'
+SCRAPER_BLOCK_PROFILE = os.getenv('SCRAPER_BLOCK_PROFILE', 'default')
+# Estado compartido del scraper (tiers, progreso, límites); por defecto el broker
+SCRAPER_REDIS_URL = os.getenv('SCRAPER_REDIS_URL', CELERY_BROKER_URL)
+
 # Redirecciones después de login/logout
 LOGIN_REDIRECT_URL = os.getenv('LOGIN_REDIRECT_URL', 'lista_noticias')
 LOGOUT_REDIRECT_URL = os.getenv('LOGOUT_REDIRECT_URL', 'bienvenida')